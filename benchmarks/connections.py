@@ -0,0 +1,132 @@
+"""Benchmark of HTTP connection reuse by concurrent requests to DSpace.
+
+Sends requests from several threads sharing one session to a local keep-alive HTTP
+server standing in for DSpace, and counts the connections the server accepts.
+Compares a new session per request, a session with the default adapter, whose pool
+keeps at most 10 connections and discards any others when they are returned, and a
+session with the adapter mounted by
+mount_http_adapter, sized with DSPACE_POOL_MAXSIZE. The server waits before handling
+each new connection, standing in for the TCP and TLS handshakes with a real DSpace,
+and before each response.
+
+Run with `make benchmark` or `uv run python -m benchmarks.connections`.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socket import socket
+from typing import Any
+
+import requests
+import urllib3
+
+from submitter.dspace import mount_http_adapter
+
+THREADS = 16
+REQUESTS_PER_THREAD = 10
+HANDSHAKE_SECONDS = 0.02
+RESPONSE_SECONDS = 0.1
+
+os.environ.setdefault("OUTPUT_QUEUES", "benchmark_result_queue")
+os.environ.setdefault(
+    "DSS_DSPACE_CREDENTIALS",
+    json.dumps(
+        {
+            instance: {"url": "http://127.0.0.1", "user": "test", "password": "test"}
+            for instance in ("ir-8", "ddc-8")
+        }
+    ),
+)
+os.environ["DSPACE_POOL_MAXSIZE"] = str(THREADS)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and body are sent separately, which with Nagle's algorithm stalls
+    # each response on a kept-alive connection until the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        time.sleep(HANDSHAKE_SECONDS)
+        super().setup()
+
+    def do_GET(self) -> None:
+        time.sleep(RESPONSE_SECONDS)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *_args: Any) -> None:  # noqa: ANN401
+        pass
+
+
+class ConnectionCountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections opened at once by the threads, which
+    # are then retried only after a second
+    request_queue_size = 64
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), KeepAliveHandler)
+        self.connections = 0
+
+    def process_request(
+        self,
+        request: socket | tuple[bytes, socket],
+        client_address: Any,  # noqa: ANN401
+    ) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def run(get: Callable[[str], requests.Response]) -> tuple[int, float]:
+    """Send requests from THREADS threads, returning connections opened and seconds."""
+    server = ConnectionCountingServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/server/api"
+    barrier = threading.Barrier(THREADS + 1)
+
+    def send_requests() -> None:
+        barrier.wait()
+        for _ in range(REQUESTS_PER_THREAD):
+            get(url).raise_for_status()
+
+    threads = [threading.Thread(target=send_requests) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    return server.connections, elapsed
+
+
+def main() -> None:
+    # the default adapter warns each time it discards a connection from a full pool
+    logging.getLogger(urllib3.__name__).setLevel(logging.ERROR)
+    default_session = requests.Session()
+    tuned_session = requests.Session()
+    mount_http_adapter(tuned_session, "IR-8")
+
+    print(f"{THREADS} threads x {REQUESTS_PER_THREAD} requests")
+    for label, get in (
+        ("new session per request", requests.get),
+        ("shared session, default adapter", default_session.get),
+        ("shared session, mount_http_adapter", tuned_session.get),
+    ):
+        connections, elapsed = run(get)
+        print(f"{label:36} {connections:5d} connections  {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
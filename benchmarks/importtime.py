@@ -0,0 +1,91 @@
+"""Benchmark of the import time of each CLI command.
+
+Every command pays for importing submitter.cli, and then for importing the modules it
+uses when it runs. Each is measured in a fresh interpreter with `python -X importtime`,
+taking the median of several runs.
+
+Exits with an error if importing submitter.cli, which happens on every launch of the
+service, or any command's import set takes longer than its budget in BUDGETS_MS. The
+budgets of commands that don't submit to DSpace are set well below those that do, so
+that eagerly importing the submission stack, e.g. from submitter.sqs, fails them. On
+a slower machine, scale every budget with --budget-scale.
+
+Run with `make benchmark` or `uv run python -m benchmarks.importtime`.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+# modules each command imports when it runs, in addition to submitter.cli
+COMMAND_IMPORTS = {
+    "start": ["submitter.message", "submitter.sqs", "submitter.submission"],
+    "load-sample-input-data": ["submitter.message", "submitter.sqs"],
+    "load-sample-output-data": ["submitter.message", "submitter.sqs"],
+    "create-queue": ["submitter.sqs"],
+    "verify-dspace-connection": ["submitter.errors", "submitter.submission"],
+}
+
+# maximum median import time of submitter.cli and of each command, in milliseconds
+BUDGETS_MS = {
+    "submitter.cli": 100,
+    "start": 1500,
+    "load-sample-input-data": 500,
+    "load-sample-output-data": 500,
+    "create-queue": 500,
+    "verify-dspace-connection": 1500,
+}
+
+
+def import_milliseconds(modules: list[str]) -> float:
+    """Return the median time taken to import modules in a fresh interpreter."""
+    timings = []
+    for _ in range(RUNS):
+        stderr = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stderr
+        # the cumulative time of each requested module's top-level (not indented)
+        # import includes the time to import its dependencies
+        microseconds = 0
+        for line in stderr.splitlines():
+            _, cumulative, name = line.split("|")
+            if not name.startswith("  ") and name.strip() in modules:
+                microseconds += int(cumulative)
+        timings.append(microseconds / 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1,
+        help="factor by which to scale every budget in BUDGETS_MS",
+    )
+    args = parser.parse_args()
+
+    timings = {"submitter.cli": import_milliseconds(["submitter.cli"])}
+    for command, modules in COMMAND_IMPORTS.items():
+        timings[command] = import_milliseconds(["submitter.cli", *modules])
+
+    print(f"median of {RUNS} runs, including importing submitter.cli")
+    over_budget = []
+    for name, milliseconds in timings.items():
+        budget = BUDGETS_MS[name] * args.budget_scale
+        print(f"{name:28} {milliseconds:8.1f} ms  (budget {budget:.0f} ms)")
+        if milliseconds > budget:
+            over_budget.append(f"{name} took {milliseconds:.1f} ms, over {budget:.0f} ms")
+
+    if over_budget:
+        sys.exit("Import time over budget: " + "; ".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
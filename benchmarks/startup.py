@@ -0,0 +1,60 @@
+"""Benchmark of service startup.
+
+Measures, in fresh interpreters, the time to import the CLI and then to load, check,
+and compile the message JSON schemas, as the `start` command does before polling the
+input queue. Each interpreter is started in an empty temporary directory, as the
+schemas are loaded from the package rather than relative to the working directory.
+
+Run with `make benchmark` or `uv run python -m benchmarks.startup`.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RUNS = 10
+STARTUP = """
+import time
+start = time.perf_counter()
+import submitter.cli
+imported = time.perf_counter()
+from submitter.message import load_validators
+load_validators()
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parent.parent
+    env = {
+        **os.environ,
+        "OUTPUT_QUEUES": os.environ.get("OUTPUT_QUEUES", "benchmark_result_queue"),
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(project_root), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    imports, schemas = [], []
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(RUNS):
+            output = subprocess.run(  # noqa: S603
+                [sys.executable, "-c", STARTUP],
+                cwd=cwd,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            import_seconds, schema_seconds = map(float, output.split())
+            imports.append(import_seconds * 1000)
+            schemas.append(schema_seconds * 1000)
+
+    print(f"median of {RUNS} runs from a temporary working directory")
+    print(f"import submitter.cli:              {statistics.median(imports):8.1f} ms")
+    print(f"load and compile message schemas:  {statistics.median(schemas):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Micro-benchmark of submission message validation.
+
+Compares the per-message cost of validating a submission message with the compiled,
+cached validators used by validate_message against calling jsonschema.validate for
+each message, which checks the schema and creates a validator every time.
+
+Run with `make benchmark` or `uv run python -m benchmarks.validation`.
+"""
+
+import json
+import os
+import timeit
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, cast
+
+import jsonschema
+
+from submitter.message import load_jsonschemas, validate_message
+
+if TYPE_CHECKING:
+    from mypy_boto3_sqs.service_resource import Message
+
+os.environ.setdefault("OUTPUT_QUEUES", "benchmark_result_queue")
+
+MESSAGE = cast(
+    "Message",
+    SimpleNamespace(
+        message_attributes={
+            "PackageID": {"DataType": "String", "StringValue": "etd_123123"},
+            "SubmissionSource": {"DataType": "String", "StringValue": "etd"},
+            "OutputQueue": {
+                "DataType": "String",
+                "StringValue": os.environ["OUTPUT_QUEUES"].split(",")[0],
+            },
+        },
+        body=json.dumps(
+            {
+                "SubmissionSystem": "DSpace@MIT",
+                "CollectionHandle": "1721.1/131022",
+                "MetadataLocation": "s3://bucket/etd_123123/metadata.json",
+                "Files": [
+                    {
+                        "BitstreamName": f"file-{i:02}.pdf",
+                        "FileLocation": f"s3://bucket/etd_123123/file-{i:02}.pdf",
+                        "BitstreamDescription": "A bitstream",
+                    }
+                    for i in range(5)
+                ],
+            }
+        ),
+    ),
+)
+
+
+def validate_message_uncompiled(message: "Message") -> None:
+    """Validate a message as validate_message did before validators were cached."""
+    schemas = load_jsonschemas()
+    jsonschema.validate(
+        instance=message.message_attributes,
+        schema=schemas["submission-message-attributes"],
+    )
+    jsonschema.validate(
+        instance=json.loads(message.body), schema=schemas["submission-message-body"]
+    )
+
+
+def per_message_microseconds(
+    validate: Callable[["Message"], object], number: int
+) -> float:
+    timer = timeit.Timer(lambda: validate(MESSAGE))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1_000_000
+
+
+def main() -> None:
+    number = 2_000
+    validate_message(MESSAGE)  # create validators before timing
+    uncompiled = per_message_microseconds(validate_message_uncompiled, number)
+    compiled = per_message_microseconds(validate_message, number)
+    print(f"jsonschema.validate per message:  {uncompiled:8.1f} us")
+    print(f"cached validators per message:    {compiled:8.1f} us")
+    print(f"speedup:                          {uncompiled / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,10 @@ import logging
 import click
 
 from submitter.config import Config, configure_logger, configure_sentry
-from submitter.errors import DSpaceAuthenticationError
-from submitter.message import (
-    generate_result_messages_from_file,
-    generate_submission_messages_from_file,
-)
-from submitter.sqs import create, message_loop, write_message_to_queue
-from submitter.submission import Submission
+
+# Modules used by commands are imported by the commands that use them, rather than
+# here, so that each command only pays the (considerable) cost of importing boto3,
+# dspace_rest_client, smart_open, etc. if it needs them.
 
 logger = logging.getLogger(__name__)
 CONFIG = Config()
@@ -40,9 +37,99 @@ def main(*, verbose: bool) -> None:
     "--queue", envvar="INPUT_QUEUE", help="Name of queue to process messages from"
 )
 @click.option("--wait", default=20, help="seconds to wait for long polling. max 20")
-def start(queue: str, wait: int) -> None:
+@click.option(
+    "--visibility",
+    default=lambda: CONFIG.sqs_visibility_timeout,
+    type=click.IntRange(min=0, max=43200),
+    help=(
+        "Initial visibility timeout, in seconds, of received messages. Defaults to "
+        "SQS_VISIBILITY_TIMEOUT or 30"
+    ),
+)
+@click.option(
+    "--heartbeat-interval",
+    default=lambda: CONFIG.sqs_heartbeat_interval,
+    type=click.FloatRange(min=0),
+    help=(
+        "Seconds between extensions of the visibility timeout of messages still being "
+        "processed, 0 to disable. Defaults to SQS_HEARTBEAT_INTERVAL or 10"
+    ),
+)
+@click.option(
+    "--workers",
+    default=lambda: CONFIG.worker_concurrency,
+    type=click.IntRange(min=1),
+    help=(
+        "Number of messages to process concurrently. Defaults to WORKER_CONCURRENCY or 1"
+    ),
+)
+@click.option(
+    "--prefetch",
+    default=lambda: CONFIG.prefetch_batches,
+    type=click.IntRange(min=0),
+    help=(
+        "Number of message batches to receive ahead of processing, so polling the "
+        "queue overlaps with submitting the current batch. Defaults to PREFETCH_BATCHES "
+        "or 0 (disabled)"
+    ),
+)
+@click.option(
+    "--shutdown-grace-period",
+    default=lambda: CONFIG.shutdown_grace_period,
+    type=click.FloatRange(min=0),
+    help=(
+        "Seconds after SIGTERM or SIGINT, on which polling stops, that messages being "
+        "submitted are waited for. Submissions still running then are logged and no "
+        "longer waited for; their messages are received again once their visibility "
+        "timeout expires. Defaults to SHUTDOWN_GRACE_PERIOD or 25"
+    ),
+)
+@click.option(
+    "--prewarm/--no-prewarm",
+    default=lambda: CONFIG.prewarm_dspace_clients,
+    help=(
+        "Authenticate to every DSpace instance, in parallel, before receiving "
+        "messages, stopping if any fails. Defaults to PREWARM_DSPACE_CLIENTS or false"
+    ),
+)
+def start(  # noqa: PLR0917
+    queue: str,
+    wait: int,
+    visibility: int,
+    heartbeat_interval: float,
+    workers: int,
+    prefetch: int,
+    shutdown_grace_period: float,
+    *,
+    prewarm: bool,
+) -> None:
+    from submitter.message import load_validators
+    from submitter.sqs import message_loop
+
+    # parse config and compile the message schemas before polling, so a problem with
+    # either stops the service before any messages are received
+    CONFIG.reload()
+    load_validators()
+    if prewarm:
+        from submitter.submission import dspace_clients
+
+        dspace_clients.warm(CONFIG.DSPACE_INSTANCES)
+    if CONFIG.submission_journal_path:
+        from submitter.submission import reconcile_journal
+
+        # finish or clean up submissions interrupted by the service stopping, before
+        # their messages are received again
+        reconcile_journal()
     logger.info("Starting processing messages from queue %s", queue)
-    message_loop(queue, wait)
+    message_loop(
+        queue,
+        wait,
+        visibility,
+        workers=workers,
+        prefetch=prefetch,
+        heartbeat_interval=heartbeat_interval,
+        shutdown_grace_period=shutdown_grace_period,
+    )
     logger.info("Completed processing messages from queue %s", queue)
 
 
@@ -67,6 +154,9 @@ def start(queue: str, wait: int) -> None:
     help="Path to json file of sample messages to load",
 )
 def load_sample_input_data(input_queue: str, output_queue: str, filepath: str) -> None:
+    from submitter.message import generate_submission_messages_from_file
+    from submitter.sqs import write_message_to_queue
+
     logger.info(f"Loading sample data from file '{filepath}' into queue {input_queue}")
     count = 0
     messages = generate_submission_messages_from_file(filepath, output_queue)
@@ -90,6 +180,9 @@ def load_sample_input_data(input_queue: str, output_queue: str, filepath: str) -
     help="Path to json file of sample messages to load",
 )
 def load_sample_output_data(output_queue: str, filepath: str) -> None:
+    from submitter.message import generate_result_messages_from_file
+    from submitter.sqs import write_message_to_queue
+
     logger.info(f"Loading sample data from file '{filepath}' into queue {output_queue}")
     count = 0
     messages = generate_result_messages_from_file(filepath, output_queue)
@@ -103,6 +196,8 @@ def load_sample_output_data(output_queue: str, filepath: str) -> None:
 @click.argument("name")
 def create_queue(name: str) -> None:
     """Create queue with NAME supplied as argument"""
+    from submitter.sqs import create
+
     queue = create(name)
     logger.info(queue.url)
 
@@ -116,6 +211,9 @@ def create_queue(name: str) -> None:
 def verify_dspace_connection(
     submission_system: str,
 ) -> None:
+    from submitter.errors import DSpaceAuthenticationError
+    from submitter.submission import Submission
+
     submission = Submission(
         destination=submission_system,
         attributes={},
@@ -123,7 +221,8 @@ def verify_dspace_connection(
     )
     credentials = CONFIG.dspace_credentials[submission_system]
     try:
-        submission.get_dspace_client()
+        with submission.get_dspace_client():
+            pass
     except DSpaceAuthenticationError:
         logger.exception(
             f'Failed to authenticate to "{credentials["url"]}" as '
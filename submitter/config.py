@@ -1,13 +1,37 @@
 import json
 import logging
 import os
-
-import sentry_sdk
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import ClassVar
 
 logger = logging.getLogger(__name__)
 
+DSpaceCredentials = Mapping[str, Mapping[str, str | float | None]]
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Config values parsed from env vars, read by Config instead of re-parsing them.
+
+    See Config.reload.
+    """
+
+    dspace_credentials: DSpaceCredentials
+    output_queues: tuple[str, ...]
+
 
 class Config:
+    # DSpace destinations accepted in submission messages, mapped to the key of the
+    # DSpace instance they resolve to in DSS_DSPACE_CREDENTIALS
+    DSPACE_INSTANCES: ClassVar[dict[str, str]] = {
+        "DSpace@MIT": "ir-8",
+        "IR-8": "ir-8",
+        "DDC-8": "ddc-8",
+    }
+    # workspaces deployed to ECS, where the working directory does not persist
+    DEPLOYED_WORKSPACES = ("stage", "prod")
     REQUIRED_ENV_VARS = (
         "WORKSPACE",
         "DSS_DSPACE_CREDENTIALS",
@@ -16,11 +40,92 @@ class Config:
     )
     OPTIONAL_ENV_VARS = (
         "SENTRY_DSN",
+        "BITSTREAM_UPLOAD_CONCURRENCY",
+        "COLLECTION_CACHE_SIZE",
+        "COLLECTION_CACHE_TTL",
+        "DSPACE_CIRCUIT_BREAKER_RESET",
+        "DSPACE_CIRCUIT_BREAKER_THRESHOLD",
+        "DSPACE_CLIENT_IDLE_TIMEOUT",
+        "DSPACE_CLIENT_POOL_SIZE",
+        "DSPACE_CONNECT_RETRIES",
+        "DSPACE_CONNECT_TIMEOUT",
+        "DSPACE_KEEPALIVE_INTERVAL",
+        "DSPACE_MAX_CONCURRENCY",
+        "DSPACE_MAX_CONCURRENT_UPLOADS",
+        "DSPACE_MAX_IN_FLIGHT",
+        "DSPACE_MAX_RETRIES",
+        "DSPACE_POOL_MAXSIZE",
+        "DSPACE_REQUESTS_PER_SECOND",
+        "DSPACE_RETRY_BACKOFF",
+        "DSPACE_RETRY_BACKOFF_MAX",
+        "DSPACE_RETRY_JITTER",
+        "DSPACE_SUBMISSION_DEADLINE",
         "DSPACE_TIMEOUT",
+        "DSPACE_TOKEN_REFRESH_MARGIN",
+        "DSPACE_UPLOAD_TIMEOUT_PER_MB",
+        "IDEMPOTENCY_DB_PATH",
+        "IDEMPOTENCY_TTL",
+        "PREFETCH_BATCHES",
+        "PREWARM_DSPACE_CLIENTS",
+        "SHUTDOWN_GRACE_PERIOD",
         "SKIP_PROCESSING",
         "SQS_ENDPOINT_URL",
+        "SQS_HEARTBEAT_INTERVAL",
+        "SQS_VISIBILITY_TIMEOUT",
+        "SUBMISSION_JOURNAL_PATH",
+        "VERIFY_RESULT_BITSTREAMS",
         "WARNING_ONLY_LOGGERS",
+        "WORKER_CONCURRENCY",
     )
+    # fields required on each instance's entry in DSS_DSPACE_CREDENTIALS
+    DSPACE_CREDENTIAL_FIELDS = ("url", "user", "password")
+    # numeric per-instance settings an entry may override; other fields are ignored
+    DSPACE_INSTANCE_SETTINGS = (
+        "circuit_breaker_reset",
+        "circuit_breaker_threshold",
+        "client_pool_size",
+        "connect_retries",
+        "connect_timeout",
+        "keepalive_interval",
+        "max_concurrency",
+        "max_concurrent_uploads",
+        "max_in_flight",
+        "max_retries",
+        "pool_maxsize",
+        "requests_per_second",
+        "retry_backoff",
+        "retry_backoff_max",
+        "retry_jitter",
+        "timeout",
+        "upload_timeout_per_mb",
+    )
+
+    _snapshot: ClassVar[ConfigSnapshot | None] = None
+
+    @classmethod
+    def reload(cls) -> ConfigSnapshot:
+        """Parse and validate env vars into a new snapshot, replacing the current one.
+
+        The snapshot is otherwise created the first time it is needed. Call this at
+        startup so malformed values are reported before processing begins, and after
+        changing the env vars it is created from, e.g. in tests.
+
+        Raises:
+            OSError: If an env var in the snapshot is undefined or malformed, or
+                IDEMPOTENCY_DB_PATH is not set in a deployed workspace.
+        """
+        config = cls()
+        config._check_idempotency_db_path()
+        snapshot = ConfigSnapshot(
+            dspace_credentials=config._parse_dspace_credentials(),
+            output_queues=tuple(config._parse_output_queues()),
+        )
+        cls._snapshot = snapshot
+        return snapshot
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot or self.reload()
 
     @property
     def workspace(self) -> str:
@@ -42,11 +147,23 @@ class Config:
 
     @property
     def output_queues(self) -> list[str]:
+        return list(self.snapshot.output_queues)
+
+    def _parse_output_queues(self) -> list[str]:
         value = os.getenv("OUTPUT_QUEUES")
         if not value:
             raise OSError("Env var 'OUTPUT_QUEUES' must be defined")
         return value.split(",")
 
+    def _check_idempotency_db_path(self) -> None:
+        if self.workspace in self.DEPLOYED_WORKSPACES and not os.getenv(
+            "IDEMPOTENCY_DB_PATH"
+        ):
+            raise OSError(
+                f"Env var 'IDEMPOTENCY_DB_PATH' must be defined in the "
+                f"'{self.workspace}' workspace"
+            )
+
     @property
     def sentry_dsn(self) -> str | None:
         dsn = os.getenv("SENTRY_DSN")
@@ -56,18 +173,93 @@ class Config:
 
     @property
     def dspace_timeout(self) -> float:
+        """Default read timeout, in seconds, of requests to DSpace."""
         value = os.getenv("DSPACE_TIMEOUT", "180")
         return float(value)
 
+    @property
+    def dspace_connect_timeout(self) -> float:
+        """Default connect timeout, in seconds, of requests to DSpace."""
+        value = os.getenv("DSPACE_CONNECT_TIMEOUT", "10")
+        return float(value)
+
+    @property
+    def dspace_upload_timeout_per_mb(self) -> float:
+        """Default seconds added to the read timeout of uploads per MiB uploaded."""
+        value = os.getenv("DSPACE_UPLOAD_TIMEOUT_PER_MB", "1")
+        return float(value)
+
+    @property
+    def dspace_submission_deadline(self) -> float:
+        """Seconds a submission to DSpace may take in total, 0 for no deadline."""
+        value = os.getenv("DSPACE_SUBMISSION_DEADLINE", "0")
+        return float(value)
+
+    @property
+    def dspace_token_refresh_margin(self) -> float:
+        """Seconds before a DSpace access token expires that it is refreshed."""
+        value = os.getenv("DSPACE_TOKEN_REFRESH_MARGIN", "60")
+        return float(value)
+
     @property
     def skip_processing(self) -> bool:
         value = os.getenv("SKIP_PROCESSING", "false")
         return value.lower() == "true"
 
+    @property
+    def idempotency_db_path(self) -> str:
+        """Path of the SQLite database of the idempotency index, in memory by default.
+
+        An in-memory index does not persist across restarts, so the path must be set in
+        deployed workspaces; see reload.
+        """
+        return os.getenv("IDEMPOTENCY_DB_PATH") or ":memory:"
+
+    @property
+    def idempotency_ttl(self) -> float:
+        """Seconds a record is kept in the idempotency index for, 0 to keep it forever."""
+        value = os.getenv("IDEMPOTENCY_TTL", "1209600")
+        return float(value)
+
+    @property
+    def submission_journal_path(self) -> str | None:
+        """Path of the SQLite database of the submission journal, None to disable it."""
+        return os.getenv("SUBMISSION_JOURNAL_PATH") or None
+
+    @property
+    def prewarm_dspace_clients(self) -> bool:
+        """Whether to authenticate to every DSpace instance before processing."""
+        value = os.getenv("PREWARM_DSPACE_CLIENTS", "false")
+        return value.lower() == "true"
+
+    @property
+    def verify_result_bitstreams(self) -> bool:
+        """Whether to re-fetch a submission's bitstreams to build its result message."""
+        value = os.getenv("VERIFY_RESULT_BITSTREAMS", "false")
+        return value.lower() == "true"
+
     @property
     def sqs_endpoint_url(self) -> str | None:
         return os.getenv("SQS_ENDPOINT_URL")
 
+    @property
+    def sqs_visibility_timeout(self) -> int:
+        """Initial visibility timeout, in seconds, of messages from the input queue."""
+        value = os.getenv("SQS_VISIBILITY_TIMEOUT", "30")
+        return int(value)
+
+    @property
+    def sqs_heartbeat_interval(self) -> float:
+        """Seconds between visibility timeout extensions of in-flight messages."""
+        value = os.getenv("SQS_HEARTBEAT_INTERVAL", "10")
+        return float(value)
+
+    @property
+    def shutdown_grace_period(self) -> float:
+        """Seconds after SIGTERM that in-flight messages are waited for."""
+        value = os.getenv("SHUTDOWN_GRACE_PERIOD", "25")
+        return max(float(value), 0)
+
     @property
     def warning_only_loggers(self) -> list | None:
         value = os.getenv("WARNING_ONLY_LOGGERS", "botocore,boto3,smart_open,urllib3")
@@ -78,14 +270,196 @@ class Config:
         return loggers
 
     @property
-    def dspace_credentials(self) -> dict[str, dict[str, str | float | None]]:
+    def worker_concurrency(self) -> int:
+        value = os.getenv("WORKER_CONCURRENCY", "1")
+        return max(int(value), 1)
+
+    @property
+    def prefetch_batches(self) -> int:
+        value = os.getenv("PREFETCH_BATCHES", "0")
+        return max(int(value), 0)
+
+    @property
+    def dspace_max_concurrency(self) -> int:
+        """Default cap on concurrent submissions per DSpace instance, 0 for no cap."""
+        value = os.getenv("DSPACE_MAX_CONCURRENCY", "0")
+        return int(value)
+
+    @property
+    def collection_cache_size(self) -> int:
+        """Maximum number of resolved collection handles to cache, 0 to disable."""
+        value = os.getenv("COLLECTION_CACHE_SIZE", "256")
+        return int(value)
+
+    @property
+    def collection_cache_ttl(self) -> float:
+        """Seconds a resolved collection handle is cached for, 0 to disable."""
+        value = os.getenv("COLLECTION_CACHE_TTL", "900")
+        return float(value)
+
+    @property
+    def bitstream_upload_concurrency(self) -> int:
+        """Number of bitstreams of a single submission uploaded concurrently."""
+        value = os.getenv("BITSTREAM_UPLOAD_CONCURRENCY", "1")
+        return max(int(value), 1)
+
+    @property
+    def dspace_max_concurrent_uploads(self) -> int:
+        """Default cap on concurrent uploads per DSpace instance, 0 for no cap."""
+        value = os.getenv("DSPACE_MAX_CONCURRENT_UPLOADS", "0")
+        return int(value)
+
+    @property
+    def dspace_client_pool_size(self) -> int:
+        """Default cap on DSpace clients pooled per destination, 0 for no cap."""
+        value = os.getenv("DSPACE_CLIENT_POOL_SIZE", "0")
+        return int(value)
+
+    @property
+    def dspace_client_idle_timeout(self) -> float:
+        """Seconds a pooled DSpace client may be idle before being closed, 0 for never."""
+        value = os.getenv("DSPACE_CLIENT_IDLE_TIMEOUT", "300")
+        return float(value)
+
+    @property
+    def dspace_pool_maxsize(self) -> int:
+        """Default number of connections kept open to each DSpace instance per client."""
+        value = os.getenv("DSPACE_POOL_MAXSIZE", "10")
+        return max(int(value), 1)
+
+    @property
+    def dspace_keepalive_interval(self) -> float:
+        """Default seconds between TCP keep-alive probes to DSpace, 0 to disable."""
+        value = os.getenv("DSPACE_KEEPALIVE_INTERVAL", "0")
+        return float(value)
+
+    @property
+    def dspace_connect_retries(self) -> int:
+        """Default number of retries of non-idempotent requests that fail to connect."""
+        value = os.getenv("DSPACE_CONNECT_RETRIES", "2")
+        return max(int(value), 0)
+
+    @property
+    def dspace_retry_backoff(self) -> float:
+        """Default backoff factor, in seconds, between retries of requests to DSpace."""
+        value = os.getenv("DSPACE_RETRY_BACKOFF", "0.5")
+        return float(value)
+
+    @property
+    def dspace_circuit_breaker_threshold(self) -> int:
+        """Default number of consecutive failed requests that open a circuit breaker.
+
+        0 disables the circuit breakers.
+        """
+        value = os.getenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "0")
+        return int(value)
+
+    @property
+    def dspace_circuit_breaker_reset(self) -> float:
+        """Default seconds an open circuit breaker waits before sending a probe."""
+        value = os.getenv("DSPACE_CIRCUIT_BREAKER_RESET", "60")
+        return float(value)
+
+    @property
+    def dspace_max_retries(self) -> int:
+        """Default number of retries of idempotent requests to DSpace that fail."""
+        value = os.getenv("DSPACE_MAX_RETRIES", "3")
+        return max(int(value), 0)
+
+    @property
+    def dspace_retry_backoff_max(self) -> float:
+        """Default maximum backoff, in seconds, between retries of requests to DSpace."""
+        value = os.getenv("DSPACE_RETRY_BACKOFF_MAX", "30")
+        return float(value)
+
+    @property
+    def dspace_retry_jitter(self) -> float:
+        """Default maximum random jitter, in seconds, added to each retry backoff."""
+        value = os.getenv("DSPACE_RETRY_JITTER", "0.5")
+        return float(value)
+
+    @property
+    def dspace_requests_per_second(self) -> float:
+        """Default request rate limit per DSpace instance, 0 for no limit."""
+        value = os.getenv("DSPACE_REQUESTS_PER_SECOND", "0")
+        return float(value)
+
+    @property
+    def dspace_max_in_flight(self) -> int:
+        """Default cap on in-flight requests per DSpace instance, 0 for no cap."""
+        value = os.getenv("DSPACE_MAX_IN_FLIGHT", "0")
+        return int(value)
+
+    @property
+    def dspace_credentials(self) -> DSpaceCredentials:
         """Return DSpace credentials for supported instances."""
-        credentials = json.loads(self.dss_dspace_credentials)
-        return {
-            "DSpace@MIT": credentials["ir-8"],
-            "IR-8": credentials["ir-8"],
-            "DDC-8": credentials["ddc-8"],
-        }
+        return self.snapshot.dspace_credentials
+
+    def _parse_dspace_credentials(self) -> DSpaceCredentials:
+        try:
+            credentials = json.loads(self.dss_dspace_credentials)
+        except json.JSONDecodeError as exception:
+            raise OSError(
+                f"Env var 'DSS_DSPACE_CREDENTIALS' is not valid JSON: {exception}"
+            ) from exception
+
+        instances: dict[str, Mapping[str, str | float | None]] = {}
+        for instance in sorted(set(self.DSPACE_INSTANCES.values())):
+            entry = credentials.get(instance) if isinstance(credentials, dict) else None
+            if not isinstance(entry, dict):
+                raise OSError(
+                    f"Env var 'DSS_DSPACE_CREDENTIALS' has no entry for '{instance}'"
+                )
+            for field, value in entry.items():
+                if field in self.DSPACE_CREDENTIAL_FIELDS:
+                    valid = isinstance(value, str) and bool(value)
+                elif field in self.DSPACE_INSTANCE_SETTINGS:
+                    valid = isinstance(value, int | float) and not isinstance(value, bool)
+                else:
+                    logger.warning(
+                        "Ignoring unknown field '%s' for '%s' in env var "
+                        "'DSS_DSPACE_CREDENTIALS'",
+                        field,
+                        instance,
+                    )
+                    continue
+                if not valid:
+                    raise OSError(
+                        f"Env var 'DSS_DSPACE_CREDENTIALS' has an invalid '{field}' "
+                        f"for '{instance}'"
+                    )
+            if missing := [f for f in self.DSPACE_CREDENTIAL_FIELDS if f not in entry]:
+                raise OSError(
+                    f"Env var 'DSS_DSPACE_CREDENTIALS' is missing {missing} "
+                    f"for '{instance}'"
+                )
+            instances[instance] = MappingProxyType(entry)
+
+        return MappingProxyType(
+            {
+                destination: instances[instance]
+                for destination, instance in self.DSPACE_INSTANCES.items()
+            }
+        )
+
+    def dspace_instance(self, destination: str) -> str:
+        """Return the DSpace instance key a destination resolves to.
+
+        Destinations that are aliases for the same DSpace instance (e.g. "DSpace@MIT"
+        and "IR-8") share a key, so limits keyed on it apply to the instance as a whole.
+        """
+        return self.DSPACE_INSTANCES.get(destination, destination)
+
+    def dspace_setting(self, destination: str, name: str, default: float) -> float:
+        """Return a numeric setting for a DSpace destination.
+
+        A value set on the destination's entry in DSS_DSPACE_CREDENTIALS takes
+        precedence over the default, which is typically read from an env var.
+        """
+        value = self.dspace_credentials.get(destination, {}).get(name)
+        if value is None:
+            return default
+        return float(value)
 
 
 def configure_logger(
@@ -127,6 +501,8 @@ def configure_sentry() -> None:
     env = os.getenv("WORKSPACE")
     sentry_dsn = os.getenv("SENTRY_DSN")
     if sentry_dsn and sentry_dsn.lower() != "none":
+        import sentry_sdk  # noqa: PLC0415 (slow to import, so only when needed)
+
         sentry_sdk.init(sentry_dsn, environment=env)
         logger.info(f"Sentry DSN found, exceptions will be sent to Sentry with env={env}")
     else:
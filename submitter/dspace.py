@@ -0,0 +1,972 @@
+"""DSpace client wrapper used by submissions.
+
+A DestinationClient wraps an authenticated dspace_rest_client DSpaceClient for a single
+submission destination. Calls that send requests to DSpace are passed through the
+request governor for the destination's DSpace instance, while all other attributes are
+read from the wrapped client as-is.
+
+Bitstreams are uploaded by streaming the file from its location into the request body,
+rather than by DSpaceClient.create_bitstream, which reads the whole file into memory.
+The MD5 checksum of the file is computed as it is streamed and checked against the
+checksum DSpace reports for the new bitstream.
+
+DSpace access tokens (JWTs) expire. A DestinationClient reauthenticates before a
+request if its token is about to expire, and retries a request DSpace rejects as
+unauthorized after reauthenticating. Reauthentication is single-flight per
+destination: the clients of a destination share the most recent token, so when it
+expires only one of them logs in and the others adopt the token it obtained.
+
+The HTTP connections of each client's session are pooled and kept alive by a
+DSpaceHTTPAdapter, configured per destination by mount_http_adapter. The adapter also
+applies connect and read timeouts to every request, and caps them at the time left
+before the deadline of the submission using the client, if it has one. Idempotent
+requests that time out, lose their connection or get a 502, 503 or 504 response are
+retried with jittered exponential backoff; other requests, e.g. creating an item, are
+not, as DSpace may already have carried them out. The outcome of every request is
+recorded on the circuit breaker of its DSpace instance.
+
+Submissions check out clients from a ClientPool, which hands each worker its own
+authenticated client for a destination, creating clients as they are needed or up
+front when the pool is warmed.
+"""
+
+import base64
+import functools
+import hashlib
+import io
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import IO, Any, ClassVar, Literal, cast, overload, override
+
+import smart_open
+from dspace_rest_client.client import DSpaceClient
+from dspace_rest_client.models import Bitstream, Bundle
+from requests import PreparedRequest, Request, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout as RequestsConnectTimeout
+from requests.exceptions import Timeout as RequestsTimeout
+from requests.hooks import default_hooks
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+
+from submitter import errors
+from submitter.config import Config
+from submitter.limits import CircuitBreaker, circuit_breakers, request_governors
+
+logger = logging.getLogger(__name__)
+CONFIG = Config()
+
+MIB = 1024 * 1024
+
+Timeout = float | tuple[float, float] | tuple[float, None] | None
+
+
+class DestinationClient:
+    # DSpaceClient methods used by Submission that send a request to DSpace; methods
+    # named *_iter return an iterator, each step of which may fetch a page
+    GOVERNED_METHODS = frozenset(
+        {
+            "add_metadata",
+            "api_delete",
+            "authenticate",
+            "create_bundle",
+            "create_item",
+            "delete_dso",
+            "get_bitstreams",
+            "get_bundles_iter",
+            "resolve_identifier_to_dso",
+        }
+    )
+
+    def __init__(self, dspace_client: DSpaceClient, destination: str) -> None:
+        self.dspace_client = dspace_client
+        self.destination = destination
+        self.governor = request_governors.get(destination)
+        self.token = shared_tokens.get(destination)
+        self._deadline: Deadline | None = None
+        if authorization := dspace_client.session.headers.get("Authorization"):
+            self.token.update(str(authorization))
+        dspace_client.session.hooks["response"].append(self._retry_unauthorized)
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Get an attribute of the wrapped client, governing methods that call DSpace."""
+        attribute = getattr(self.dspace_client, name)
+        if name in self.GOVERNED_METHODS and name.endswith("_iter"):
+            return functools.partial(self._iterate, attribute)
+        if name in self.GOVERNED_METHODS:
+            return functools.partial(self._call, attribute)
+        return attribute
+
+    @property
+    def deadline(self) -> "Deadline | None":
+        """Deadline by which requests sent with the client must complete, if any."""
+        return self._deadline
+
+    @deadline.setter
+    def deadline(self, deadline: "Deadline | None") -> None:
+        self._deadline = deadline
+        for adapter in self.dspace_client.session.adapters.values():
+            if isinstance(adapter, DSpaceHTTPAdapter):
+                adapter.deadline = deadline
+
+    @contextmanager
+    def deadline_lifted(self) -> Iterator[None]:
+        """Lift the client's deadline, e.g. to clean up after it has passed."""
+        deadline = self.deadline
+        self.deadline = None
+        try:
+            yield
+        finally:
+            self.deadline = deadline
+
+    def _call(self, method: Callable, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        with self.governor.request():
+            if self.deadline is not None:
+                self.deadline.remaining()
+            authorization = self.dspace_client.session.headers.get("Authorization")
+            if token_expiring(authorization):
+                logger.debug(
+                    "DSpace token for destination '%s' is expiring", self.destination
+                )
+                self.reauthenticate(authorization)
+            return method(*args, **kwargs)
+
+    def _iterate(self, method: Callable, *args: Any, **kwargs: Any) -> Iterator[Any]:  # noqa: ANN401
+        """Iterate over the result of a method, governing each step as a request."""
+        iterator = method(*args, **kwargs)
+        while True:
+            try:
+                item = self._call(next, iterator)
+            except StopIteration:
+                return
+            yield item
+
+    def reauthenticate(
+        self, stale: str | bytes | None, failed_at: float | None = None
+    ) -> None:
+        """Replace the client's stale access token, logging in only if needed.
+
+        If another client of the destination has obtained a token since this one's
+        became stale, i.e. since `failed_at` when a request was rejected, that token
+        is used instead of logging in again.
+
+        Raises:
+            DSpaceAuthenticationError: If logging in to DSpace fails.
+        """
+        session = self.dspace_client.session
+        with self.token.lock:
+            current = self.token.authorization
+            if (
+                current
+                and current != stale
+                and not token_expiring(current)
+                and (failed_at is None or self.token.obtained_at > failed_at)
+            ):
+                logger.debug(
+                    "Using DSpace token refreshed for destination '%s'", self.destination
+                )
+                session.headers["Authorization"] = current
+                return
+
+            logger.info(
+                "Reauthenticating to DSpace for destination '%s'", self.destination
+            )
+            session.headers.pop("Authorization", None)
+            with self.governor.request():
+                authenticated = self.dspace_client.authenticate()
+            if not authenticated:
+                raise errors.DSpaceAuthenticationError(
+                    self.dspace_client.API_ENDPOINT, self.dspace_client.USERNAME
+                )
+            if authorization := session.headers.get("Authorization"):
+                self.token.update(str(authorization))
+
+    def _retry_unauthorized(self, response: Response, **_: Any) -> Response:  # noqa: ANN401
+        """Response hook retrying a request rejected as unauthorized.
+
+        Requests sent while logging in are left as-is, as are streamed uploads, which
+        cannot be resent from here and are retried by _upload_bitstream instead.
+        """
+        request = response.request
+        if (
+            response.status_code != 401  # noqa: PLR2004
+            or "/authn/" in (request.url or "")
+            or not isinstance(request.body, bytes | str | None)
+        ):
+            return response
+
+        self.reauthenticate(request.headers.get("Authorization"), sent_at(response))
+        session = self.dspace_client.session
+        retry = request.copy()
+        for header in ("Authorization", "X-XSRF-Token"):
+            if header in session.headers:
+                retry.headers[header] = session.headers[header]
+        retry.headers.pop("Cookie", None)
+        retry.prepare_cookies(session.cookies)
+        retry.hooks = default_hooks()
+        logger.debug(
+            "Retrying request after reauthenticating: %s %s", retry.method, retry.url
+        )
+        return session.send(retry, proxies=self.dspace_client.proxies)
+
+    def create_bitstream(self, bundle: Bundle, name: str, path: str) -> Bitstream | None:
+        """Upload a file and create a bitstream for it in the given bundle.
+
+        A drop-in replacement for DSpaceClient.create_bitstream that streams the file
+        from `path`, a local path or any location supported by smart_open (e.g. an
+        's3://' URI), so memory use does not grow with the size of the file.
+
+        Like DSpaceClient.create_bitstream, the request is retried once with a new CSRF
+        token or after reauthenticating if DSpace rejects it, and None is returned if
+        DSpace responds with an error.
+
+        Raises:
+            BitstreamChecksumError: If the checksum DSpace reports for the bitstream
+                does not match the MD5 checksum of the file as it was uploaded. The
+                bitstream is deleted from DSpace before raising.
+        """
+        return self._call(self._upload_bitstream, bundle, name, path)
+
+    def _upload_bitstream(self, bundle: Bundle, name: str, path: str) -> Bitstream | None:
+        url = f"{self.dspace_client.API_ENDPOINT}/core/bundles/{bundle.uuid}/bitstreams"
+        properties = {"name": name, "metadata": {}, "bundleName": bundle.name}
+        fields = {"properties": json.dumps(properties) + ";application/json"}
+
+        refreshed_csrf = reauthenticated = False
+        while True:
+            with cast("IO[bytes]", smart_open.open(path, "rb")) as file:
+                reader = MD5Reader(file)
+                body = MultipartFileBody(fields, "file", name, reader)
+                response = self._post_multipart(url, body)
+            self.dspace_client.update_token(response)
+
+            if response.status_code in {200, 201}:
+                bitstream = Bitstream(api_resource=response.json())
+                self._verify_checksum(bitstream, name, reader.hexdigest())
+                return bitstream
+            if (
+                response.status_code == 403  # noqa: PLR2004
+                and "CSRF token" in response.text
+                and not refreshed_csrf
+            ):
+                logger.debug("Retrying bitstream upload with updated CSRF token")
+                refreshed_csrf = True
+                continue
+            if response.status_code == 401 and not reauthenticated:  # noqa: PLR2004
+                logger.debug("Retrying bitstream upload after reauthenticating")
+                self.reauthenticate(
+                    response.request.headers.get("Authorization"), sent_at(response)
+                )
+                reauthenticated = True
+                continue
+
+            logger.error(
+                "Error creating bitstream: %s: %s", response.status_code, response.text
+            )
+            return None
+
+    def _verify_checksum(self, bitstream: Bitstream, name: str, md5: str) -> None:
+        checksum = bitstream.checkSum
+        # DSpace reports {"checkSumAlgorithm": ..., "value": ...}; accept a bare value
+        if isinstance(checksum, dict):
+            if checksum.get("checkSumAlgorithm", "MD5") != "MD5":
+                return
+            checksum = checksum.get("value")
+        if not checksum:
+            logger.debug("DSpace did not report a checksum for bitstream '%s'", name)
+            return
+        if checksum == md5:
+            return
+
+        # DSpaceClient.delete_dso does not support bitstreams, so delete by URL
+        try:
+            self.dspace_client.api_delete(
+                url=bitstream.links["self"]["href"], params=None
+            )
+        except Exception:
+            logger.exception("Failed to delete bitstream '%s'", bitstream.uuid)
+        raise errors.BitstreamChecksumError(name, expected=md5, actual=checksum)
+
+    def _post_multipart(self, url: str, body: "MultipartFileBody") -> Response:
+        session = self.dspace_client.session
+        request = session.prepare_request(
+            Request(
+                "POST",
+                url,
+                data=body,
+                headers={
+                    "Content-Type": body.content_type,
+                    "User-Agent": self.dspace_client.USER_AGENT,
+                },
+            )
+        )
+        return session.send(
+            request,
+            proxies=self.dspace_client.proxies,
+            timeout=upload_timeout(self.destination, len(body)),
+        )
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Point in time by which a submission must complete."""
+
+    seconds: float
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(seconds, time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Return the number of seconds left before the deadline.
+
+        Raises:
+            SubmissionDeadlineError: If the deadline has passed.
+        """
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise errors.SubmissionDeadlineError(self.seconds)
+        return remaining
+
+
+def request_timeout(destination: str) -> tuple[float, float]:
+    """Return the (connect, read) timeout of requests to a destination."""
+    return (
+        CONFIG.dspace_setting(
+            destination, "connect_timeout", CONFIG.dspace_connect_timeout
+        ),
+        CONFIG.dspace_setting(destination, "timeout", CONFIG.dspace_timeout),
+    )
+
+
+def upload_timeout(destination: str, size: int) -> tuple[float, float]:
+    """Return the (connect, read) timeout of uploading `size` bytes to a destination.
+
+    The read timeout is extended by DSPACE_UPLOAD_TIMEOUT_PER_MB seconds per MiB, as
+    DSpace only responds once it has stored and checksummed the whole file.
+    """
+    connect, read = request_timeout(destination)
+    per_mib = CONFIG.dspace_setting(
+        destination, "upload_timeout_per_mb", CONFIG.dspace_upload_timeout_per_mb
+    )
+    return connect, read + per_mib * size / MIB
+
+
+def cap_timeout(timeout: Timeout, limit: float) -> tuple[float, float]:
+    """Cap the connect and read timeouts of a request at `limit` seconds."""
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return (
+        limit if connect is None else min(connect, limit),
+        limit if read is None else min(read, limit),
+    )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries of requests that fail transiently.
+
+    Idempotent requests are retried up to `max_retries` times. Other requests are
+    retried, up to `connect_retries` times, only if they failed to connect, as they
+    have then not reached DSpace. The nth retry waits `backoff` * 2^(n-1) seconds, at
+    most `backoff_max`, plus a random jitter of up to `jitter` seconds so that the
+    retries of workers failing at the same time are spread out.
+    """
+
+    max_retries: int = 3
+    connect_retries: int = 2
+    backoff: float = 0.5
+    backoff_max: float = 30
+    jitter: float = 0.5
+
+    METHODS: ClassVar[frozenset[str]] = frozenset(
+        {"DELETE", "GET", "HEAD", "OPTIONS", "PUT"}
+    )
+    STATUSES: ClassVar[frozenset[int]] = frozenset({502, 503, 504})
+
+    def delay(self, retry: int, response: Response | None = None) -> float:
+        """Return the seconds to wait before a retry, numbered from 1.
+
+        A Retry-After header in seconds on the failed response is honored, up to
+        `backoff_max`.
+        """
+        delay = min(self.backoff * 2 ** (retry - 1), self.backoff_max)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay + random.uniform(0, self.jitter)  # noqa: S311
+
+
+def retry_policy(destination: str) -> RetryPolicy:
+    """Return the retry policy of requests to a destination."""
+    return RetryPolicy(
+        max_retries=int(
+            CONFIG.dspace_setting(destination, "max_retries", CONFIG.dspace_max_retries)
+        ),
+        connect_retries=int(
+            CONFIG.dspace_setting(
+                destination, "connect_retries", CONFIG.dspace_connect_retries
+            )
+        ),
+        backoff=CONFIG.dspace_setting(
+            destination, "retry_backoff", CONFIG.dspace_retry_backoff
+        ),
+        backoff_max=CONFIG.dspace_setting(
+            destination, "retry_backoff_max", CONFIG.dspace_retry_backoff_max
+        ),
+        jitter=CONFIG.dspace_setting(
+            destination, "retry_jitter", CONFIG.dspace_retry_jitter
+        ),
+    )
+
+
+class DSpaceHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with default timeouts and optional TCP keep-alive probes.
+
+    Requests sent without a timeout, which includes all those sent by DSpaceClient, use
+    `timeout`. When `deadline` is set, every request's timeouts are capped at the time
+    left before it, and a request is not sent once it has passed.
+
+    Idempotent requests that time out, lose their connection or get a 502, 503 or 504
+    response, and other requests that fail to connect, are retried according to
+    `retry_policy`, if set, as long as the deadline allows. These are the only retries:
+    urllib3 itself retries nothing, so retries do not multiply. Once the retries are
+    used up the last error is raised, or the last response returned, as if the request
+    had not been retried. That outcome is recorded on `circuit_breaker`, if set, as a
+    failure or a success.
+
+    Keep-alive probes stop idle pooled connections from being silently dropped, e.g.
+    by a load balancer, between requests to DSpace. They are sent after a connection
+    has been idle for `keepalive_interval` seconds, and then every `keepalive_interval`
+    seconds, where the platform supports setting those times.
+    """
+
+    __attrs__ = [  # noqa: RUF012
+        *HTTPAdapter.__attrs__,
+        "keepalive_interval",
+        "retry_policy",
+        "timeout",
+    ]
+
+    def __init__(
+        self,
+        keepalive_interval: float = 0,
+        timeout: Timeout = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        # set before HTTPAdapter.__init__, which calls init_poolmanager
+        self.keepalive_interval = keepalive_interval
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.deadline: Deadline | None = None
+        self.sleep: Callable[[float], None] = time.sleep
+        super().__init__(**kwargs)
+
+    @override
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Timeout = None,
+        verify: bool | str = True,
+        cert: bytes | str | tuple[bytes | str, bytes | str] | None = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> Response:
+        if timeout is None:
+            timeout = self.timeout
+        send_kwargs = {
+            "stream": stream,
+            "verify": verify,
+            "cert": cert,
+            "proxies": proxies,
+        }
+        if self.circuit_breaker is None:
+            return self._send(request, timeout, **send_kwargs)
+        try:
+            response = self._send(request, timeout, **send_kwargs)
+        except (RequestsConnectionError, RequestsTimeout) as exception:
+            if not isinstance(exception, errors.SubmissionDeadlineError):
+                self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in RetryPolicy.STATUSES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def _send(
+        self,
+        request: PreparedRequest,
+        timeout: Timeout,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Response:
+        """Send a request, retrying it according to the retry policy."""
+        policy = self.retry_policy
+        idempotent = policy is not None and request.method in policy.METHODS
+        if policy is None:
+            retries = 0
+        else:
+            retries = policy.max_retries if idempotent else policy.connect_retries
+        retry = 0
+        while True:
+            attempt_timeout = timeout
+            if self.deadline is not None:
+                attempt_timeout = cap_timeout(timeout, self.deadline.remaining())
+            try:
+                response = super().send(request, timeout=attempt_timeout, **kwargs)
+            except (RequestsConnectionError, RequestsTimeout) as exception:
+                if not (
+                    idempotent or not_connected(exception)
+                ) or not self._wait_to_retry(request, retry, retries, str(exception)):
+                    raise
+            else:
+                if (
+                    response.status_code not in RetryPolicy.STATUSES
+                    or not idempotent
+                    or not self._wait_to_retry(
+                        request,
+                        retry,
+                        retries,
+                        f"{response.status_code} {response.reason}",
+                        response,
+                    )
+                ):
+                    return response
+            retry += 1
+
+    def _wait_to_retry(
+        self,
+        request: PreparedRequest,
+        retry: int,
+        retries: int,
+        reason: str,
+        response: Response | None = None,
+    ) -> bool:
+        """Wait before retrying a failed request, unless it should not be retried."""
+        if retry >= retries or self.retry_policy is None:
+            return False
+        delay = self.retry_policy.delay(retry + 1, response)
+        if (
+            self.deadline is not None
+            and delay >= self.deadline.expires_at - time.monotonic()
+        ):
+            return False
+        if response is not None:
+            response.close()
+        logger.warning(
+            "Retrying %s %s in %.1f seconds (retry %d of %d) after: %s",
+            request.method,
+            request.url,
+            delay,
+            retry + 1,
+            retries,
+            reason,
+        )
+        self.sleep(delay)
+        return True
+
+    def init_poolmanager(
+        self,
+        connections: int,
+        maxsize: int,
+        block: bool = False,  # noqa: FBT001, FBT002
+        **pool_kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        if self.keepalive_interval > 0:
+            pool_kwargs["socket_options"] = [
+                *HTTPConnection.default_socket_options,
+                *keepalive_socket_options(int(self.keepalive_interval)),
+            ]
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+
+
+def not_connected(exception: Exception) -> bool:
+    """Return whether a request failed to connect to DSpace, so was not sent."""
+    if isinstance(exception, RequestsConnectTimeout):
+        return True
+    reason = getattr(exception.args[0], "reason", None) if exception.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def keepalive_socket_options(interval: int) -> list[tuple[int, int, int]]:
+    """Return socket options enabling TCP keep-alive probes every `interval` seconds."""
+    return [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+        (socket.IPPROTO_TCP, getattr(socket, name), max(interval, 1))
+        for name in ("TCP_KEEPIDLE", "TCP_KEEPINTVL")
+        if hasattr(socket, name)
+    ]
+
+
+def mount_http_adapter(session: Session, destination: str) -> DSpaceHTTPAdapter:
+    """Mount an adapter configured for a destination on a DSpace client's session.
+
+    The adapter times out requests that take longer than DSPACE_CONNECT_TIMEOUT seconds
+    to connect or DSPACE_TIMEOUT seconds to respond, keeps up to DSPACE_POOL_MAXSIZE
+    connections to DSpace open for reuse, and optionally sends TCP keep-alive probes
+    every DSPACE_KEEPALIVE_INTERVAL seconds. Idempotent requests that fail transiently
+    are retried DSPACE_MAX_RETRIES times, and other requests that fail to connect to
+    DSpace DSPACE_CONNECT_RETRIES times, with backoff set by DSPACE_RETRY_BACKOFF,
+    DSPACE_RETRY_BACKOFF_MAX and DSPACE_RETRY_JITTER. The outcome of each request is
+    recorded on the circuit breaker of the destination's DSpace instance. Each setting
+    can be overridden per instance in DSS_DSPACE_CREDENTIALS.
+    """
+    adapter = DSpaceHTTPAdapter(
+        timeout=request_timeout(destination),
+        retry_policy=retry_policy(destination),
+        circuit_breaker=circuit_breakers.get(destination),
+        keepalive_interval=CONFIG.dspace_setting(
+            destination, "keepalive_interval", CONFIG.dspace_keepalive_interval
+        ),
+        pool_maxsize=int(
+            CONFIG.dspace_setting(destination, "pool_maxsize", CONFIG.dspace_pool_maxsize)
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
+
+
+def sent_at(response: Response) -> float:
+    """Return the time.monotonic() time at which the request for a response was sent."""
+    return time.monotonic() - response.elapsed.total_seconds()
+
+
+@functools.lru_cache(maxsize=64)
+def token_expiry(authorization: str | bytes | None) -> float | None:
+    """Return the expiry time, in seconds since the epoch, of a JWT bearer token.
+
+    The token is not verified, only decoded. Returns None if the token is not a JWT or
+    has no expiry time.
+    """
+    if not authorization:
+        return None
+    if isinstance(authorization, bytes):
+        authorization = authorization.decode()
+    try:
+        payload = authorization.removeprefix("Bearer ").split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def token_expiring(authorization: str | bytes | None) -> bool:
+    """Return whether a token expires within DSPACE_TOKEN_REFRESH_MARGIN seconds."""
+    expiry = token_expiry(authorization)
+    return (
+        expiry is not None and time.time() >= expiry - CONFIG.dspace_token_refresh_margin
+    )
+
+
+class SharedToken:
+    """The most recent access token obtained by any client of a DSpace instance."""
+
+    def __init__(self) -> None:
+        # held while reauthenticating, so clients of the instance log in one at a
+        # time and those waiting can use the token obtained by the first
+        self.lock = threading.Lock()
+        self.authorization: str | None = None
+        self.obtained_at = float("-inf")
+
+    def update(self, authorization: str) -> None:
+        self.authorization = authorization
+        self.obtained_at = time.monotonic()
+
+
+class SharedTokens:
+    """Registry of shared access tokens, one per DSpace instance.
+
+    Destinations that are aliases for the same instance share its token.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: dict[str, SharedToken] = {}
+
+    def get(self, destination: str) -> SharedToken:
+        instance = CONFIG.dspace_instance(destination)
+        with self._lock:
+            return self._tokens.setdefault(instance, SharedToken())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+# Shared registry of the access tokens of each DSpace instance's clients
+shared_tokens = SharedTokens()
+
+
+@dataclass
+class _DestinationClients:
+    # clients checked in and not in use, with the time each was checked in, most
+    # recently checked in last
+    idle: list[tuple[float, DestinationClient]] = field(default_factory=list)
+    # clients created and not evicted, whether idle or checked out
+    size: int = 0
+
+
+class ClientPool:
+    """Thread-safe pool of authenticated DestinationClients, per DSpace instance.
+
+    A DSpaceClient has a single requests.Session and CSRF token, so rather than being
+    shared, a client is checked out by one worker at a time and checked in when the
+    worker is done with it. A new client is created by `factory`, which is expected to
+    authenticate it, when a worker checks one out and none is idle. Destinations that
+    are aliases for the same instance (e.g. "DSpace@MIT" and "IR-8") share its clients.
+
+    The number of clients per instance is capped by DSPACE_CLIENT_POOL_SIZE (or
+    'client_pool_size' in DSS_DSPACE_CREDENTIALS), with workers waiting for a client to
+    be checked in once the cap is reached. Clients idle for longer than
+    DSPACE_CLIENT_IDLE_TIMEOUT are closed and removed from the pool.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], DestinationClient],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.factory = factory
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._clients: dict[str, _DestinationClients] = {}
+
+    @contextmanager
+    def checkout(self, destination: str) -> Iterator[DestinationClient]:
+        """Check out a client for a destination, creating one if none is idle."""
+        client = self._acquire(destination)
+        try:
+            yield client
+        finally:
+            self._release(destination, client)
+
+    @contextmanager
+    def try_checkout(self, destination: str) -> Iterator[DestinationClient | None]:
+        """Check out a client as checkout() does, but without waiting for one.
+
+        Yields None if the instance's pool is full and none of its clients is idle.
+        """
+        client = self._acquire(destination, wait=False)
+        if client is None:
+            yield None
+            return
+        try:
+            yield client
+        finally:
+            self._release(destination, client)
+
+    @overload
+    def _acquire(self, destination: str) -> DestinationClient: ...
+
+    @overload
+    def _acquire(
+        self, destination: str, *, wait: Literal[False]
+    ) -> DestinationClient | None: ...
+
+    def _acquire(
+        self, destination: str, *, wait: bool = True
+    ) -> DestinationClient | None:
+        max_size = int(
+            CONFIG.dspace_setting(
+                destination, "client_pool_size", CONFIG.dspace_client_pool_size
+            )
+        )
+        instance = CONFIG.dspace_instance(destination)
+        with self._condition:
+            self._evict_idle()
+            clients = self._clients.setdefault(instance, _DestinationClients())
+            while not clients.idle and 0 < max_size <= clients.size:
+                if not wait:
+                    return None
+                logger.debug(
+                    "Waiting for a DSpace client for instance '%s' (max=%d)",
+                    instance,
+                    max_size,
+                )
+                self._condition.wait()
+            if clients.idle:
+                logger.debug(f"Using pooled DSpace client for instance '{instance}'")
+                return clients.idle.pop()[1]
+            clients.size += 1
+
+        # create the client without holding the lock, so clients are created and
+        # authenticated concurrently
+        try:
+            return self.factory(destination)
+        except BaseException:
+            with self._condition:
+                clients.size -= 1
+                self._condition.notify_all()
+            raise
+
+    def _release(self, destination: str, client: DestinationClient) -> None:
+        client.deadline = None
+        with self._condition:
+            clients = self._clients.setdefault(
+                CONFIG.dspace_instance(destination), _DestinationClients()
+            )
+            clients.idle.append((self._clock(), client))
+            self._condition.notify_all()
+
+    def _evict_idle(self) -> None:
+        idle_timeout = CONFIG.dspace_client_idle_timeout
+        if idle_timeout <= 0:
+            return
+        expired_before = self._clock() - idle_timeout
+        for instance, clients in self._clients.items():
+            # clients are checked in in order, so the expired clients come first
+            expired = 0
+            while (
+                expired < len(clients.idle) and clients.idle[expired][0] < expired_before
+            ):
+                expired += 1
+            if not expired:
+                continue
+            logger.debug(
+                "Closing %d idle DSpace client(s) for instance '%s'",
+                expired,
+                instance,
+            )
+            for _, client in clients.idle[:expired]:
+                client.dspace_client.session.close()
+            del clients.idle[:expired]
+            clients.size -= expired
+
+    def sizes(self) -> dict[str, int]:
+        """Return the number of clients in the pool for each DSpace instance."""
+        with self._condition:
+            return {
+                instance: clients.size
+                for instance, clients in self._clients.items()
+                if clients.size
+            }
+
+    def warm(self, destinations: Iterable[str]) -> None:
+        """Create a client for the DSpace instance of each destination in parallel.
+
+        Instances that already have a client in the pool are skipped, as are aliases
+        for an instance already being warmed. Returns once every client has been
+        created, or raises the first exception raised while creating one without
+        waiting for the others.
+        """
+        sizes = self.sizes()
+        instances: dict[str, str] = {}
+        for destination in destinations:
+            instances.setdefault(CONFIG.dspace_instance(destination), destination)
+        pending = [d for instance, d in instances.items() if not sizes.get(instance)]
+        if not pending:
+            return
+        logger.info("Creating DSpace clients for destinations: %s", pending)
+        executor = ThreadPoolExecutor(
+            max_workers=len(pending), thread_name_prefix="submitter-client"
+        )
+        try:
+            futures = [executor.submit(self._warm, d) for d in pending]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if exception := future.exception():
+                    raise exception
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _warm(self, destination: str) -> None:
+        with self.checkout(destination):
+            pass
+
+    def clear(self) -> None:
+        """Close the idle clients and remove all clients from the pool."""
+        with self._condition:
+            for clients in self._clients.values():
+                for _, client in clients.idle:
+                    client.dspace_client.session.close()
+            self._clients.clear()
+            self._condition.notify_all()
+
+
+class MD5Reader:
+    """Wrap a binary stream, computing the MD5 checksum of the bytes read from it."""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self.file = file
+        self._md5 = hashlib.md5()  # noqa: S324
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self._md5.update(data)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def hexdigest(self) -> str:
+        return self._md5.hexdigest()
+
+
+class MultipartFileBody:
+    """A multipart/form-data request body that reads a file part from a stream.
+
+    The body is a read-only file-like object: requests sends it in chunks as it is
+    read, instead of encoding the whole body in memory. Its length, which requests uses
+    for the Content-Length header, is computed up front by seeking to the end of the
+    file, so the stream must be seekable.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        file_field: str,
+        filename: str,
+        file: "IO[bytes] | MD5Reader",
+    ) -> None:
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        head = b"".join(
+            self._part_header(f'name="{field}"') + value.encode() + b"\r\n"
+            for field, value in fields.items()
+        ) + self._part_header(f'name="{file_field}"; filename="{filename}"')
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+        file_size = file.seek(0, io.SEEK_END)
+        file.seek(0)
+        self._length = len(head) + file_size + len(tail)
+        self._parts: list[IO[bytes] | MD5Reader] = [
+            io.BytesIO(head),
+            file,
+            io.BytesIO(tail),
+        ]
+
+    def _part_header(self, disposition: str) -> bytes:
+        return (
+            f"--{self.boundary}\r\nContent-Disposition: form-data; {disposition}\r\n\r\n"
+        ).encode()
+
+    def __len__(self) -> int:
+        """Return the length of the body in bytes."""
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes of the body, or the rest of it if `size` < 0."""
+        if size < 0:
+            return b"".join(part.read() for part in self._parts)
+        while self._parts:
+            if chunk := self._parts[0].read(size):
+                return chunk
+            self._parts.pop(0)
+        return b""
@@ -7,7 +7,7 @@ Service.
 
 import logging
 
-from requests.exceptions import RequestException
+from requests.exceptions import RequestException, Timeout
 
 from submitter.config import Config
 
@@ -95,12 +95,33 @@ class BitstreamError(SubmissionError):
     """
 
 
+class BitstreamChecksumError(Exception):
+    """Exception raised when the checksum of an uploaded bitstream does not match.
+
+    Args:
+        name: The name of the uploaded bitstream
+        expected: The MD5 checksum of the file read from its location
+        actual: The MD5 checksum of the bitstream reported by DSpace
+
+    Attributes:
+        message(str): Explanation of the error
+    """
+
+    def __init__(self, name: str, expected: str, actual: str):
+        message = (
+            f"Checksum of bitstream '{name}' reported by DSpace ({actual}) does not "
+            f"match the checksum of the uploaded file ({expected})"
+        )
+        super().__init__(message)
+
+
 class DSpaceTimeoutError(Exception):
     """Exception raised due to a DSpace server timeout.
 
     Args:
         source_error: Originating Exception
         submission: Submission instance for which the error occurred
+        timeout: Number of seconds exceeded, if not DSPACE_TIMEOUT
 
     Attributes:
         source_error(Exception): Originating exception
@@ -111,18 +132,42 @@ class DSpaceTimeoutError(Exception):
         self,
         dspace_url: str,
         submission_attributes: dict,
+        timeout: float | None = None,
     ):
         message = (
-            f"DSpace server at '{dspace_url}' took more than {CONFIG.dspace_timeout} "
-            "seconds to respond. Aborting DSpace Submission Service processing until "
-            "this can be investigated.\nNOTE: The submission in process when this "
-            "occurred likely has partially published data in DSpace. The package id "
+            f"DSpace server at '{dspace_url}' took more than "
+            f"{timeout or CONFIG.dspace_timeout} seconds to respond. Aborting DSpace "
+            "Submission Service processing until this can be investigated.\nNOTE: The "
+            "submission in process when this occurred likely has partially published "
+            "data in DSpace. The package id "
             f"of the submission was '{submission_attributes['PackageID']}', from "
             f"source '{submission_attributes['SubmissionSource']}'"
         )
         super().__init__(message)
 
 
+class SubmissionDeadlineError(Timeout):
+    """Exception raised when a submission to DSpace runs past its deadline.
+
+    A Timeout, so that requests to DSpace are not retried past it. Unlike a request
+    timing out, it fails only the submission, which gets an error result.
+
+    Args:
+        deadline: Number of seconds the submission was allowed to run for
+
+    Attributes:
+        timeout(float): Number of seconds the submission was allowed to run for
+        message(str): Explanation of the error
+    """
+
+    def __init__(self, deadline: float):
+        self.timeout = deadline
+        super().__init__(
+            f"Submission to DSpace did not complete within its deadline of {deadline} "
+            "seconds"
+        )
+
+
 class DSpaceAuthenticationError(Exception):
     """Exception raised due to a failure to authenticate to the DSpace server.
 
@@ -0,0 +1,237 @@
+"""Index of create submissions by package, so redelivered messages are not resubmitted.
+
+A message can be delivered again after its item was created in DSpace, e.g. if its
+visibility timeout expires or the service stops before the message is deleted.
+Submissions claim their package in the index before submitting, record the handle of
+the item once it is created, and store their result once complete, so that a
+redelivered message can re-send the stored result instead of creating a duplicate
+item.
+
+The index is stored in SQLite, in memory unless IDEMPOTENCY_DB_PATH is set to a file
+that persists across restarts, as it must be in deployed workspaces. Records expire
+after IDEMPOTENCY_TTL seconds, which should be no shorter than the message retention
+period of the input queue, as a message can only be redelivered until then. Other
+backends can implement IdempotencyIndex.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from submitter.config import Config
+
+logger = logging.getLogger(__name__)
+CONFIG = Config()
+
+# a package is identified by its PackageID and SubmissionSource message attributes
+PackageKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class SubmissionRecord:
+    """A create submission of a package, as recorded in the index.
+
+    `status` is "in-progress" or "completed". `active` is set on in-progress records
+    claimed by a submission still running in this process, as opposed to one that
+    was interrupted, e.g. by the service stopping.
+    """
+
+    status: str
+    item_handle: str | None = None
+    result_message: dict | str | None = None
+    active: bool = False
+
+
+class IdempotencyIndex(ABC):
+    """Record of the create submissions of packages.
+
+    Implementations must be safe to use from several worker threads.
+    """
+
+    @abstractmethod
+    def claim(self, key: PackageKey) -> SubmissionRecord | None:
+        """Claim a package for submission.
+
+        Returns None if the package was claimed, either because it has no record or
+        because a previous submission of it was interrupted before creating an item.
+        Otherwise returns its record, leaving it unchanged.
+        """
+
+    @abstractmethod
+    def record_item(self, key: PackageKey, item_handle: str) -> None:
+        """Record the handle of the item created by a claimed submission."""
+
+    @abstractmethod
+    def complete(
+        self,
+        key: PackageKey,
+        result_message: dict | str | None,
+        item_handle: str | None = None,
+    ) -> None:
+        """Record the result of a submission that completed, even if not claimed."""
+
+    @abstractmethod
+    def release(self, key: PackageKey) -> None:
+        """Release a claim on a package that did not complete.
+
+        The record is kept if an item was created, so that a later submission of the
+        package is not left to create a second one; otherwise it is removed.
+        """
+
+    @abstractmethod
+    def discard(self, key: PackageKey) -> None:
+        """Remove the record of a package, so that it can be submitted again."""
+
+
+class SQLiteIdempotencyIndex(IdempotencyIndex):
+    """IdempotencyIndex stored in a SQLite database.
+
+    The database is opened the first time the index is used, at `path` if given or
+    IDEMPOTENCY_DB_PATH otherwise. A path of ":memory:" keeps it in memory.
+
+    Records not updated for `ttl` seconds, IDEMPOTENCY_TTL unless given, are ignored
+    when claiming, and deleted the first time a package is claimed and then at most
+    every PRUNE_INTERVAL seconds.
+    """
+
+    PRUNE_INTERVAL = 3600.0
+
+    def __init__(self, path: str | None = None, ttl: float | None = None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pruned_at: float | None = None
+        # claims held by submissions running in this process
+        self._active: set[PackageKey] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            path = self.path or CONFIG.idempotency_db_path
+            self._connection = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                "package_id TEXT NOT NULL, "
+                "source TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "item_handle TEXT, "
+                "result_message TEXT, "
+                "updated_at REAL NOT NULL, "
+                "PRIMARY KEY (package_id, source))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS submissions_updated_at "
+                "ON submissions (updated_at)"
+            )
+            logger.debug("Opened idempotency index at %s", path)
+        return self._connection
+
+    def _expired_before(self) -> float:
+        """Return the time before which records expired, 0 if they do not expire."""
+        ttl = CONFIG.idempotency_ttl if self.ttl is None else self.ttl
+        return time.time() - ttl if ttl > 0 else 0.0
+
+    def _prune(self, connection: sqlite3.Connection, expired_before: float) -> None:
+        """Delete expired records, unless they were deleted within PRUNE_INTERVAL."""
+        now = time.monotonic()
+        if not expired_before or (
+            self._pruned_at is not None and now - self._pruned_at < self.PRUNE_INTERVAL
+        ):
+            return
+        self._pruned_at = now
+        deleted = connection.execute(
+            "DELETE FROM submissions WHERE updated_at < ?", (expired_before,)
+        ).rowcount
+        if deleted:
+            logger.info("Pruned %d expired records from idempotency index", deleted)
+
+    def claim(self, key: PackageKey) -> SubmissionRecord | None:
+        with self._lock:
+            connection = self._connect()
+            expired_before = self._expired_before()
+            self._prune(connection, expired_before)
+            row = connection.execute(
+                "SELECT status, item_handle, result_message FROM submissions "
+                "WHERE package_id = ? AND source = ? AND updated_at >= ?",
+                (*key, expired_before),
+            ).fetchone()
+            if row is not None:
+                status, item_handle, result_message = row
+                if status == "completed" or item_handle or key in self._active:
+                    return SubmissionRecord(
+                        status,
+                        item_handle,
+                        json.loads(result_message) if result_message else None,
+                        active=key in self._active,
+                    )
+            connection.execute(
+                "INSERT OR REPLACE INTO submissions "
+                "(package_id, source, status, updated_at) "
+                "VALUES (?, ?, 'in-progress', ?)",
+                (*key, time.time()),
+            )
+            self._active.add(key)
+            return None
+
+    def record_item(self, key: PackageKey, item_handle: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE submissions SET item_handle = ?, updated_at = ? "
+                "WHERE package_id = ? AND source = ?",
+                (item_handle, time.time(), *key),
+            )
+
+    def complete(
+        self,
+        key: PackageKey,
+        result_message: dict | str | None,
+        item_handle: str | None = None,
+    ) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO submissions "
+                "(package_id, source, status, item_handle, result_message, updated_at) "
+                "VALUES (?, ?, 'completed', ?, ?, ?) "
+                "ON CONFLICT (package_id, source) DO UPDATE SET "
+                "status = excluded.status, "
+                "item_handle = COALESCE(excluded.item_handle, item_handle), "
+                "result_message = excluded.result_message, "
+                "updated_at = excluded.updated_at",
+                (*key, item_handle, json.dumps(result_message), time.time()),
+            )
+            self._active.discard(key)
+
+    def release(self, key: PackageKey) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM submissions WHERE package_id = ? AND source = ? "
+                "AND status = 'in-progress' AND item_handle IS NULL",
+                key,
+            )
+            self._active.discard(key)
+
+    def discard(self, key: PackageKey) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM submissions WHERE package_id = ? AND source = ?", key
+            )
+            self._active.discard(key)
+
+    def clear(self) -> None:
+        """Close the database, so that the index is opened again when next used."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
+            self._pruned_at = None
+            self._active.clear()
+
+
+# Shared index of create submissions
+submission_index = SQLiteIdempotencyIndex()
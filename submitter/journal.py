@@ -0,0 +1,200 @@
+"""Journal of the changes submissions make in DSpace, to recover from crashes.
+
+A submission that is interrupted in-process cleans up the item it partially created,
+but one interrupted by the service being killed cannot. When SUBMISSION_JOURNAL_PATH
+is set, each submission records an entry in a SQLite journal before it changes
+DSpace, and a step as soon as DSpace has created each object: the item, its bundle and
+each bitstream uploaded. The entry is removed once the submission has its result.
+Entries left behind are reconciled when the service starts, or when their message is
+received again, by resuming the remaining uploads or cleaning up. Entries of
+submissions still running in this process, e.g. of a message received again after its
+visibility timeout expired, are not reconciled.
+
+Each step is committed to the journal before the submission continues, but an object
+DSpace creates just before the service is killed, and whose response was not yet
+received, cannot be recorded.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from dspace_rest_client.models import DSpaceObject
+
+from submitter.config import Config
+
+logger = logging.getLogger(__name__)
+CONFIG = Config()
+
+
+@dataclass
+class JournalEntry:
+    """The steps journaled by the submission of a message.
+
+    `submission` holds the arguments to recreate the Submission. `bitstreams` maps the
+    index of each uploaded file in the submission's files to its bitstream.
+    """
+
+    message_id: str
+    submission: dict
+    item: dict | None = None
+    bundle: dict | None = None
+    bitstreams: dict[int, dict] = field(default_factory=dict)
+    bitstream_deleted: bool = False
+
+
+class SubmissionJournal:
+    """Journal of submissions stored in a SQLite database.
+
+    The journal is disabled, and every method a no-op, unless a path is passed or
+    SUBMISSION_JOURNAL_PATH is set. The database is opened the first time it is used,
+    in WAL mode with every commit synced to disk.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        # messages of entries whose submissions are running in this process
+        self._active: set[str] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or CONFIG.submission_journal_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            path = self.path or CONFIG.submission_journal_path or ":memory:"
+            self._connection = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=FULL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "message_id TEXT PRIMARY KEY, "
+                "submission TEXT NOT NULL, "
+                "started_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS steps ("
+                "message_id TEXT NOT NULL, "
+                "step TEXT NOT NULL, "
+                "file_index INTEGER, "
+                "resource TEXT NOT NULL, "
+                "recorded_at REAL NOT NULL)"
+            )
+            logger.debug("Opened submission journal at %s", path)
+        return self._connection
+
+    def begin(self, message_id: str, submission: dict) -> bool:
+        """Start the entry of a message, replacing any previous one.
+
+        The entry is active until it is finished or released. Returns whether the
+        entry was recorded, i.e. whether the journal is enabled.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            connection.execute("DELETE FROM steps WHERE message_id = ?", (message_id,))
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (message_id, json.dumps(submission), time.time()),
+            )
+            connection.execute("COMMIT")
+            self._active.add(message_id)
+        return True
+
+    def record(
+        self,
+        message_id: str,
+        step: str,
+        dso: DSpaceObject,
+        file_index: int | None = None,
+    ) -> None:
+        """Record a step: "item", "bundle", "bitstream" or "bitstream-deleted"."""
+        if not self.enabled:
+            return
+        resource = {**dso.as_dict(), "_links": dso.links}
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO steps VALUES (?, ?, ?, ?, ?)",
+                (message_id, step, file_index, json.dumps(resource), time.time()),
+            )
+
+    def finish(self, message_id: str) -> None:
+        """Remove the entry of a message whose submission has its result."""
+        if not self.enabled:
+            return
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            connection.execute("DELETE FROM steps WHERE message_id = ?", (message_id,))
+            connection.execute("DELETE FROM entries WHERE message_id = ?", (message_id,))
+            connection.execute("COMMIT")
+            self._active.discard(message_id)
+
+    def release(self, message_id: str) -> None:
+        """Keep the entry of a submission that stopped without a result, to reconcile."""
+        with self._lock:
+            self._active.discard(message_id)
+
+    def active(self, message_id: str) -> bool:
+        """Return whether the submission of a message is running in this process."""
+        with self._lock:
+            return message_id in self._active
+
+    def get(self, message_id: str) -> JournalEntry | None:
+        if not self.enabled:
+            return None
+        entries = self._read("WHERE message_id = ?", (message_id,))
+        return entries[0] if entries else None
+
+    def entries(self) -> list[JournalEntry]:
+        """Return all entries, oldest first."""
+        if not self.enabled:
+            return []
+        return self._read("ORDER BY started_at", ())
+
+    def _read(self, clause: str, parameters: tuple) -> list[JournalEntry]:
+        with self._lock:
+            connection = self._connect()
+            entries = {
+                message_id: JournalEntry(message_id, json.loads(submission))
+                for message_id, submission in connection.execute(
+                    f"SELECT message_id, submission FROM entries {clause}",  # noqa: S608
+                    parameters,
+                )
+            }
+            steps = connection.execute(
+                "SELECT message_id, step, file_index, resource FROM steps ORDER BY rowid"
+            ).fetchall()
+        for message_id, step, file_index, resource in steps:
+            if (entry := entries.get(message_id)) is None:
+                continue
+            if step == "item":
+                entry.item = json.loads(resource)
+            elif step == "bundle":
+                entry.bundle = json.loads(resource)
+            elif step == "bitstream":
+                entry.bitstreams[file_index] = json.loads(resource)
+            elif step == "bitstream-deleted":
+                entry.bitstream_deleted = True
+        return list(entries.values())
+
+    def clear(self) -> None:
+        """Close the database, so that the journal is opened again when next used."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
+            self._active.clear()
+
+
+# Shared journal of submissions
+submission_journal = SubmissionJournal()
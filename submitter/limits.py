@@ -0,0 +1,298 @@
+"""Limits on how hard the DSpace Submission Service drives each DSpace instance."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from submitter.config import Config
+
+logger = logging.getLogger(__name__)
+CONFIG = Config()
+
+
+class ConcurrencyLimiter:
+    """Cap the number of concurrent holders of a slot, per key.
+
+    A semaphore is created for a key the first time a slot is requested for it, sized
+    to the limit passed at that time. A limit of zero or less means no cap.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+    @contextmanager
+    def slot(self, key: str, limit: int) -> Iterator[None]:
+        if limit <= 0:
+            yield
+            return
+
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(limit)
+            semaphore = self._semaphores[key]
+
+        if not semaphore.acquire(blocking=False):
+            logger.debug("Waiting for a free slot for '%s' (limit=%d)", key, limit)
+            semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._semaphores.clear()
+
+
+# Shared limiter capping concurrent submissions per DSpace instance
+submission_slots = ConcurrencyLimiter()
+
+# Shared limiter capping concurrent bitstream uploads per DSpace instance
+upload_slots = ConcurrencyLimiter()
+
+
+class TokenBucket:
+    """Token bucket limiting the rate of requests.
+
+    Tokens accrue at `rate` per second, up to `capacity`. Each call to acquire() takes
+    one token; when none are available the caller reserves the next token to accrue
+    and sleeps until it does, so waiting callers are admitted in turn rather than all
+    at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def acquire(self) -> float:
+        """Take a token, returning the number of seconds waited for it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class RequestGovernor:
+    """Request-rate and in-flight limits for the requests sent to one DSpace instance.
+
+    A limit of zero or less disables that limit. A request governed while the same
+    thread is already in one, e.g. to reauthenticate during a call, counts against the
+    rate limit but reuses the thread's in-flight slot.
+    """
+
+    def __init__(self, requests_per_second: float, max_in_flight: int) -> None:
+        self.bucket = (
+            TokenBucket(requests_per_second) if requests_per_second > 0 else None
+        )
+        self.in_flight = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None
+        )
+        self._local = threading.local()
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        if self.in_flight is not None and depth == 0:
+            self.in_flight.acquire()
+        self._local.depth = depth + 1
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            yield
+        finally:
+            self._local.depth = depth
+            if self.in_flight is not None and depth == 0:
+                self.in_flight.release()
+
+
+class RequestGovernors:
+    """Registry of request governors, one per DSpace instance."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._governors: dict[str, RequestGovernor] = {}
+
+    def get(self, destination: str) -> RequestGovernor:
+        """Get the governor for a destination, creating it from config if needed."""
+        instance = CONFIG.dspace_instance(destination)
+        with self._lock:
+            if instance not in self._governors:
+                governor = RequestGovernor(
+                    requests_per_second=CONFIG.dspace_setting(
+                        destination,
+                        "requests_per_second",
+                        CONFIG.dspace_requests_per_second,
+                    ),
+                    max_in_flight=int(
+                        CONFIG.dspace_setting(
+                            destination, "max_in_flight", CONFIG.dspace_max_in_flight
+                        )
+                    ),
+                )
+                self._governors[instance] = governor
+            return self._governors[instance]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._governors.clear()
+
+
+# Shared registry of governors for requests sent to each DSpace instance
+request_governors = RequestGovernors()
+
+
+class CircuitBreaker:
+    """Stop submitting to a DSpace instance while its requests keep failing.
+
+    The breaker is closed while requests to the instance succeed. Once `threshold`
+    consecutive requests have failed it opens, and submissions to the instance are
+    deferred for `reset_timeout` seconds. It then half-opens and lets a single
+    submission through as a probe: the breaker closes if the probe's next request
+    succeeds, and opens again if it fails. Another probe is let through if the first
+    has not sent a request within `reset_timeout` seconds.
+
+    A threshold of zero or less disables the breaker, which then stays closed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_sent_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Return "closed", "open" or "half-open"."""
+        with self._lock:
+            return self._state(self._clock())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        """Return whether a submission may be sent, letting a probe through if due."""
+        with self._lock:
+            now = self._clock()
+            state = self._state(now)
+            if state != "half-open":
+                return state == "closed"
+            if (
+                self._probe_sent_at is not None
+                and now - self._probe_sent_at < self.reset_timeout
+            ):
+                return False
+            self._probe_sent_at = now
+        logger.info("Circuit breaker for '%s' half-open, sending a probe", self.name)
+        return True
+
+    def retry_after(self) -> float:
+        """Return the seconds until the breaker may next let a submission through."""
+        with self._lock:
+            now = self._clock()
+            since = self._probe_sent_at or self._opened_at
+            if since is None:
+                return 0.0
+            return max(since + self.reset_timeout - now, 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            closed = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = self._probe_sent_at = None
+        if closed:
+            logger.info("Circuit breaker for '%s' closed", self.name)
+
+    def record_failure(self) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            now = self._clock()
+            self._failures += 1
+            state = self._state(now)
+            opened = state == "half-open" or (
+                state == "closed" and self._failures >= self.threshold
+            )
+            if opened:
+                self._opened_at = now
+                self._probe_sent_at = None
+        if opened:
+            logger.warning(
+                "Circuit breaker for '%s' opened after %d consecutive failed requests, "
+                "deferring submissions for %s seconds",
+                self.name,
+                self._failures,
+                self.reset_timeout,
+            )
+
+
+class CircuitBreakers:
+    """Registry of circuit breakers, one per DSpace instance."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, destination: str) -> CircuitBreaker:
+        """Get the breaker for a destination, creating it from config if needed."""
+        instance = CONFIG.dspace_instance(destination)
+        with self._lock:
+            if instance not in self._breakers:
+                self._breakers[instance] = CircuitBreaker(
+                    instance,
+                    threshold=int(
+                        CONFIG.dspace_setting(
+                            destination,
+                            "circuit_breaker_threshold",
+                            CONFIG.dspace_circuit_breaker_threshold,
+                        )
+                    ),
+                    reset_timeout=CONFIG.dspace_setting(
+                        destination,
+                        "circuit_breaker_reset",
+                        CONFIG.dspace_circuit_breaker_reset,
+                    ),
+                )
+            return self._breakers[instance]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+# Shared registry of circuit breakers for each DSpace instance
+circuit_breakers = CircuitBreakers()
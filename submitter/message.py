@@ -2,9 +2,13 @@ import json
 import logging
 from collections.abc import Iterator
 from functools import lru_cache
+from importlib.resources import files
 from typing import TYPE_CHECKING
 
 import jsonschema
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 
 if TYPE_CHECKING:
     from mypy_boto3_sqs.service_resource import Message
@@ -18,11 +22,16 @@ CONFIG = Config()
 
 @lru_cache
 def load_jsonschemas() -> dict:
-    """Load SQS message attributes and body JSON Schema docs."""
+    """Load SQS message attributes and body JSON Schema docs.
+
+    The schemas are read from the installed 'submitter' package, so they are found
+    regardless of the current working directory.
+    """
     logger.debug("Loading JSON schemas to cache")
+    schemas = files("submitter").joinpath("schemas")
 
     # load SQS message attributes validation schema
-    with open("submitter/schemas/submission-message-attributes.json") as file:
+    with schemas.joinpath("submission-message-attributes.json").open() as file:
         attributes_schema = json.load(file)
         # set constraint on "OutputQueue" using CONFIG
         attributes_schema["properties"]["OutputQueue"]["properties"]["StringValue"][
@@ -30,7 +39,7 @@ def load_jsonschemas() -> dict:
         ] = CONFIG.output_queues
 
     # load SQS message body validation schema
-    with open("submitter/schemas/submission-message-body.json") as file:
+    with schemas.joinpath("submission-message-body.json").open() as file:
         body_schema = json.load(file)
 
     return {
@@ -39,15 +48,36 @@ def load_jsonschemas() -> dict:
     }
 
 
+@lru_cache
+def load_validators() -> dict[str, Validator]:
+    """Create validators for the JSON Schema docs from load_jsonschemas.
+
+    Each schema is checked once, when its validator is created, rather than every time
+    a message is validated. Validators do not change once created, so they are shared
+    across messages and threads.
+    """
+    validators = {}
+    for name, schema in load_jsonschemas().items():
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        validators[name] = validator_class(
+            schema, format_checker=validator_class.FORMAT_CHECKER
+        )
+    return validators
+
+
+def _validate(validator: Validator, instance: object) -> None:
+    """Raise the most relevant error for an instance, as jsonschema.validate does."""
+    if error := best_match(validator.iter_errors(instance)):
+        raise error
+
+
 def validate_message(message: "Message") -> tuple[dict, dict]:
-    schemas = load_jsonschemas()
+    validators = load_validators()
 
     # validate message attributes
     try:
-        jsonschema.validate(
-            instance=message.message_attributes,
-            schema=schemas["submission-message-attributes"],
-        )
+        _validate(validators["submission-message-attributes"], message.message_attributes)
     except jsonschema.ValidationError as exception:
         raise errors.SubmissionMessageAttributesValidationError(
             exception.message
@@ -56,7 +86,7 @@ def validate_message(message: "Message") -> tuple[dict, dict]:
     # parse and validate message body JSON string
     try:
         body = json.loads(message.body)
-        jsonschema.validate(instance=body, schema=schemas["submission-message-body"])
+        _validate(validators["submission-message-body"], body)
     except json.JSONDecodeError as exception:
         error_message = (
             "Unable to parse submission message body. Message "
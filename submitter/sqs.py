@@ -1,23 +1,40 @@
 import hashlib
 import json
 import logging
-from typing import TYPE_CHECKING
+import math
+import queue as stdlib_queue
+import signal
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass
+from functools import cached_property
+from types import FrameType, TracebackType
+from typing import TYPE_CHECKING, Self
 
 import boto3
 
 from submitter import errors
 from submitter.config import Config
-from submitter.submission import Submission
+from submitter.limits import CircuitBreaker, circuit_breakers, submission_slots
 
 if TYPE_CHECKING:
     from mypy_boto3_sqs.service_resource import Message, Queue, SQSServiceResource
-    from mypy_boto3_sqs.type_defs import SendMessageResultTypeDef
+    from mypy_boto3_sqs.type_defs import (
+        SendMessageBatchResultEntryTypeDef,
+        SendMessageResultTypeDef,
+    )
+
+    from submitter.submission import Submission
 
 logger = logging.getLogger(__name__)
 CONFIG = Config()
 
 # Cache for SQS queues
 _sqs_queues: dict[str, "Queue"] = {}
+_sqs_queues_lock = threading.Lock()
 
 
 def sqs_client() -> "SQSServiceResource":
@@ -29,54 +46,1078 @@ def sqs_client() -> "SQSServiceResource":
 
 def _get_sqs_queue(queue_name: str) -> "Queue":
     """Get SQS queue, retrieving from cache if available."""
-    if queue_name not in _sqs_queues:
-        _sqs_queues[queue_name] = sqs_client().get_queue_by_name(QueueName=queue_name)
-    return _sqs_queues[queue_name]
+    # boto3 resources are not safe to create concurrently, so guard the cache
+    with _sqs_queues_lock:
+        if queue_name not in _sqs_queues:
+            _sqs_queues[queue_name] = sqs_client().get_queue_by_name(QueueName=queue_name)
+        return _sqs_queues[queue_name]
+
+
+def message_loop(
+    queue: str,
+    wait: int,
+    visibility: int = 30,
+    *,
+    workers: int = 1,
+    prefetch: int = 0,
+    heartbeat_interval: float = 0,
+    shutdown_grace_period: float = 0,
+) -> None:
+    """Process messages from the input queue until no more messages are returned.
 
+    If prefetch is greater than zero, up to that many batches of messages are
+    received ahead of time by a MessagePrefetcher, so that polling the queue overlaps
+    with processing the current batch rather than following it.
+
+    If heartbeat_interval is greater than zero (and less than visibility), received
+    messages have their visibility timeout extended by a VisibilityHeartbeat every
+    heartbeat_interval seconds until they are deleted, so that long-running
+    submissions are not redelivered while still in progress.
+
+    The loop also stops, gracefully, on SIGTERM or SIGINT, see GracefulShutdown:
+    messages being submitted are waited for up to shutdown_grace_period seconds, and
+    messages received but not yet started are returned to the input queue.
+    """
+    # submitter.submission is imported here rather than at the top of the module, as
+    # commands that only use this module to create or write to queues don't need it
+    # and it is slow to import
+    from submitter.submission import collection_cache  # noqa: PLC0415
 
-def message_loop(queue: str, wait: int, visibility: int = 30) -> None:
     logger.info("Message loop started")
-    while True:
-        msgs = retrieve_messages_from_queue(queue, wait, visibility)
-        if not msgs:
-            logger.info("No messages available in queue %s", queue)
+    with (
+        GracefulShutdown(shutdown_grace_period) as shutdown,
+        VisibilityHeartbeat(visibility, heartbeat_interval) as heartbeat,
+    ):
+        if prefetch > 0:
+            with MessagePrefetcher(
+                queue, wait, visibility, prefetch, heartbeat=heartbeat, shutdown=shutdown
+            ) as prefetcher:
+                for msgs in prefetcher:
+                    process(msgs, workers, heartbeat, shutdown)
+                if shutdown.requested:
+                    return_messages(prefetcher.stop(shutdown.remaining()), heartbeat)
+        else:
+            while not shutdown.requested and (
+                msgs := retrieve_messages_from_queue(queue, wait, visibility)
+            ):
+                heartbeat.track(msgs)
+                process(msgs, workers, heartbeat, shutdown)
+    if shutdown.requested:
+        logger.info("Message loop stopped by shutdown")
+    else:
+        logger.info("No messages available in queue %s", queue)
+    logger.info(
+        "Collection cache: %d hits, %d misses",
+        collection_cache.hits,
+        collection_cache.misses,
+    )
+
+
+class VisibilityHeartbeat:
+    """Extend the visibility timeout of messages while they are being processed.
+
+    Tracked messages have their visibility timeout reset to `visibility` seconds every
+    `interval` seconds by a background thread, using one ChangeMessageVisibilityBatch
+    call per queue for every 10 messages. Messages are tracked from when they are
+    received until they are released after being deleted from the input queue.
+
+    Releasing a message waits for a beat in progress to finish, so that a beat cannot
+    extend a message after it was released, e.g. to be returned to the queue at once
+    or deferred.
+
+    The heartbeat is disabled, and tracking is a no-op, unless the interval is greater
+    than zero and less than the visibility timeout.
+    """
+
+    # maximum number of entries in a single ChangeMessageVisibilityBatch call
+    BATCH_SIZE = 10
+
+    def __init__(self, visibility: int, interval: float) -> None:
+        self.visibility = visibility
+        self.interval = interval
+        self.enabled = 0 < interval < visibility
+        if interval > 0 and not self.enabled:
+            logger.warning(
+                "Visibility heartbeat disabled, interval of %s seconds is not less "
+                "than the visibility timeout of %s seconds",
+                interval,
+                visibility,
+            )
+        self._lock = threading.Lock()
+        # held for the whole of a beat, reentrant as a beat releases failed messages
+        self._beat_lock = threading.RLock()
+        self._messages: dict[str, Message] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="submitter-heartbeat", daemon=True
+        )
+
+    def __enter__(self) -> Self:
+        """Start extending the visibility of tracked messages in the background."""
+        if self.enabled:
+            self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop extending the visibility of tracked messages."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def track(self, msgs: list["Message"]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for message in msgs:
+                self._messages[message.message_id] = message
+
+    def release(self, message: "Message") -> None:
+        """Stop extending a message, once any beat in progress has finished."""
+        with self._beat_lock, self._lock:
+            self._messages.pop(message.message_id, None)
+
+    def beat(self) -> None:
+        """Extend the visibility timeout of all tracked messages."""
+        with self._beat_lock:
+            with self._lock:
+                msgs = list(self._messages.values())
+            by_queue: dict[str, list[Message]] = {}
+            for message in msgs:
+                by_queue.setdefault(message.queue_url, []).append(message)
+
+            for queue_url, queue_msgs in by_queue.items():
+                for start in range(0, len(queue_msgs), self.BATCH_SIZE):
+                    self._extend(queue_url, queue_msgs[start : start + self.BATCH_SIZE])
+
+    def _extend(self, queue_url: str, msgs: list["Message"]) -> None:
+        entries = {str(index): message for index, message in enumerate(msgs)}
+        try:
+            response = msgs[0].meta.client.change_message_visibility_batch(
+                QueueUrl=queue_url,
+                Entries=[
+                    {
+                        "Id": entry_id,
+                        "ReceiptHandle": message.receipt_handle,
+                        "VisibilityTimeout": self.visibility,
+                    }
+                    for entry_id, message in entries.items()
+                ],
+            )
+        except Exception:
+            logger.exception("Failed to extend visibility of %d messages", len(msgs))
+            return
+
+        logger.debug("Extended visibility of %d messages", len(msgs))
+        for failure in response.get("Failed", []):
+            # the message cannot be extended again, e.g. it was already deleted
+            message = entries[failure["Id"]]
+            logger.warning(
+                "Failed to extend visibility of message '%s': %s",
+                message.message_id,
+                failure.get("Message", failure["Code"]),
+            )
+            self.release(message)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.beat()
+
+
+class GracefulShutdown:
+    """Request a graceful stop of the message loop on SIGTERM or SIGINT.
+
+    While entered, in the main thread, the first SIGTERM or SIGINT received sets
+    `requested` and starts the grace period of `grace_period` seconds: the message
+    loop stops polling, messages not yet started are returned to the input queue, and
+    messages being submitted are waited for until the end of the grace period.
+    The previous signal handlers are then restored, so that a second signal is handled
+    as it would have been otherwise, e.g. a second Ctrl-C raises KeyboardInterrupt.
+
+    Outside the main thread, where signal handlers cannot be installed, a shutdown can
+    still be requested by calling request().
+    """
+
+    SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+    def __init__(
+        self, grace_period: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.grace_period = grace_period
+        self._clock = clock
+        self._requested = threading.Event()
+        self._deadline = 0.0
+        self._handlers: dict[int, Callable | int | None] = {}
+
+    def __enter__(self) -> Self:
+        """Handle SIGTERM and SIGINT by requesting a shutdown."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in self.SIGNALS:
+                self._handlers[signum] = signal.signal(signum, self._handle)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Restore the previous signal handlers."""
+        self._restore_handlers()
+
+    @property
+    def requested(self) -> bool:
+        return self._requested.is_set()
+
+    def request(self, reason: str = "requested") -> None:
+        """Request a shutdown, starting the grace period unless already requested."""
+        if self._requested.is_set():
+            return
+        self._deadline = self._clock() + self.grace_period
+        self._requested.set()
+        logger.warning(
+            "Shutdown %s, finishing messages being submitted within a grace period "
+            "of %s seconds",
+            reason,
+            self.grace_period,
+        )
+
+    def remaining(self) -> float:
+        """Return the seconds left in the grace period, or all of it if not started."""
+        if not self._requested.is_set():
+            return self.grace_period
+        return max(self._deadline - self._clock(), 0)
+
+    def _handle(self, signum: int, _frame: FrameType | None) -> None:
+        self._restore_handlers()
+        self.request(f"on {signal.Signals(signum).name}")
+
+    def _restore_handlers(self) -> None:
+        for signum, handler in self._handlers.items():
+            # None is returned for handlers not installed from Python
+            if handler is not None:
+                signal.signal(signum, handler)
+        self._handlers.clear()
+
+
+class MessagePrefetcher:
+    """Receive batches of messages from the input queue in a background thread.
+
+    Received batches are held in a buffer of at most `depth` batches; once the buffer
+    is full, the background thread waits for a batch to be taken before polling again.
+    Iterating over the prefetcher yields batches in the order received and stops after
+    a poll returns no messages.
+
+    A message's visibility timeout starts when it is received, not when it is taken
+    from the buffer. Unless an enabled VisibilityHeartbeat is tracking received
+    messages, batches that waited in the buffer for the full visibility timeout are
+    therefore dropped instead of processed, as the messages will have become visible
+    in the input queue again and will be redelivered.
+
+    Iterating also stops once a shutdown is requested on `shutdown`, if given, in
+    which case stop() returns the messages received but not yet taken, so that they
+    can be returned to the input queue.
+    """
+
+    def __init__(
+        self,
+        queue: str,
+        wait: int,
+        visibility: int,
+        depth: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        heartbeat: VisibilityHeartbeat | None = None,
+        shutdown: GracefulShutdown | None = None,
+    ) -> None:
+        self.queue = queue
+        self.wait = wait
+        self.visibility = visibility
+        self.heartbeat = heartbeat
+        self.shutdown = shutdown
+        self._clock = clock
+        self._batches: stdlib_queue.Queue[tuple[float, list[Message]] | Exception] = (
+            stdlib_queue.Queue(maxsize=depth)
+        )
+        # messages received once stopped or shut down, which were not buffered
+        self._unbuffered: list[Message] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._receive, name="submitter-prefetch", daemon=True
+        )
+
+    def __enter__(self) -> Self:
+        """Start polling the input queue in the background."""
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop polling the input queue.
+
+        After a shutdown, a poll in progress is waited for only until the end of the
+        grace period.
+        """
+        if self.shutdown and self.shutdown.requested:
+            self.stop(self.shutdown.remaining())
+        else:
+            self.stop()
+
+    def __iter__(self) -> Iterator[list["Message"]]:
+        """Yield received batches, re-raising any error raised while polling."""
+        while True:
+            try:
+                batch = self._batches.get(timeout=0.1)
+            except stdlib_queue.Empty:
+                if self.shutdown and self.shutdown.requested:
+                    return
+                continue
+            if isinstance(batch, Exception):
+                raise batch
+            received_at, msgs = batch
+            if not msgs:
+                return
+            age = self._clock() - received_at
+            if age >= self.visibility and not (self.heartbeat and self.heartbeat.enabled):
+                logger.warning(
+                    "Dropping %d prefetched messages that waited %.1f seconds, longer "
+                    "than their visibility timeout; they will be redelivered",
+                    len(msgs),
+                    age,
+                )
+                continue
+            yield msgs
+            if self.shutdown and self.shutdown.requested:
+                return
+
+    def stop(self, timeout: float | None = None) -> list["Message"]:
+        """Stop polling and wait for the background thread to finish.
+
+        Waits at most `timeout` seconds, if given, e.g. for a poll in progress to
+        return. Returns the messages received but not yet taken from the buffer.
+        """
+        self._stopped.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        msgs: list[Message] = []
+        # unblock the background thread if it is waiting on a full buffer
+        while self._thread.is_alive() and (
+            deadline is None or time.monotonic() < deadline
+        ):
+            msgs.extend(self._take_buffered())
+            self._thread.join(timeout=0.1)
+        msgs.extend(self._take_buffered())
+        if not self._thread.is_alive():
+            msgs.extend(self._unbuffered)
+        return msgs
+
+    def _take_buffered(self) -> list["Message"]:
+        msgs: list[Message] = []
+        while True:
+            try:
+                batch = self._batches.get_nowait()
+            except stdlib_queue.Empty:
+                return msgs
+            if not isinstance(batch, Exception):
+                msgs.extend(batch[1])
+
+    def _receive(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                msgs = retrieve_messages_from_queue(
+                    self.queue, self.wait, self.visibility
+                )
+                if self.heartbeat:
+                    self.heartbeat.track(msgs)
+                # messages received after a shutdown, e.g. ones just returned to the
+                # queue, are kept out of the buffer, to be returned by stop()
+                if (self.shutdown and self.shutdown.requested) or not self._put(
+                    (self._clock(), msgs)
+                ):
+                    self._unbuffered = msgs
+                    return
+                if not msgs:
+                    return
+        except Exception as exception:  # noqa: BLE001
+            self._put(exception)
+
+    def _put(self, batch: tuple[float, list["Message"]] | Exception) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._batches.put(batch, timeout=0.1)
+            except stdlib_queue.Full:
+                continue
+            else:
+                return True
+        return False
+
+
+def process(
+    msgs: list["Message"],
+    workers: int = 1,
+    heartbeat: VisibilityHeartbeat | None = None,
+    shutdown: GracefulShutdown | None = None,
+) -> None:
+    """Process a batch of messages retrieved from the input queue.
+
+    With the default of a single worker, messages are submitted one at a time in the
+    order received. With more workers, messages are submitted concurrently by a
+    bounded thread pool, while the number of concurrent submissions to each DSpace
+    instance is capped by the DSPACE_MAX_CONCURRENCY setting.
+
+    Messages for a DSpace instance whose circuit breaker is open are deferred rather
+    than submitted: they are returned to the input queue with a visibility timeout
+    lasting until the breaker next lets a submission through. With the breaker
+    enabled, a message whose submission fails because DSpace timed out or could not
+    be reached is deferred in the same way, rather than stopping the message loop.
+
+    Result messages are written by a ResultWriter in batches per result queue, and
+    once its result has been written each message is queued for deletion from the
+    input queue by a MessageDeleter, which deletes messages in batches. Results and
+    deletions still buffered are flushed when the batch completes, including when
+    processing a message, or writing its result, raises an exception. In that case
+    messages not yet started are cancelled and returned to the input queue, and the
+    exception is re-raised once in-flight messages finish and their results are
+    written, which stops the message loop as it does when processing messages one at
+    a time.
+
+    Once a shutdown is requested on `shutdown`, messages not yet started are returned
+    to the input queue, and messages being submitted are waited for until the end of
+    its grace period, their results written as soon as each finishes. Submissions
+    still running then are logged and left running, but no longer waited for: their
+    messages are neither deleted nor returned, so they are received again once their
+    visibility timeout expires, and the submission journal and idempotency index
+    recover their items. Messages are submitted in a worker thread when `shutdown` is
+    given, even with a single worker, so that the grace period applies to them too.
+    """
+    deleter = MessageDeleter(heartbeat)
+    writer = ResultWriter(on_written=deleter.add)
+    unstarted: list[Message] = []
+    in_flight: list[tuple[Message, Submission | Deferral | None]] = []
+
+    def complete(message: "Message", submission: "Submission | Deferral | None") -> None:
+        if submission is None:
+            deleter.add(message)
+        elif isinstance(submission, Deferral):
+            defer_message(message, submission, heartbeat)
+        else:
+            writer.add(submission, message)
+
+    submissions = _submit_messages(msgs, workers, shutdown, unstarted, in_flight)
+    try:
+        for message, submission in submissions:
+            complete(message, submission)
+            if shutdown is not None and shutdown.requested:
+                # write results at once, in case the service is killed before the
+                # remaining submissions finish
+                writer.flush()
+                deleter.flush()
+    finally:
+        # if completing a message failed, stop submitting, and collect the submissions
+        # in flight in `in_flight` once they finish
+        submissions.close()
+        try:
+            return_messages(unstarted, heartbeat)
+            for message, submission in in_flight:
+                complete(message, submission)
+            writer.flush()
+        finally:
+            deleter.flush()
+
+
+def _submit_messages(
+    msgs: list["Message"],
+    workers: int,
+    shutdown: GracefulShutdown | None,
+    unstarted: list["Message"],
+    in_flight: list[tuple["Message", "Submission | Deferral | None"]],
+) -> Generator[tuple["Message", "Submission | Deferral | None"]]:
+    """Yield each message with its submission, once submitted.
+
+    Messages are yielded in the order received until a shutdown is requested, and
+    then in the order their submissions finish, until the end of its grace period.
+    Messages not started because a shutdown was requested, or because submitting
+    another message raised an exception, are added to `unstarted`. Such an exception
+    is raised once every message in flight has been submitted and yielded.
+
+    If the generator is closed before every message was yielded, e.g. because writing
+    a result failed, messages not started are added to `unstarted` as well, and the
+    messages in flight are added to `in_flight` with their submissions once they
+    finish, so that the caller can complete them.
+
+    Messages still being submitted at the end of the grace period are neither yielded
+    nor added to either list.
+    """
+
+    def stopping() -> bool:
+        return shutdown is not None and shutdown.requested
+
+    if workers <= 1 or stopping():
+        for index, message in enumerate(msgs):
+            if stopping():
+                unstarted.extend(msgs[index:])
+                return
+            try:
+                if shutdown is None:
+                    submission = submit_message(message)
+                else:
+                    future = _submit_in_thread(message, shutdown)
+                    if future is None:
+                        # still being submitted at the end of the grace period
+                        unstarted.extend(msgs[index + 1 :])
+                        return
+                    if future.cancelled():
+                        unstarted.extend(msgs[index:])
+                        return
+                    submission = future.result()
+            except Exception:
+                unstarted.extend(msgs[index + 1 :])
+                raise
+            try:
+                yield message, submission
+            except GeneratorExit:
+                unstarted.extend(msgs[index + 1 :])
+                raise
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(workers, len(msgs)), thread_name_prefix="submitter"
+    )
+    failure: Exception | None = None
+    futures = {executor.submit(submit_message, message): message for message in msgs}
+    # messages not yet yielded or added to `unstarted`
+    pending = dict(futures)
+    try:
+        for future in _finished(futures, executor, shutdown):
+            message = pending.pop(future)
+            if future.cancelled():
+                unstarted.append(message)
+                continue
+            try:
+                submission = future.result()
+            except Exception as exception:
+                if failure is not None:
+                    logger.exception("Failed to process message '%s'", message.message_id)
+                    continue
+                # stop starting messages, but keep the results of those in flight, as
+                # they may have created items
+                failure = exception
+                executor.shutdown(wait=False, cancel_futures=True)
+                continue
+            yield message, submission
+    except GeneratorExit:
+        executor.shutdown(wait=False, cancel_futures=True)
+        _collect_in_flight(
+            pending,
+            unstarted,
+            in_flight,
+            timeout=shutdown.remaining() if shutdown and stopping() else None,
+        )
+        raise
+    finally:
+        # submissions overrunning the grace period are left running, not waited for
+        executor.shutdown(wait=not stopping())
+    if failure is not None:
+        raise failure
+
+
+def _submit_in_thread(message: "Message", shutdown: GracefulShutdown) -> Future | None:
+    """Submit a message in a thread, so that a shutdown can stop waiting for it.
+
+    Returns the future of the submission once it finishes or is cancelled, or None if
+    it is still running at the end of the shutdown grace period.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="submitter")
+    future = executor.submit(submit_message, message)
+    executor.shutdown(wait=False)
+    return next(_finished({future: message}, executor, shutdown), None)
+
+
+def _collect_in_flight(
+    futures: dict[Future, "Message"],
+    unstarted: list["Message"],
+    in_flight: list[tuple["Message", "Submission | Deferral | None"]],
+    timeout: float | None = None,
+) -> None:
+    """Add the messages of submissions stopped before they finished to a list.
+
+    Messages whose futures were cancelled are added to `unstarted`, and the others
+    are added to `in_flight` with their submissions once they finish. Submissions
+    that do not finish within `timeout` seconds are logged and left out of both.
+    """
+    # cancelled futures are left out, as wait() does not count them as done
+    wait_futures([future for future in futures if not future.cancelled()], timeout)
+    for future, message in futures.items():
+        if future.cancelled():
+            unstarted.append(message)
+            continue
+        if not future.done():
+            _log_overrunning(message)
+            continue
+        try:
+            in_flight.append((message, future.result()))
+        except Exception:
+            logger.exception("Failed to process message '%s'", message.message_id)
+
+
+def _finished(
+    futures: dict[Future, "Message"],
+    executor: ThreadPoolExecutor,
+    shutdown: GracefulShutdown | None,
+) -> Iterator[Future]:
+    """Yield futures in order until a shutdown is requested, then as they finish.
+
+    Once a shutdown is requested, messages not yet started are cancelled, and their
+    futures yielded first. Submissions still running at the end of the grace period
+    are logged and not yielded. Their messages are not returned to the queue, as the
+    submissions may still create items, but are received again once their visibility
+    timeout expires.
+    """
+    pending = list(futures)
+    while pending:
+        # wait in short intervals, so that a shutdown stops further messages from
+        # being started as soon as it is requested
+        while shutdown is not None and not shutdown.requested and not pending[0].done():
+            wait_futures([pending[0]], timeout=0.1)
+        if shutdown is not None and shutdown.requested:
             break
-        process(msgs)
+        yield pending.pop(0)
+    if not pending or shutdown is None:
+        return
 
+    executor.shutdown(wait=False, cancel_futures=True)
+    running: set[Future] = set()
+    for future in pending:
+        if future.cancelled():
+            yield future
+        else:
+            running.add(future)
+    while running:
+        done, running = wait_futures(
+            running, timeout=shutdown.remaining(), return_when=FIRST_COMPLETED
+        )
+        yield from done
+        if not done:
+            break
+    for future in running:
+        _log_overrunning(futures[future])
 
-def process(msgs: list["Message"]) -> None:
 
-    for message in msgs:
-        message_id = message.message_id
+def _log_overrunning(message: "Message") -> None:
+    logger.warning(
+        "Message '%s' was still being submitted at the end of the shutdown grace "
+        "period, leaving it to be received again once its visibility timeout expires",
+        message.message_id,
+    )
+
+
+def submit_message(message: "Message") -> "Submission | Deferral | None":
+    """Submit a single message to DSpace, returning the submission with its result.
+
+    Returns None if processing is skipped due to config, or a Deferral if the message
+    is to be returned to the queue because the circuit breaker of its DSpace instance
+    is open or opened by a failure of its submission, or because its package is
+    already being submitted by another worker.
+
+    A message for a package that was already submitted, according to the idempotency
+    index, is not submitted again; its submission carries the stored result instead.
+    A message whose previous submission was interrupted, according to the submission
+    journal, has that submission reconciled first, and is deferred if it cannot be or
+    if that submission is still running in this process.
+    """
+    logger.info(
+        "Processing message '%s' from queue '%s'", message.message_id, CONFIG.input_queue
+    )
+
+    if CONFIG.skip_processing:
+        logger.info("Skipping processing due to config")
+        return None
+
+    # see note in message_loop
+    from submitter.submission import Submission, reconcile_message  # noqa: PLC0415
+
+    submission = Submission.from_message(message)
+    if not submission.result_message and not reconcile_message(message.message_id):
         logger.info(
-            "Processing message '%s' from queue '%s'", message_id, CONFIG.input_queue
+            "Previous submission of message '%s' is running or could not be "
+            "reconciled, deferring it",
+            message.message_id,
         )
+        return Deferral(submission.destination or "", CONFIG.sqs_visibility_timeout)
+    if not submission.result_message and (previous := submission.claim()):
+        if previous.active:
+            logger.info(
+                "Message '%s' is already being submitted, deferring it",
+                message.message_id,
+            )
+            return Deferral(submission.destination or "", CONFIG.sqs_visibility_timeout)
+        submission.result_from_record(previous)
+    if not submission.result_message:
+        try:
+            return _submit(submission, message)
+        finally:
+            submission.release()
+    return submission
 
-        if CONFIG.skip_processing:
-            logger.info("Skipping processing due to config")
-        else:
-            submission = Submission.from_message(message)
-            if not submission.result_message:
-                submission.submit()
-            response = write_message_to_queue(
-                submission.result_attributes,
-                submission.result_message,
-                submission.result_queue,
+
+def _submit(submission: "Submission", message: "Message") -> "Submission | Deferral":
+    # see note in message_loop
+    import requests  # noqa: PLC0415
+
+    destination = submission.destination or ""
+    breaker = circuit_breakers.get(destination)
+    if not breaker.allow():
+        return _defer(destination, breaker)
+    with submission_slots.slot(
+        CONFIG.dspace_instance(destination),
+        int(
+            CONFIG.dspace_setting(
+                destination, "max_concurrency", CONFIG.dspace_max_concurrency
+            )
+        ),
+    ):
+        # journaled only once it is submitted, so that deferrals leave no entry
+        submission.begin_journal(message.message_id)
+        try:
+            submission.submit()
+        except (errors.DSpaceTimeoutError, requests.exceptions.ConnectionError):
+            if breaker.threshold <= 0:
+                raise
+            logger.exception(
+                "Failed to submit message '%s' to '%s'",
+                message.message_id,
+                destination,
             )
-            if not verify_sent_message(submission.result_message, response):
-                raise errors.SQSMessageSendError(
-                    submission.result_attributes,
-                    submission.result_message,
-                    submission.result_queue,
-                    response["MessageId"],
+            return _defer(destination, breaker)
+    return submission
+
+
+def _defer(destination: str, breaker: CircuitBreaker) -> "Deferral":
+    """Defer a message until the circuit breaker may let it through.
+
+    A message that failed before the breaker opened is deferred for the breaker's
+    reset timeout, rather than being received again at once.
+    """
+    return Deferral(destination, breaker.retry_after() or breaker.reset_timeout)
+
+
+@dataclass(frozen=True)
+class Deferral:
+    """A message to be returned to its queue and received again after `delay` seconds."""
+
+    destination: str
+    delay: float
+
+
+# maximum visibility timeout of an SQS message, in seconds
+MAX_VISIBILITY_TIMEOUT = 43_200
+
+
+def defer_message(
+    message: "Message", deferral: Deferral, heartbeat: VisibilityHeartbeat | None = None
+) -> None:
+    """Return a message to the input queue by changing its visibility timeout.
+
+    If its visibility cannot be changed, the message is still received again once its
+    current visibility timeout expires.
+    """
+    if heartbeat:
+        heartbeat.release(message)
+    delay = min(math.ceil(deferral.delay), MAX_VISIBILITY_TIMEOUT)
+    try:
+        message.change_visibility(VisibilityTimeout=delay)
+    except Exception:
+        logger.exception("Failed to defer message '%s'", message.message_id)
+        return
+    logger.info(
+        "Deferred message '%s' for '%s' by %d seconds",
+        message.message_id,
+        deferral.destination,
+        delay,
+    )
+
+
+def return_messages(
+    msgs: list["Message"], heartbeat: VisibilityHeartbeat | None = None
+) -> None:
+    """Return messages not processed to the input queue, to be received again at once.
+
+    Their visibility timeout is reset to zero with one ChangeMessageVisibilityBatch
+    call per queue for every 10 messages. Messages that cannot be returned are
+    received again once their current visibility timeout expires.
+    """
+    by_queue: dict[str, list[Message]] = {}
+    for message in msgs:
+        if heartbeat:
+            heartbeat.release(message)
+        by_queue.setdefault(message.queue_url, []).append(message)
+
+    for queue_url, queue_msgs in by_queue.items():
+        for start in range(0, len(queue_msgs), VisibilityHeartbeat.BATCH_SIZE):
+            batch = queue_msgs[start : start + VisibilityHeartbeat.BATCH_SIZE]
+            entries = {str(index): message for index, message in enumerate(batch)}
+            try:
+                response = batch[0].meta.client.change_message_visibility_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {
+                            "Id": entry_id,
+                            "ReceiptHandle": message.receipt_handle,
+                            "VisibilityTimeout": 0,
+                        }
+                        for entry_id, message in entries.items()
+                    ],
+                )
+            except Exception:
+                logger.exception("Failed to return %d messages to queue", len(batch))
+                continue
+            failed = {failure["Id"] for failure in response.get("Failed", [])}
+            for entry_id, message in entries.items():
+                if entry_id in failed:
+                    logger.warning(
+                        "Failed to return message '%s' to queue", message.message_id
+                    )
+                else:
+                    logger.info("Returned message '%s' to queue", message.message_id)
+
+
+@dataclass
+class _ResultEntry:
+    message: "Message"
+    attributes: dict
+    body: dict | str | None
+
+    @cached_property
+    def message_body(self) -> str:
+        return json.dumps(self.body)
+
+    @cached_property
+    def size(self) -> int:
+        """Approximate payload size of the result message in bytes."""
+        attributes_size = sum(
+            len(name) + len(str(value.get("StringValue", "")))
+            for name, value in self.attributes.items()
+        )
+        return len(self.message_body.encode("utf-8")) + attributes_size
+
+
+class ResultWriter:
+    """Write result messages to their result queues with SendMessageBatch.
+
+    Results are buffered per result queue and sent once a batch would exceed the SQS
+    limits of 10 entries or 256 KB, or when flush() is called. Each entry sent is
+    verified against the MD5 of its body returned by SQS. Entries that fail to send
+    with a server-side error, or that fail verification, are retried up to
+    `max_attempts` times; other entries in the batch are not resent.
+
+    `on_written` is called with the input message of each result once that result
+    has been written and verified.
+
+    Raises:
+        SQSMessageSendError: From add() or flush() if a result could not be written,
+            i.e. SQS reported a client-side error for the entry, or the entry still
+            failed after `max_attempts` attempts. Results written successfully in the
+            same batch are acknowledged via `on_written` first.
+    """
+
+    MAX_BATCH_ENTRIES = 10
+    MAX_BATCH_BYTES = 262_144
+
+    def __init__(
+        self,
+        on_written: Callable[["Message"], None],
+        max_attempts: int = 3,
+        retry_delay: float = 0.5,
+    ) -> None:
+        self.on_written = on_written
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._pending: dict[str, list[_ResultEntry]] = {}
+
+    def add(self, submission: "Submission", message: "Message") -> None:
+        entry = _ResultEntry(
+            message, submission.result_attributes, submission.result_message
+        )
+        pending = self._pending.setdefault(submission.result_queue, [])
+        if pending and (
+            sum(pending_entry.size for pending_entry in pending) + entry.size
+            > self.MAX_BATCH_BYTES
+        ):
+            self._flush_queue(submission.result_queue)
+            pending = self._pending.setdefault(submission.result_queue, [])
+        pending.append(entry)
+        if len(pending) >= self.MAX_BATCH_ENTRIES:
+            self._flush_queue(submission.result_queue)
+
+    def flush(self) -> None:
+        """Write all buffered results."""
+        for result_queue in list(self._pending):
+            self._flush_queue(result_queue)
+
+    def _flush_queue(self, result_queue: str) -> None:
+        entries = self._pending.pop(result_queue, [])
+        if not entries:
+            return
+
+        failed = self._send(result_queue, entries)
+        for entry in failed:
+            logger.error(
+                "Failed to write result for message '%s' to queue '%s'",
+                entry.message.message_id,
+                result_queue,
+            )
+        if failed:
+            raise errors.SQSMessageSendError(
+                failed[0].attributes,
+                failed[0].body,
+                result_queue,
+                failed[0].message.message_id,
+            )
+
+    def _send(self, result_queue: str, entries: list[_ResultEntry]) -> list[_ResultEntry]:
+        """Send entries in a single batch, returning entries that could not be sent."""
+        queue = _get_sqs_queue(result_queue)
+        unrecoverable: list[_ResultEntry] = []
+        remaining = entries
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                time.sleep(self.retry_delay * 2 ** (attempt - 2))
+                logger.info(
+                    "Retrying %d result messages to queue '%s' (attempt %d)",
+                    len(remaining),
+                    result_queue,
+                    attempt,
                 )
-            logger.debug(
-                "Wrote message to queue '%s' with message body: %s",
-                submission.result_queue,
-                json.dumps(submission.result_message),
+            response = queue.send_messages(
+                Entries=[
+                    {
+                        "Id": str(index),
+                        "MessageAttributes": entry.attributes,
+                        "MessageBody": entry.message_body,
+                    }
+                    for index, entry in enumerate(remaining)
+                ]
             )
-        message.delete()
-        logger.info("Deleted message '%s' from input queue", message_id)
+
+            retry: list[_ResultEntry] = []
+            for result in response.get("Successful", []):
+                entry = remaining[int(result["Id"])]
+                if verify_sent_message(entry.body, result):
+                    logger.debug(
+                        "Wrote message to queue '%s' with message body: %s",
+                        result_queue,
+                        entry.message_body,
+                    )
+                    self.on_written(entry.message)
+                else:
+                    logger.warning(
+                        "MD5 of result for message '%s' did not match",
+                        entry.message.message_id,
+                    )
+                    retry.append(entry)
+            for failure in response.get("Failed", []):
+                entry = remaining[int(failure["Id"])]
+                logger.warning(
+                    "Failed to write result for message '%s': %s %s",
+                    entry.message.message_id,
+                    failure["Code"],
+                    failure.get("Message", ""),
+                )
+                if failure["SenderFault"]:
+                    unrecoverable.append(entry)
+                else:
+                    retry.append(entry)
+
+            remaining = retry
+            if not remaining:
+                break
+        return unrecoverable + remaining
+
+
+class MessageDeleter:
+    """Delete acknowledged messages from their queue with DeleteMessageBatch.
+
+    Messages are buffered per queue and deleted 10 at a time, or when flush() is
+    called. Entries that fail to delete with a server-side error, and batches whose
+    DeleteMessageBatch call fails, are retried up to `max_attempts` times. Entries
+    that still fail are logged rather than raised, as their results have already been
+    written, and so that flushing cannot replace an exception being handled; those
+    messages will be redelivered once their visibility timeout expires.
+    """
+
+    BATCH_SIZE = 10
+
+    def __init__(
+        self, heartbeat: VisibilityHeartbeat | None = None, max_attempts: int = 2
+    ) -> None:
+        self.heartbeat = heartbeat
+        self.max_attempts = max_attempts
+        self._pending: dict[str, list[Message]] = {}
+
+    def add(self, message: "Message") -> None:
+        pending = self._pending.setdefault(message.queue_url, [])
+        pending.append(message)
+        if len(pending) >= self.BATCH_SIZE:
+            self._flush_queue(message.queue_url)
+
+    def flush(self) -> None:
+        """Delete all buffered messages."""
+        for queue_url in list(self._pending):
+            self._flush_queue(queue_url)
+
+    def _flush_queue(self, queue_url: str) -> None:
+        msgs = self._pending.pop(queue_url, [])
+        remaining = msgs
+        for attempt in range(1, self.max_attempts + 1):
+            if not remaining:
+                break
+            if attempt > 1:
+                logger.info("Retrying deletion of %d messages", len(remaining))
+            entries = {str(index): message for index, message in enumerate(remaining)}
+            try:
+                response = remaining[0].meta.client.delete_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {"Id": entry_id, "ReceiptHandle": message.receipt_handle}
+                        for entry_id, message in entries.items()
+                    ],
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to delete %d messages from input queue%s",
+                    len(remaining),
+                    ", they will be redelivered" if attempt == self.max_attempts else "",
+                )
+                continue
+            for result in response.get("Successful", []):
+                logger.info(
+                    "Deleted message '%s' from input queue",
+                    entries[result["Id"]].message_id,
+                )
+            remaining = []
+            for failure in response.get("Failed", []):
+                message = entries[failure["Id"]]
+                if failure["SenderFault"] or attempt == self.max_attempts:
+                    logger.error(
+                        "Failed to delete message '%s' from input queue, it will be "
+                        "redelivered: %s %s",
+                        message.message_id,
+                        failure["Code"],
+                        failure.get("Message", ""),
+                    )
+                else:
+                    remaining.append(message)
+
+        if self.heartbeat:
+            for message in msgs:
+                self.heartbeat.release(message)
 
 
 def retrieve_messages_from_queue(
@@ -118,7 +1159,9 @@ def create(name: str) -> "Queue":
 
 def verify_sent_message(
     sent_message_body: dict | str | None,
-    sqs_send_message_response: "SendMessageResultTypeDef",
+    sqs_send_message_response: (
+        "SendMessageResultTypeDef | SendMessageBatchResultEntryTypeDef"
+    ),
 ) -> bool:
     body_md5 = hashlib.md5(  # nosec # noqa: S324
         json.dumps(sent_message_body).encode("utf-8")
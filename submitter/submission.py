@@ -1,8 +1,12 @@
 import json
 import logging
 import os
+import queue as stdlib_queue
 import sys
 import traceback
+from collections.abc import Callable
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, ExitStack
 from datetime import UTC, datetime
 from enum import StrEnum
 from typing import TYPE_CHECKING, Literal
@@ -10,10 +14,20 @@ from typing import TYPE_CHECKING, Literal
 import requests
 import smart_open
 from dspace_rest_client.client import DSpaceClient
-from dspace_rest_client.models import Bitstream, Bundle, Item
+from dspace_rest_client.models import Bitstream, Bundle, DSpaceObject, Item
 
 from submitter import errors
+from submitter.cache import TTLCache
 from submitter.config import Config
+from submitter.dspace import (
+    ClientPool,
+    Deadline,
+    DestinationClient,
+    mount_http_adapter,
+)
+from submitter.idempotency import PackageKey, SubmissionRecord, submission_index
+from submitter.journal import JournalEntry, submission_journal
+from submitter.limits import request_governors, upload_slots
 from submitter.message import validate_message
 
 if TYPE_CHECKING:
@@ -22,8 +36,52 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 CONFIG = Config()
 
-# Shared cache for DSpace clients across all Submission instances
-dspace_clients: dict[str, DSpaceClient] = {}
+# Errors of requests to DSpace that do not fail a submission: they are raised as they
+# are once any partially created item is cleaned up, so that the message can be deferred
+DSPACE_UNAVAILABLE_ERRORS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+)
+
+
+def create_dspace_client(destination: str) -> DestinationClient:
+    """Create and authenticate a DSpace client for a destination.
+
+    Raises:
+        InvalidDSpaceDestinationError: If the destination has no credentials.
+        DSpaceAuthenticationError: If authenticating to DSpace fails.
+    """
+    logger.debug(f"Creating DSpace client for destination '{destination}'")
+    try:
+        credentials = CONFIG.dspace_credentials[destination]
+    except KeyError as exception:
+        raise errors.InvalidDSpaceDestinationError(destination) from exception
+
+    client = DSpaceClient(
+        api_endpoint=credentials["url"],
+        username=credentials["user"],
+        password=credentials["password"],
+        fake_user_agent=True,
+    )
+    mount_http_adapter(client.session, destination)
+    with request_governors.get(destination).request():
+        authenticated = client.authenticate()
+    if not authenticated:
+        raise errors.DSpaceAuthenticationError(credentials["url"], credentials["user"])
+    logger.info(
+        f'Successfully authenticated to "{credentials["url"]}" as "{credentials["user"]}"'
+    )
+    return DestinationClient(client, destination)
+
+
+# Shared pool of DSpace clients, checked out by each Submission while it is submitted
+dspace_clients = ClientPool(create_dspace_client)
+
+# Shared cache of collections resolved from their handles, keyed by the DSpace instance
+# and handle
+collection_cache: TTLCache[tuple[str, str], DSpaceObject] = TTLCache(
+    CONFIG.collection_cache_size, CONFIG.collection_cache_ttl
+)
 
 
 class ValidItemOperations(StrEnum):
@@ -56,6 +114,14 @@ class Submission:
         self.result_attributes = attributes
         self.result_message = result_message
         self.result_queue = result_queue
+        # bitstreams created by the submission, as returned by DSpace when uploaded
+        self.bitstreams: list[Bitstream] | None = None
+        # package claimed by the submission in the idempotency index
+        self.package_key: PackageKey | None = None
+        # message ID of the submission's entry in the submission journal
+        self.journal_id: str | None = None
+        # whether a partially posted item was deleted by clean_up_partial_success
+        self.cleaned_up = False
 
     def submit(self) -> None:
         """Submit a submission to DSpace as a new item with associated bitstreams.
@@ -64,80 +130,167 @@ class Submission:
         objects, posts the item to DSpace, and posts each bitstream to the posted
         item. Creates result success message if successful, otherwise creates
         appropriate result error message based on the specific exception raised during
-        submission.
+        submission, or if the submission runs past its deadline.
 
         Raises:
             DSpaceTimeoutError: If the DSpace server takes longer than the
-                configuration timeout setting to respond. Because this indicates a
-                serious error on the DSpace side, rather than handling this exception
-                it is re-raised with some useful message information and stops the
-                entire SQS message loop process until someone can investigate further.
+                configuration timeout setting to respond, and idempotent requests
+                still time out once their retries are used up. Because this indicates
+                a serious error on the DSpace side, rather than handling this
+                exception it is re-raised with some useful message information and
+                stops the entire SQS message loop process until someone can
+                investigate further.
         """
-        self.client = self.get_dspace_client()
-        logger.debug("Current clients in cache: %s", list(dspace_clients.keys()))
+        with self.get_dspace_client() as self.client:
+            logger.debug("DSpace clients in pool: %s", dspace_clients.sizes())
+            if CONFIG.dspace_submission_deadline > 0:
+                self.client.deadline = Deadline.after(CONFIG.dspace_submission_deadline)
 
-        try:
-            item, bundle = self._submit_item()
-            self.result_success_message(item, bundle)
+            try:
+                item, bundle = self._submit_item()
+                # the item is complete, so the deadline no longer applies to its result
+                with self.client.deadline_lifted():
+                    self.result_success_message(item, bundle)
+                if self.package_key:
+                    submission_index.complete(self.package_key, self.result_message)
+                    self.package_key = None
+                self._finish_journal()
+
+            # Expected exception, generate error message and continue; a submission
+            # past its deadline fails by itself rather than stopping the service
+            except (errors.SubmissionError, errors.SubmissionDeadlineError) as exception:
+                self.result_error_message(
+                    str(exception), getattr(exception, "dspace_error", None)
+                )
+                # any item created was cleaned up, so the package can be resubmitted
+                if self.package_key:
+                    submission_index.discard(self.package_key)
+                    self.package_key = None
+                self._finish_journal()
+
+            # DSpace timeout error, abort
+            except requests.exceptions.Timeout as exception:
+                raise errors.DSpaceTimeoutError(
+                    self.client.API_ENDPOINT,
+                    self.result_attributes,
+                    timeout=getattr(exception, "timeout", None),
+                ) from exception
+
+            # DSpace unreachable, abort unless the message is deferred by the caller
+            except requests.exceptions.ConnectionError:
+                logger.exception(
+                    "Could not connect to DSpace at %s", self.client.API_ENDPOINT
+                )
+                raise
 
-        # Expected exception, generate error message and continue
-        except errors.SubmissionError as exception:
-            self.result_error_message(
-                str(exception), getattr(exception, "dspace_error", None)
-            )
+            # Unexpected exception, abort
+            except Exception:
+                logger.exception(
+                    "Unexpected exception, aborting DSpace Submission Service processing"
+                )
+                raise
 
-        # DSpace timeout error, abort
-        except requests.exceptions.Timeout as exception:
-            dspace_url = self.client.base_url if self.client else "Unknown DSpace URL"
-            raise errors.DSpaceTimeoutError(
-                dspace_url, self.result_attributes
-            ) from exception
+    def claim(self) -> SubmissionRecord | None:
+        """Claim the package of a create submission in the idempotency index.
 
-        # Unexpected exception, abort
-        except Exception:
-            logger.exception(
-                "Unexpected exception, aborting DSpace Submission Service processing"
+        Returns the record of a previous submission of the package if the package
+        could not be claimed, see IdempotencyIndex.claim. Update submissions are not
+        claimed, as a package can be updated more than once.
+        """
+        if (key := self._package()) is None:
+            return None
+        record = submission_index.claim(key)
+        if record is None:
+            self.package_key = key
+        return record
+
+    def _package(self) -> PackageKey | None:
+        """Return the key of the package of a create submission in the index."""
+        package_id = self.result_attributes.get("PackageID", {}).get("StringValue")
+        source = self.result_attributes.get("SubmissionSource", {}).get("StringValue")
+        if self.operation != ValidItemOperations.CREATE or not (package_id and source):
+            return None
+        return package_id, source
+
+    def release(self) -> None:
+        """Release the claimed package and journal entry of a submission that stopped.
+
+        A journal entry left by a submission that did not complete is kept, to be
+        reconciled.
+        """
+        if self.package_key:
+            submission_index.release(self.package_key)
+            self.package_key = None
+        if self.journal_id:
+            submission_journal.release(self.journal_id)
+            self.journal_id = None
+
+    def result_from_record(self, record: SubmissionRecord) -> None:
+        """Set the result message from the record of a previous submission.
+
+        A completed submission's result is re-sent. A submission that created an item
+        but did not complete gets an error result, and its record is removed so that
+        the package can be resubmitted once the item has been checked.
+        """
+        package_id = self.result_attributes["PackageID"]["StringValue"]
+        source = self.result_attributes["SubmissionSource"]["StringValue"]
+        if record.status == "completed":
+            logger.info(
+                "Package '%s' was already submitted as item '%s', re-sending its result",
+                package_id,
+                record.item_handle,
             )
-            raise
+            self.result_message = record.result_message
+            return
+        logger.warning(
+            "Package '%s' was partially submitted as item '%s'",
+            package_id,
+            record.item_handle,
+        )
+        self.result_error_message(
+            f"A previous submission of package '{package_id}' created item "
+            f"'{record.item_handle}' but did not complete. Check the item in DSpace "
+            "before resubmitting the package."
+        )
+        submission_index.discard((package_id, source))
+
+    def begin_journal(self, message_id: str) -> None:
+        """Start the submission's entry in the submission journal, if it is enabled."""
+        arguments = {
+            "attributes": self.result_attributes,
+            "result_queue": self.result_queue,
+            "destination": self.destination,
+            "operation": self.operation,
+            "collection_handle": self.collection_handle,
+            "item_handle": self.item_handle,
+            "metadata_location": self.metadata_location,
+            "files": self.files,
+        }
+        if submission_journal.begin(message_id, arguments):
+            self.journal_id = message_id
+
+    def _journal(
+        self, step: str, dso: DSpaceObject, file_index: int | None = None
+    ) -> None:
+        if self.journal_id:
+            submission_journal.record(self.journal_id, step, dso, file_index)
+
+    def _finish_journal(self) -> None:
+        if self.journal_id:
+            submission_journal.finish(self.journal_id)
+            self.journal_id = None
+
+    def get_dspace_client(self) -> AbstractContextManager[DestinationClient]:
+        """Check out a DSpace client for the submission destination from the pool.
 
-    def get_dspace_client(self) -> DSpaceClient:
-        """Create or get a cached DSpace client for the submission destination."""
+        The client is wrapped in a DestinationClient so that its requests to DSpace
+        are subject to the rate and in-flight limits for the destination. Use the
+        returned context manager in a with statement to check the client back in.
+        """
         if not self.destination:
             raise errors.InvalidDSpaceDestinationError(self.destination)
         logger.debug(f"Getting DSpace client for destination '{self.destination}'")
-        if self.destination not in dspace_clients:
-            client = self._create_dspace_client(self.destination)
-            dspace_clients[self.destination] = client
-        else:
-            logger.debug(
-                f"Using cached DSpace client for destination '{self.destination}'"
-            )
-        return dspace_clients[self.destination]
-
-    def _create_dspace_client(self, destination: str) -> DSpaceClient:
-        """Create a DSpace client for the submission destination."""
-        logger.debug(f"Creating DSpace client for destination '{destination}'")
-        try:
-            credentials = CONFIG.dspace_credentials[destination]
-        except KeyError as exception:
-            raise errors.InvalidDSpaceDestinationError(destination) from exception
-
-        client = DSpaceClient(
-            api_endpoint=credentials["url"],
-            username=credentials["user"],
-            password=credentials["password"],
-            fake_user_agent=True,
-        )
-        authenticated = client.authenticate()
-        if not authenticated:
-            raise errors.DSpaceAuthenticationError(
-                credentials["url"], credentials["user"]
-            )
-        logger.info(
-            f'Successfully authenticated to "{credentials["url"]}" as '
-            f'"{credentials["user"]}"'
-        )
-        return client
+        return dspace_clients.checkout(self.destination)
 
     @classmethod
     def from_message(cls, message: "Message") -> "Submission":
@@ -204,7 +357,7 @@ class Submission:
         if self.operation == ValidItemOperations.UPDATE:
             try:
                 item, bundle = self._update_item()
-            except errors.SubmissionError:
+            except (errors.SubmissionError, errors.SubmissionDeadlineError):
                 logger.exception(
                     f"Error occurred while updating item '{self.item_handle}'"
                 )
@@ -212,10 +365,12 @@ class Submission:
         elif self.operation == ValidItemOperations.CREATE:
             try:
                 item = self._create_item()
+                self._journal("item", item)
+                if self.package_key:
+                    submission_index.record_item(self.package_key, item.handle)
                 bundle = self._create_bundle(item)
-                for bitstream_uri in self.files or []:
-                    self._create_bitstream(item, bundle, bitstream_uri)
-            except errors.SubmissionError:
+                self.bitstreams = self._create_bitstreams(item, bundle)
+            except (errors.SubmissionError, errors.SubmissionDeadlineError):
                 logger.exception(
                     "Error occurred while creating item with PackageID="
                     f"{self.result_attributes.get('PackageID', {}).get('StringValue', 'unknown')}"  # noqa: E501
@@ -237,9 +392,7 @@ class Submission:
         if self.collection_handle is None:
             raise errors.ItemError("collection_handle is required for item creation")
 
-        collection = self.client.resolve_identifier_to_dso(
-            identifier=self.collection_handle
-        )
+        collection = self._resolve_collection(self.collection_handle)
         if not collection:
             raise errors.DSpaceObjectNotFoundError(identifier=self.collection_handle)
 
@@ -264,7 +417,10 @@ class Submission:
                 parent=collection.uuid,
                 item=Item(item_data),
             )
+        except DSPACE_UNAVAILABLE_ERRORS:
+            raise
         except Exception as exception:
+            self._invalidate_collection(self.collection_handle)
             raise errors.ItemError(
                 (
                     "Error occurred while creating item from file "
@@ -277,6 +433,7 @@ class Submission:
         # Item object's handle is None. Should be updated if/when dspace-rest-python
         # is updated to raise exceptions.
         if item.handle is None:
+            self._invalidate_collection(self.collection_handle)
             raise errors.ItemError(
                 f"Error occurred while creating item from file '{self.metadata_location}'"
             )
@@ -284,10 +441,37 @@ class Submission:
         logger.info(f"Item created with handle: {item.handle}")
         return item
 
+    def _resolve_collection(self, handle: str) -> DSpaceObject | None:
+        """Resolve a collection handle to a DSpace object, using the collection cache.
+
+        Only resolved collections are cached; a handle that does not resolve is looked
+        up again the next time.
+        """
+        key = (CONFIG.dspace_instance(self.destination or ""), handle)
+        if collection := collection_cache.get(key):
+            return collection
+        collection = self.client.resolve_identifier_to_dso(identifier=handle)
+        if collection:
+            collection_cache.set(key, collection)
+        return collection
+
+    def _invalidate_collection(self, handle: str) -> None:
+        """Drop a collection from the cache, e.g. if it may have been deleted.
+
+        The DSpace client does not report why creating an item failed, so this is
+        called on any failure rather than only when the collection was not found.
+        """
+        collection_cache.invalidate(
+            (CONFIG.dspace_instance(self.destination or ""), handle)
+        )
+
     def _create_bundle(self, item: Item) -> Bundle:
         """Create ORIGINAL bundle for a specified item."""
         try:
             bundle = self.client.create_bundle(parent=item, name="ORIGINAL")
+        except DSPACE_UNAVAILABLE_ERRORS:
+            self.clean_up_partial_success(item)
+            raise
         except Exception as exception:
             self.clean_up_partial_success(item)
             raise errors.BundleError(
@@ -309,18 +493,70 @@ class Submission:
             )
 
         logger.info(f"Bundle created with UUID: {bundle.uuid}")
+        self._journal("bundle", bundle)
         return bundle
 
-    def _create_bitstream(self, item: Item, bundle: Bundle, bitstream_data: dict) -> None:
+    def _create_bitstreams(self, item: Item, bundle: Bundle) -> list[Bitstream]:
+        """Create bitstreams for all files in the submission.
+
+        Files are uploaded one at a time unless BITSTREAM_UPLOAD_CONCURRENCY is
+        greater than one, in which case they are uploaded concurrently. Either way, if
+        any upload fails no further uploads are started, and once uploads in progress
+        finish the partially posted item is cleaned up.
+
+        Returns the created bitstreams, in the same order as the files.
+        """
+        files = self.files or []
+        if self._upload_concurrency(len(files)) <= 1:
+            return [
+                self._create_bitstream(item, bundle, bitstream_data)
+                for bitstream_data in files
+            ]
+
+        futures = self._start_uploads(
+            lambda client, bitstream_data: self._upload_bitstream(
+                item, bundle, bitstream_data, client
+            ),
+            files,
+            fail_fast=True,
+        )
+        for future in futures:
+            exception = future.exception() if not future.cancelled() else None
+            if exception is not None:
+                self.clean_up_partial_success(item)
+                raise exception
+        return [future.result() for future in futures]
+
+    def _create_bitstream(
+        self, item: Item, bundle: Bundle, bitstream_data: dict
+    ) -> Bitstream:
         """Create bitstream for a specified item bundle."""
         try:
-            bitstream = self.client.create_bitstream(
+            return self._upload_bitstream(item, bundle, bitstream_data)
+        except (errors.BitstreamError, *DSPACE_UNAVAILABLE_ERRORS):
+            self.clean_up_partial_success(item)
+            raise
+
+    def _upload_bitstream(
+        self,
+        item: Item,
+        bundle: Bundle,
+        bitstream_data: dict,
+        client: DestinationClient | None = None,
+    ) -> Bitstream:
+        """Upload a file as a bitstream to a specified item bundle.
+
+        The file is uploaded with `client`, if given, rather than the submission's.
+        """
+        try:
+            bitstream = (client or self.client).create_bitstream(
                 bundle=bundle,
                 name=os.path.basename(bitstream_data["BitstreamName"]),
                 path=bitstream_data["FileLocation"],
             )
+        except DSPACE_UNAVAILABLE_ERRORS:
+            raise
         except Exception as exception:
-            self.clean_up_partial_success(item)
             raise errors.BitstreamError(
                 (
                     "Error occurred while creating bitstream from file "
@@ -333,7 +569,6 @@ class Submission:
         # returns None. Should be updated if/when dspace-rest-python
         # is updated to raise exceptions.
         if bitstream is None:
-            self.clean_up_partial_success(item)
             raise errors.BitstreamError(
                 (
                     "Error occurred while creating bitstream from file "
@@ -342,6 +577,77 @@ class Submission:
             )
 
         logger.info(f"Bitstream created with UUID: {bitstream.uuid}")
+        self._journal("bitstream", bitstream, (self.files or []).index(bitstream_data))
+        return bitstream
+
+    def _upload_concurrency(self, file_count: int) -> int:
+        return min(CONFIG.bitstream_upload_concurrency, file_count)
+
+    def _start_uploads(
+        self,
+        upload: Callable[[DestinationClient, dict], Bitstream | None],
+        files: list[dict],
+        *,
+        fail_fast: bool,
+    ) -> list[Future]:
+        """Run an upload for each file concurrently and wait for them to finish.
+
+        Concurrent uploads are bounded per submission by BITSTREAM_UPLOAD_CONCURRENCY
+        and per DSpace instance by DSPACE_MAX_CONCURRENT_UPLOADS. If fail_fast is
+        set, uploads not yet started are cancelled once any upload fails.
+
+        As a client's session and CSRF token must not be shared between threads,
+        each upload uses a client of its own: the submission's client, or one
+        checked out from the pool for the uploads. Clients are only checked out if
+        the pool has one to spare without waiting, so that submissions waiting for
+        each other's clients cannot deadlock; uploads are run by as many threads as
+        there are clients.
+
+        Returns the futures of the uploads, in the same order as the files.
+        """
+        destination = self.destination or ""
+        with ExitStack() as stack:
+            clients: stdlib_queue.SimpleQueue[DestinationClient] = (
+                stdlib_queue.SimpleQueue()
+            )
+            clients.put(self.client)
+            for _ in range(self._upload_concurrency(len(files)) - 1):
+                client = stack.enter_context(dspace_clients.try_checkout(destination))
+                if client is None:
+                    break
+                client.deadline = self.client.deadline
+                clients.put(client)
+
+            def limited_upload(bitstream_data: dict) -> Bitstream | None:
+                client = clients.get()
+                try:
+                    with upload_slots.slot(
+                        CONFIG.dspace_instance(destination),
+                        int(
+                            CONFIG.dspace_setting(
+                                destination,
+                                "max_concurrent_uploads",
+                                CONFIG.dspace_max_concurrent_uploads,
+                            )
+                        ),
+                    ):
+                        return upload(client, bitstream_data)
+                finally:
+                    clients.put(client)
+
+            with ThreadPoolExecutor(
+                max_workers=clients.qsize(),
+                thread_name_prefix="submitter-upload",
+            ) as executor:
+                futures = [
+                    executor.submit(limited_upload, bitstream_data)
+                    for bitstream_data in files
+                ]
+                if fail_fast:
+                    wait(futures, return_when=FIRST_EXCEPTION)
+                    for future in futures:
+                        future.cancel()
+        return futures
 
     def _update_item(self) -> tuple[Item, Bundle]:
         """Update item in DSpace"""
@@ -377,6 +683,7 @@ class Submission:
 
         old_bitstream, bundle = self._get_item_bitstream_bundle(item)
         new_bitstreams = self._upload_new_item_bitstreams(item, bundle)
+        self.bitstreams = new_bitstreams
 
         # add metadata entry for successfully added bitstreams
         self.client.add_metadata(
@@ -392,6 +699,7 @@ class Submission:
         # add metadata entry for deleted bitstream
         if old_bitstream is not None:
             self._delete_old_item_bitstream(item, old_bitstream)
+            self._journal("bitstream-deleted", old_bitstream)
             self.client.add_metadata(
                 item,
                 field="dc.description.provenance",
@@ -432,32 +740,47 @@ class Submission:
         new bitstreams fail upload, the method will undo all successful bitstream
         uploads and raise a `BitstreamError` that optionally includes a message
         indicating whether the original item state was restored. Otherwise,
-        the method returns a list of the newly added bitstreams.
+        the method returns a list of the newly added bitstreams. If DSpace timed out
+        or could not be reached, the uploads are undone and its error is raised.
         """
         if not self.files:
             raise errors.ItemError("The 'files' attribute cannot be empty")
 
         added_bitstreams: list[Bitstream] = []
         failed_bitstreams: list[str] = []
+        unavailable_errors: list[Exception] = []
 
-        # update 'ORIGINAL' bundle with new bitstreams
-        for bitstream_uri in self.files:
+        def try_upload(
+            bitstream_uri: dict, client: DestinationClient | None = None
+        ) -> Bitstream | None:
             try:
-                bitstream = self.client.create_bitstream(
-                    bundle=bundle,
-                    name=os.path.basename(bitstream_uri["BitstreamName"]),
-                    path=bitstream_uri["FileLocation"],
-                )
-            except Exception:  # noqa: BLE001
+                return self._upload_bitstream(item, bundle, bitstream_uri, client)
+            except errors.BitstreamError:
+                return None
+            except DSPACE_UNAVAILABLE_ERRORS as exception:
+                unavailable_errors.append(exception)
+                return None
+
+        # update 'ORIGINAL' bundle with new bitstreams
+        if self._upload_concurrency(len(self.files)) > 1:
+            futures = self._start_uploads(
+                lambda client, bitstream_uri: try_upload(bitstream_uri, client),
+                self.files,
+                fail_fast=False,
+            )
+            uploads = [future.result() for future in futures]
+        else:
+            uploads = [try_upload(bitstream_uri) for bitstream_uri in self.files]
+
+        for bitstream_uri, bitstream in zip(self.files, uploads, strict=True):
+            if bitstream is None:
                 failed_bitstreams.append(bitstream_uri["BitstreamName"])
-                continue
             else:
-                # NOTE: This check is added because the client can return None
-                if bitstream is None:
-                    failed_bitstreams.append(bitstream_uri["BitstreamName"])
-                else:
-                    added_bitstreams.append(bitstream)
+                added_bitstreams.append(bitstream)
 
+        if unavailable_errors:
+            self._undo_bitstream_updates(added_bitstreams)
+            raise unavailable_errors[0]
         if failed_bitstreams:
             if not added_bitstreams:
                 raise errors.BitstreamError(
@@ -515,7 +838,8 @@ class Submission:
         deleted_bitstreams: list[Bitstream] = []
         for bitstream in bitstreams:
             try:
-                self._delete_bitstream(bitstream)
+                with self.client.deadline_lifted():
+                    self._delete_bitstream(bitstream)
                 deleted_bitstreams.append(bitstream)
             except errors.BitstreamError:
                 logger.exception("Error occurred while undoing bitstream update")
@@ -569,7 +893,12 @@ class Submission:
         }
 
     def result_success_message(self, item: Item, bundle: Bundle) -> None:
-        """Set result message on Submission object on successful submit."""
+        """Set result message on Submission object on successful submit.
+
+        The bitstreams reported are those returned by DSpace when they were uploaded.
+        If VERIFY_RESULT_BITSTREAMS is set, or the uploaded bitstreams are not known,
+        the bitstreams in the bundle are retrieved from DSpace instead.
+        """
         self.result_message = {
             "ResultType": "success",
             "ItemHandle": item.handle,
@@ -577,7 +906,18 @@ class Submission:
             "Bitstreams": [],
         }
 
-        bitstreams = self.client.get_bitstreams(bundle=bundle)
+        if self.bitstreams is not None and not CONFIG.verify_result_bitstreams:
+            bitstreams = self.bitstreams
+        else:
+            bitstreams = self.client.get_bitstreams(bundle=bundle)
+            if self.bitstreams is not None and {b.uuid for b in bitstreams} != {
+                b.uuid for b in self.bitstreams
+            }:
+                logger.warning(
+                    "Bitstreams in bundle %s for item '%s' differ from those uploaded",
+                    bundle.uuid,
+                    item.handle,
+                )
 
         for bitstream in bitstreams:
             self.result_message["Bitstreams"].append(
@@ -588,14 +928,80 @@ class Submission:
                 }
             )
 
+    def resume(self, entry: JournalEntry) -> None:
+        """Finish or undo the changes of an interrupted submission journaled in entry.
+
+        A created item is completed by creating its bundle if needed and uploading the
+        files not yet uploaded; its result is then stored in the idempotency index, to
+        be sent when the message is received again. If that fails, the item is
+        cleaned up and the package can be submitted again. An update is undone by
+        deleting the bitstreams it uploaded, unless it had already deleted the item's
+        original bitstream, as the update was then all but complete.
+
+        Raises:
+            Exception: If DSpace could not be reached, or a created item that could
+                not be completed could not be deleted, in which case the entry is left
+                to be reconciled later.
+        """
+        if self.operation == ValidItemOperations.UPDATE:
+            if entry.bitstream_deleted:
+                logger.warning(
+                    "Update of item '%s' was interrupted after replacing its bitstreams",
+                    self.item_handle,
+                )
+                return
+            remaining = self._undo_bitstream_updates(
+                [Bitstream(bitstream) for bitstream in entry.bitstreams.values()]
+            )
+            if remaining:
+                raise errors.BitstreamError(
+                    f"Failed to delete bitstreams {remaining} uploaded by the "
+                    f"interrupted update of item '{self.item_handle}'"
+                )
+            return
+        if entry.item is None:
+            return
+
+        item = Item(entry.item)
+        logger.info("Resuming interrupted submission of item '%s'", item.handle)
+        try:
+            bundle = Bundle(entry.bundle) if entry.bundle else self._create_bundle(item)
+            # files are uploaded one at a time, as only the remaining ones are
+            self.bitstreams = [
+                Bitstream(entry.bitstreams[index])
+                if index in entry.bitstreams
+                else self._create_bitstream(item, bundle, bitstream_data)
+                for index, bitstream_data in enumerate(self.files or [])
+            ]
+        except (errors.SubmissionError, *DSPACE_UNAVAILABLE_ERRORS):
+            if not self.cleaned_up:
+                # e.g. DSpace became unreachable, so the item is still to be cleaned up
+                raise
+            logger.exception("Failed to resume submission of item '%s'", item.handle)
+            if key := self._package():
+                submission_index.discard(key)
+            return
+
+        self.result_success_message(item, bundle)
+        if key := self._package():
+            submission_index.complete(key, self.result_message, item.handle)
+        logger.info("Resumed submission of item '%s'", item.handle)
+
     def clean_up_partial_success(self, item: Item) -> None:
         handle = item.handle
         logger.info("Item '%s' was partially posted to DSpace, cleaning up", item.handle)
         try:
-            self.client.delete_dso(item)
-            logger.info("Item '%s' deleted from DSpace", handle)
+            with self.client.deadline_lifted():
+                response = self.client.delete_dso(item)
         except Exception:
             logger.exception("Failed to delete DSpace item '%s'", handle)
+            return
+        # the DSpace client returns None rather than raising if DSpace refuses
+        if response is None:
+            logger.error("Failed to delete DSpace item '%s'", handle)
+            return
+        logger.info("Item '%s' deleted from DSpace", handle)
+        self.cleaned_up = True
 
 
 def prettify(traceback: list) -> list[str]:
@@ -604,3 +1010,55 @@ def prettify(traceback: list) -> list[str]:
         lines = item.strip().split("\n")
         output.extend([line.strip().replace('\\"', "'") for line in lines])
     return output
+
+
+def resume_submission(entry: JournalEntry) -> bool:
+    """Reconcile the journal entry of an interrupted submission.
+
+    Returns whether the entry was reconciled and removed; it is kept to be reconciled
+    later if DSpace could not be reached.
+    """
+    arguments = {**entry.submission}
+    if arguments["operation"] is not None:
+        arguments["operation"] = ValidItemOperations(arguments["operation"])
+    submission = Submission(**arguments)
+    submission.journal_id = entry.message_id
+    try:
+        with submission.get_dspace_client() as submission.client:
+            submission.resume(entry)
+    except Exception:
+        logger.exception(
+            "Failed to reconcile interrupted submission of message '%s'",
+            entry.message_id,
+        )
+        return False
+    submission_journal.finish(entry.message_id)
+    return True
+
+
+def reconcile_message(message_id: str) -> bool:
+    """Reconcile the journal entry of a message, if any, before it is submitted again.
+
+    Returns whether the message has no unreconciled entry. The entry of a submission
+    of the message still running in this process is not reconciled.
+    """
+    entry = submission_journal.get(message_id)
+    if entry is None:
+        return True
+    if submission_journal.active(message_id):
+        logger.info("Message '%s' is still being submitted", message_id)
+        return False
+    return resume_submission(entry)
+
+
+def reconcile_journal() -> None:
+    """Reconcile the journal entries of submissions interrupted by a stop or crash."""
+    entries = [
+        entry
+        for entry in submission_journal.entries()
+        if not submission_journal.active(entry.message_id)
+    ]
+    if entries:
+        logger.info("Reconciling %d interrupted submissions", len(entries))
+    for entry in entries:
+        resume_submission(entry)
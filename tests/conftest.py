@@ -1,5 +1,7 @@
 # ruff: noqa: S105
 
+import email.parser
+import hashlib
 import json
 import os
 
@@ -9,8 +11,18 @@ import requests_mock
 from dspace_rest_client.client import DSpaceClient
 from moto import mock_aws
 
+from submitter.config import Config
+from submitter.dspace import DestinationClient, shared_tokens
+from submitter.idempotency import submission_index
+from submitter.journal import submission_journal
+from submitter.limits import (
+    circuit_breakers,
+    request_governors,
+    submission_slots,
+    upload_slots,
+)
 from submitter.sqs import _sqs_queues
-from submitter.submission import Submission, dspace_clients
+from submitter.submission import Submission, collection_cache, dspace_clients
 
 
 @pytest.fixture
@@ -54,6 +66,27 @@ def test_aws_user(aws_credentials):
         yield client.create_access_key(UserName="test-user")["AccessKey"]
 
 
+def bitstream_created(request, _context):
+    """Read an uploaded bitstream like DSpace would, responding with its checksum."""
+    multipart = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode()
+        + request.body.read()
+    )
+    content = next(
+        part.get_payload(decode=True)
+        for part in multipart.get_payload()
+        if part.get_filename()
+    )
+    return {
+        "uuid": "bitstream01",
+        "name": "test-file-01.pdf",
+        "checkSum": {
+            "checkSumAlgorithm": "MD5",
+            "value": hashlib.md5(content).hexdigest(),  # noqa: S324
+        },
+    }
+
+
 @pytest.fixture
 def mocked_dspace():
     """The following mock responses from DSpace based on the URL of the request.
@@ -80,7 +113,7 @@ def mocked_dspace():
                 },
             },
         )
-        m.delete("mock://dspace.edu/server/api/core/items/item01", status_code=200)
+        m.delete("mock://dspace.edu/server/api/core/items/item01", status_code=204)
         m.post(
             "mock://dspace.edu/server/api/core/items/item01/bundles",
             json={
@@ -113,12 +146,7 @@ def mocked_dspace():
         )
         m.post(
             "mock://dspace.edu/server/api/core/bundles/bundle01/bitstreams",
-            json={
-                "uuid": "bitstream01",
-                "name": "test-file-01.pdf",
-                "checkSum": "62778292a3a6dccbe2662a2bfca3b86e",
-                "checkSumAlgorithm": "MD5",
-            },
+            json=bitstream_created,
         )
         m.get(
             "mock://dspace.edu/server/api/core/bundles/bundle01/bitstreams",
@@ -128,8 +156,10 @@ def mocked_dspace():
                         {
                             "uuid": "bitstream01",
                             "name": "test-file-01.pdf",
-                            "checkSum": "62778292a3a6dccbe2662a2bfca3b86e",
-                            "checkSumAlgorithm": "MD5",
+                            "checkSum": {
+                                "checkSumAlgorithm": "MD5",
+                                "value": "a4e0f4930dfaff904fa3c6c85b0b8ecc",
+                            },
                         }
                     ]
                 },
@@ -158,9 +188,12 @@ def mocked_sqs(aws_credentials):
         sqs.create_queue(QueueName="empty_input_queue")
         sqs.create_queue(QueueName="empty_result_queue")
         queue = sqs.create_queue(QueueName="input_queue_with_messages")
-        for _i in range(11):
+        for i in range(11):
             queue.send_message(
-                MessageAttributes=test_attributes,
+                MessageAttributes={
+                    **test_attributes,
+                    "PackageID": {"DataType": "String", "StringValue": f"etdtest{i:02d}"},
+                },
                 MessageBody=json.dumps(
                     {
                         "SubmissionSystem": "IR-8",
@@ -209,8 +242,15 @@ def dspace_client(mocked_dspace):
 
 @pytest.fixture(autouse=True)
 def clear_dspace_client_cache():
-    """Clear the DSpace client cache before each test."""
+    """Clear the DSpace client pool and shared access tokens before each test."""
     dspace_clients.clear()
+    shared_tokens.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_collection_cache():
+    """Clear the collection cache before each test."""
+    collection_cache.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -219,6 +259,35 @@ def clear_sqs_queue_cache():
     _sqs_queues.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_submission_index():
+    """Reopen the idempotency index, which is in memory, empty, before each test."""
+    submission_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_submission_journal():
+    """Close the submission journal, which is disabled unless a test enables it."""
+    submission_journal.clear()
+
+
+@pytest.fixture
+def journal_path(monkeypatch, tmp_path):
+    """Enable the submission journal, in a database file in a temporary directory."""
+    path = str(tmp_path / "journal.db")
+    monkeypatch.setenv("SUBMISSION_JOURNAL_PATH", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def clear_submission_slots():
+    """Clear the per-instance submission, upload, and request limits before each test."""
+    submission_slots.clear()
+    upload_slots.clear()
+    request_governors.clear()
+    circuit_breakers.clear()
+
+
 @pytest.fixture
 def dspace_submission_instance(dspace_client):
     submission = Submission(
@@ -240,7 +309,7 @@ def dspace_submission_instance(dspace_client):
         result_queue=None,
         attributes={},
     )
-    submission.client = dspace_client
+    submission.client = DestinationClient(dspace_client, "DSpace@MIT")
     return submission
 
 
@@ -430,6 +499,8 @@ def test_env(monkeypatch):
     monkeypatch.setenv("DSPACE_TIMEOUT", "3")
     monkeypatch.setenv("SKIP_PROCESSING", "false")
     monkeypatch.setenv("SQS_ENDPOINT_URL", "https://sqs.us-east-1.amazonaws.com/")
+    monkeypatch.setenv("IDEMPOTENCY_DB_PATH", ":memory:")
+    Config.reload()
 
 
 test_attributes = {
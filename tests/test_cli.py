@@ -1,8 +1,52 @@
 import logging
+import subprocess
+import sys
+from unittest.mock import patch
 
 from click.testing import CliRunner
+from jsonschema.exceptions import SchemaError
 
 from submitter.cli import main
+from submitter.errors import DSpaceAuthenticationError
+from submitter.submission import dspace_clients
+
+
+def test_cli_import_does_not_load_command_dependencies():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, submitter.cli; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+
+    for module in (
+        "boto3",
+        "dspace_rest_client",
+        "jsonschema",
+        "sentry_sdk",
+        "smart_open",
+    ):
+        assert module not in loaded
+
+
+def test_sqs_import_does_not_load_dspace_dependencies():
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, submitter.sqs; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+
+    for module in ("dspace_rest_client", "smart_open"):
+        assert module not in loaded
 
 
 def test_cli_load_sample_input_data(mocked_sqs):
@@ -75,6 +119,107 @@ def test_cli_start(mocked_dspace, mocked_sqs):
     assert len(out_messages) > 0
 
 
+@patch("submitter.sqs.message_loop")
+@patch("submitter.message.load_validators")
+def test_cli_start_invalid_schema_fails_before_polling(
+    mock_load_validators, mock_message_loop
+):
+    mock_load_validators.side_effect = SchemaError("not a valid schema")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["start", "--queue", "input_queue_with_messages"])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SchemaError)
+    mock_message_loop.assert_not_called()
+
+
+@patch("submitter.sqs.message_loop")
+def test_cli_start_malformed_credentials_fail_before_polling(
+    mock_message_loop, monkeypatch
+):
+    monkeypatch.setenv("DSS_DSPACE_CREDENTIALS", "not json")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["start", "--queue", "input_queue_with_messages"])
+
+    assert result.exit_code == 1
+    assert "Env var 'DSS_DSPACE_CREDENTIALS' is not valid JSON" in str(result.exception)
+    mock_message_loop.assert_not_called()
+
+
+@patch("submitter.sqs.message_loop")
+def test_cli_start_prewarm_authenticates_all_destinations(
+    mock_message_loop, mocked_dspace
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["start", "--queue", "input_queue_with_messages", "--prewarm"]
+    )
+
+    assert result.exit_code == 0
+    # DSpace@MIT and IR-8 are the same instance, which is logged in to once
+    assert dspace_clients.sizes() == {"ir-8": 1, "ddc-8": 1}
+    mock_message_loop.assert_called_once()
+
+
+@patch("submitter.sqs.message_loop")
+def test_cli_start_prewarm_auth_failure_fails_before_polling(
+    mock_message_loop, mocked_dspace_auth_failure
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["start", "--queue", "input_queue_with_messages", "--prewarm"]
+    )
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, DSpaceAuthenticationError)
+    mock_message_loop.assert_not_called()
+
+
+@patch("submitter.submission.reconcile_journal")
+@patch("submitter.sqs.message_loop")
+def test_cli_start_reconciles_submission_journal_before_polling(
+    mock_message_loop, mock_reconcile_journal, journal_path, mocked_sqs
+):
+    runner = CliRunner()
+    result = runner.invoke(main, ["start", "--queue", "input_queue_with_messages"])
+
+    assert result.exit_code == 0
+    mock_reconcile_journal.assert_called_once()
+    mock_message_loop.assert_called_once()
+
+
+@patch("submitter.submission.reconcile_journal")
+@patch("submitter.sqs.message_loop")
+def test_cli_start_without_journal_path_skips_reconciliation(
+    mock_message_loop, mock_reconcile_journal, mocked_sqs
+):
+    runner = CliRunner()
+    result = runner.invoke(main, ["start", "--queue", "input_queue_with_messages"])
+
+    assert result.exit_code == 0
+    mock_reconcile_journal.assert_not_called()
+
+
+@patch("submitter.sqs.message_loop")
+def test_cli_start_passes_shutdown_grace_period(mock_message_loop, mocked_sqs):
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "start",
+            "--queue",
+            "input_queue_with_messages",
+            "--shutdown-grace-period",
+            "2.5",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert mock_message_loop.call_args.kwargs["shutdown_grace_period"] == 2.5  # noqa: PLR2004
+
+
 def test_verify_connection_success(mocked_dspace, caplog):
     with caplog.at_level(logging.INFO):
         runner = CliRunner()
@@ -1,3 +1,5 @@
+import json
+import re
 from unittest.mock import patch
 
 import pytest
@@ -22,6 +24,93 @@ def test_config_required_env_var_access(monkeypatch):
         _ = CONFIG.input_queue
 
 
+def test_config_snapshot_is_reused_until_reload(monkeypatch):
+    snapshot = CONFIG.snapshot
+    assert CONFIG.snapshot is snapshot
+
+    monkeypatch.setenv("OUTPUT_QUEUES", "queue_a,queue_b")
+    assert CONFIG.output_queues == ["empty_result_queue"]
+
+    assert Config.reload() is CONFIG.snapshot
+    assert CONFIG.output_queues == ["queue_a", "queue_b"]
+
+
+def test_config_dspace_credentials_are_immutable():
+    with pytest.raises(TypeError):
+        CONFIG.dspace_credentials["IR-8"]["url"] = "mock://elsewhere"  # type: ignore[index]
+
+
+VALID_ENTRY = {"url": "mock://dspace.edu", "user": "test", "password": "test"}
+
+
+def test_config_reload_ignores_unknown_dspace_credential_fields(monkeypatch, caplog):
+    monkeypatch.setenv(
+        "DSS_DSPACE_CREDENTIALS",
+        json.dumps(
+            {
+                "ir-8": {**VALID_ENTRY, "description": "DSpace@MIT", "max_in_flight": 2},
+                "ddc-8": VALID_ENTRY,
+            }
+        ),
+    )
+    config = Config()
+    config.reload()
+
+    assert "Ignoring unknown field 'description' for 'ir-8'" in caplog.text
+    assert config.dspace_setting("IR-8", "max_in_flight", 0) == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("credentials", "error"),
+    [
+        ("not json", "is not valid JSON"),
+        (json.dumps({"ir-8": VALID_ENTRY}), "no entry for 'ddc-8'"),
+        (
+            json.dumps(
+                {"ir-8": {"url": "u", "user": "test"}, "ddc-8": VALID_ENTRY},
+            ),
+            "is missing ['password'] for 'ir-8'",
+        ),
+        (
+            json.dumps({"ir-8": {**VALID_ENTRY, "url": ""}, "ddc-8": VALID_ENTRY}),
+            "has an invalid 'url' for 'ir-8'",
+        ),
+        (
+            json.dumps(
+                {"ir-8": VALID_ENTRY, "ddc-8": {**VALID_ENTRY, "max_in_flight": "2"}}
+            ),
+            "has an invalid 'max_in_flight' for 'ddc-8'",
+        ),
+    ],
+)
+def test_config_reload_malformed_dspace_credentials_raises_error(
+    monkeypatch, credentials, error
+):
+    monkeypatch.setenv("DSS_DSPACE_CREDENTIALS", credentials)
+    with pytest.raises(OSError, match=re.escape(error)):
+        Config.reload()
+
+
+def test_config_reload_requires_idempotency_db_path_in_deployed_workspace(
+    monkeypatch,
+):
+    monkeypatch.setenv("WORKSPACE", "prod")
+    monkeypatch.delenv("IDEMPOTENCY_DB_PATH")
+    with pytest.raises(OSError, match="'IDEMPOTENCY_DB_PATH' must be defined"):
+        Config.reload()
+
+    monkeypatch.setenv("IDEMPOTENCY_DB_PATH", "/mnt/dss/idempotency.db")
+    assert Config.reload()
+
+
+def test_config_idempotency_db_path_defaults_to_memory_outside_deployed_workspace(
+    monkeypatch,
+):
+    monkeypatch.delenv("IDEMPOTENCY_DB_PATH")
+    Config.reload()
+    assert CONFIG.idempotency_db_path == ":memory:"
+
+
 def test_config_configures_sentry_if_dsn_present(caplog, monkeypatch):
     monkeypatch.setenv("SENTRY_DSN", "https://1234567890@00000.ingest.sentry.io/123456")
     with patch("sentry_sdk.init") as mock_init:
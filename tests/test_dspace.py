@@ -0,0 +1,879 @@
+import base64
+import email.parser
+import io
+import json
+import re
+import socket
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from dspace_rest_client.client import DSpaceClient
+from dspace_rest_client.models import Bundle
+
+from submitter import errors
+from submitter.config import Config
+from submitter.dspace import (
+    MIB,
+    ClientPool,
+    Deadline,
+    DestinationClient,
+    MultipartFileBody,
+    RetryPolicy,
+    cap_timeout,
+    mount_http_adapter,
+    shared_tokens,
+    upload_timeout,
+)
+
+BITSTREAMS_URL = "mock://dspace.edu/server/api/core/bundles/bundle01/bitstreams"
+
+
+@pytest.fixture
+def bundle():
+    return Bundle({"uuid": "bundle01", "name": "ORIGINAL"})
+
+
+def parse_multipart(content_type, body):
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part
+        for part in message.get_payload()
+    }
+
+
+def test_destination_client_governs_requests(dspace_client):
+    client = DestinationClient(dspace_client, "IR-8")
+    client.governor = MagicMock()
+
+    dso = client.resolve_identifier_to_dso(identifier="0000/collection01")
+
+    assert dso.uuid == "collection01"
+    client.governor.request.assert_called_once()
+
+
+def test_destination_client_governs_each_step_of_iterator_methods(dspace_client):
+    client = DestinationClient(dspace_client, "IR-8")
+    client.governor = MagicMock()
+    dspace_client.get_bundles_iter = MagicMock(return_value=iter(["a", "b"]))
+
+    assert list(client.get_bundles_iter(parent=None)) == ["a", "b"]
+    # one for each item, and one for the end of the iterator
+    assert client.governor.request.call_count == 3  # noqa: PLR2004
+
+
+def test_destination_client_governs_reauthentication(dspace_client):
+    client = DestinationClient(dspace_client, "IR-8")
+    client.governor = MagicMock()
+
+    client.reauthenticate(None)
+
+    client.governor.request.assert_called_once()
+
+
+def test_destination_client_passes_through_other_attributes(dspace_client):
+    client = DestinationClient(dspace_client, "IR-8")
+    client.governor = MagicMock()
+
+    assert client.API_ENDPOINT == "mock://dspace.edu/server/api"
+    assert client.session is dspace_client.session
+    client.governor.request.assert_not_called()
+
+
+def test_multipart_file_body_encodes_fields_and_file():
+    body = MultipartFileBody(
+        {"properties": '{"name": "a.pdf"};application/json'},
+        "file",
+        "a.pdf",
+        io.BytesIO(b"file content"),
+    )
+
+    content = b"".join(iter(lambda: body.read(5), b""))
+
+    assert len(content) == len(body)
+    parts = parse_multipart(body.content_type, content)
+    assert parts["properties"].get_payload() == '{"name": "a.pdf"};application/json'
+    assert parts["file"].get_filename() == "a.pdf"
+    assert parts["file"].get_payload(decode=True) == b"file content"
+
+
+def test_destination_client_create_bitstream_streams_file(
+    mocked_dspace, dspace_client, bundle
+):
+    received = {}
+
+    def bitstream_created(request, _context):
+        received["content_type"] = request.headers["Content-Type"]
+        received["content_length"] = int(request.headers["Content-Length"])
+        received["body"] = request.body.read()
+        return {"uuid": "bitstream01", "name": "test-file-01.pdf"}
+
+    mocked_dspace.post(BITSTREAMS_URL, json=bitstream_created, status_code=201)
+    client = DestinationClient(dspace_client, "IR-8")
+    client.governor = MagicMock()
+
+    bitstream = client.create_bitstream(
+        bundle=bundle, name="test-file-01.pdf", path="tests/fixtures/test-file-01.pdf"
+    )
+
+    assert bitstream.uuid == "bitstream01"
+    client.governor.request.assert_called_once()
+    assert received["content_length"] == len(received["body"])
+    parts = parse_multipart(received["content_type"], received["body"])
+    assert json.loads(parts["properties"].get_payload().split(";")[0]) == {
+        "name": "test-file-01.pdf",
+        "metadata": {},
+        "bundleName": "ORIGINAL",
+    }
+    with open("tests/fixtures/test-file-01.pdf", "rb") as file:
+        assert parts["file"].get_payload(decode=True) == file.read()
+
+
+def test_destination_client_create_bitstream_retries_with_csrf_token(
+    mocked_dspace, dspace_client, bundle
+):
+    mocked_dspace.post(
+        BITSTREAMS_URL,
+        [
+            {
+                "status_code": 403,
+                "json": {"message": "Invalid CSRF token"},
+                "headers": {"DSPACE-XSRF-TOKEN": "new-token"},
+            },
+            {"status_code": 201, "json": {"uuid": "bitstream01"}},
+        ],
+    )
+    client = DestinationClient(dspace_client, "IR-8")
+
+    bitstream = client.create_bitstream(
+        bundle=bundle, name="test-file-01.pdf", path="tests/fixtures/test-file-01.pdf"
+    )
+
+    assert bitstream.uuid == "bitstream01"
+    assert mocked_dspace.request_history[-1].headers["X-XSRF-Token"] == "new-token"
+
+
+def test_destination_client_create_bitstream_reauthenticates(
+    mocked_dspace, dspace_client, bundle
+):
+    mocked_dspace.post(
+        BITSTREAMS_URL,
+        [{"status_code": 401}, {"status_code": 201, "json": {"uuid": "bitstream01"}}],
+    )
+    client = DestinationClient(dspace_client, "IR-8")
+    logins = mocked_dspace.call_count
+
+    bitstream = client.create_bitstream(
+        bundle=bundle, name="test-file-01.pdf", path="tests/fixtures/test-file-01.pdf"
+    )
+
+    assert bitstream.uuid == "bitstream01"
+    login_urls = [request.url for request in mocked_dspace.request_history[logins:]]
+    assert "mock://dspace.edu/server/api/authn/login" in login_urls
+
+
+def test_destination_client_create_bitstream_error_returns_none(
+    mocked_dspace, dspace_client, bundle, caplog
+):
+    mocked_dspace.post(BITSTREAMS_URL, status_code=500, text="Internal Server Error")
+    client = DestinationClient(dspace_client, "IR-8")
+
+    assert (
+        client.create_bitstream(
+            bundle=bundle,
+            name="test-file-01.pdf",
+            path="tests/fixtures/test-file-01.pdf",
+        )
+        is None
+    )
+    assert "Error creating bitstream: 500: Internal Server Error" in caplog.text
+
+
+class DiscardingHandler(BaseHTTPRequestHandler):
+    """Read and discard a request body in chunks, then respond with a bitstream."""
+
+    def do_POST(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 65536)))
+        response = json.dumps({"uuid": "bitstream01"}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_destination_client_create_bitstream_memory_does_not_grow_with_file_size(
+    tmp_path, bundle
+):
+    file_size = 64 * 1024 * 1024
+    path = tmp_path / "large-file.bin"
+    with path.open("wb") as file:
+        for _ in range(file_size // (1024 * 1024)):
+            file.write(b"\0" * 1024 * 1024)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DiscardingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        dspace_client = DSpaceClient(
+            api_endpoint=f"http://127.0.0.1:{server.server_port}/server/api"
+        )
+        client = DestinationClient(dspace_client, "IR-8")
+
+        tracemalloc.start()
+        try:
+            bitstream = client.create_bitstream(
+                bundle=bundle, name="large-file.bin", path=str(path)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert bitstream.uuid == "bitstream01"
+    assert peak < file_size / 16
+
+
+def test_destination_client_create_bitstream_checksum_mismatch_deletes_bitstream(
+    mocked_dspace, dspace_client, bundle
+):
+    def bitstream_created(request, _context):
+        request.body.read()
+        return {
+            "uuid": "bitstream01",
+            "checkSum": {"checkSumAlgorithm": "MD5", "value": "not-the-checksum"},
+            "_links": {
+                "self": {
+                    "href": "mock://dspace.edu/server/api/core/bitstreams/bitstream01"
+                }
+            },
+        }
+
+    mocked_dspace.post(BITSTREAMS_URL, json=bitstream_created)
+    delete = mocked_dspace.delete(
+        "mock://dspace.edu/server/api/core/bitstreams/bitstream01", status_code=204
+    )
+    client = DestinationClient(dspace_client, "IR-8")
+
+    with pytest.raises(
+        errors.BitstreamChecksumError,
+        match=re.escape(
+            "Checksum of bitstream 'test-file-01.pdf' reported by DSpace "
+            "(not-the-checksum) does not match the checksum of the uploaded file "
+            "(a4e0f4930dfaff904fa3c6c85b0b8ecc)"
+        ),
+    ):
+        client.create_bitstream(
+            bundle=bundle, name="test-file-01.pdf", path="tests/fixtures/test-file-01.pdf"
+        )
+
+    assert delete.call_count == 1
+
+
+def test_destination_client_create_bitstream_verifies_checksum(
+    mocked_dspace, dspace_client, bundle
+):
+    client = DestinationClient(dspace_client, "IR-8")
+
+    bitstream = client.create_bitstream(
+        bundle=bundle, name="test-file-01.pdf", path="tests/fixtures/test-file-01.pdf"
+    )
+
+    assert bitstream.checkSum["value"] == "a4e0f4930dfaff904fa3c6c85b0b8ecc"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_client_pool_checks_out_one_client_per_worker(dspace_client):
+    created = []
+
+    def factory(destination):
+        created.append(destination)
+        return DestinationClient(dspace_client, destination)
+
+    pool = ClientPool(factory)
+    with pool.checkout("IR-8") as first, pool.checkout("IR-8") as second:
+        assert first is not second
+    with pool.checkout("IR-8") as third, pool.checkout("DDC-8"):
+        assert third in {first, second}
+
+    assert created == ["IR-8", "IR-8", "DDC-8"]
+    assert pool.sizes() == {"ir-8": 2, "ddc-8": 1}
+
+
+def test_client_pool_shares_clients_between_aliases(dspace_client, monkeypatch):
+    monkeypatch.setenv("DSPACE_CLIENT_POOL_SIZE", "1")
+    pool = ClientPool(lambda destination: DestinationClient(dspace_client, destination))
+
+    # the pool of the instance is full, whichever alias it is checked out for
+    with pool.checkout("DSpace@MIT") as first, pool.try_checkout("IR-8") as second:
+        assert second is None
+    with pool.checkout("IR-8") as third:
+        assert third is first
+
+    assert pool.sizes() == {"ir-8": 1}
+    assert shared_tokens.get("DSpace@MIT") is shared_tokens.get("IR-8")
+
+
+def test_client_pool_max_size_waits_for_checkin(dspace_client, monkeypatch):
+    monkeypatch.setenv("DSPACE_CLIENT_POOL_SIZE", "1")
+    pool = ClientPool(lambda destination: DestinationClient(dspace_client, destination))
+    checked_out = []
+
+    def worker():
+        with pool.checkout("IR-8") as client:
+            checked_out.append(client)
+
+    with pool.checkout("IR-8") as first:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+    thread.join(timeout=5)
+
+    assert checked_out == [first]
+    assert pool.sizes() == {"ir-8": 1}
+
+
+def test_client_pool_try_checkout_does_not_wait(dspace_client, monkeypatch):
+    monkeypatch.setenv("DSPACE_CLIENT_POOL_SIZE", "1")
+    pool = ClientPool(lambda destination: DestinationClient(dspace_client, destination))
+
+    with pool.try_checkout("IR-8") as first:
+        assert first is not None
+        with pool.try_checkout("IR-8") as second:
+            assert second is None
+    with pool.try_checkout("IR-8") as third:
+        assert third is first
+
+
+def test_client_pool_evicts_idle_clients(dspace_client, monkeypatch):
+    monkeypatch.setenv("DSPACE_CLIENT_IDLE_TIMEOUT", "60")
+    clock = FakeClock()
+    pool = ClientPool(
+        lambda destination: DestinationClient(
+            MagicMock(wraps=dspace_client), destination
+        ),
+        clock=clock,
+    )
+    with pool.checkout("IR-8") as stale:
+        pass
+    clock.now = 61
+    with pool.checkout("IR-8") as fresh:
+        assert fresh is not stale
+
+    stale.dspace_client.session.close.assert_called_once()
+    assert pool.sizes() == {"ir-8": 1}
+
+
+def test_client_pool_failed_creation_frees_slot(dspace_client, monkeypatch):
+    monkeypatch.setenv("DSPACE_CLIENT_POOL_SIZE", "1")
+    attempts = []
+
+    def factory(destination):
+        attempts.append(destination)
+        if len(attempts) == 1:
+            raise errors.DSpaceAuthenticationError("mock://dspace.edu", "test")
+        return DestinationClient(dspace_client, destination)
+
+    pool = ClientPool(factory)
+    with pytest.raises(errors.DSpaceAuthenticationError), pool.checkout("IR-8"):
+        pass
+    with pool.checkout("IR-8"):
+        pass
+
+    assert attempts == ["IR-8", "IR-8"]
+    assert pool.sizes() == {"ir-8": 1}
+
+
+def test_client_pool_warm_creates_clients_in_parallel(dspace_client):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def factory(destination):
+        barrier.wait()
+        return DestinationClient(dspace_client, destination)
+
+    pool = ClientPool(factory)
+    pool.warm(["DSpace@MIT", "IR-8", "DDC-8", "IR-8"])
+
+    # DSpace@MIT and IR-8 are aliases for the same instance
+    assert pool.sizes() == {"ir-8": 1, "ddc-8": 1}
+
+
+def test_client_pool_warm_fails_fast(dspace_client):
+    release = threading.Event()
+
+    def factory(destination):
+        if destination == "IR-8":
+            raise errors.DSpaceAuthenticationError("mock://dspace.edu", "test")
+        release.wait(timeout=5)
+        return DestinationClient(dspace_client, destination)
+
+    pool = ClientPool(factory)
+    with pytest.raises(errors.DSpaceAuthenticationError):
+        pool.warm(["IR-8", "DDC-8"])
+    assert "ir-8" not in pool.sizes()
+    release.set()
+
+
+def make_jwt(subject, expires):
+    def encode(claims):
+        return base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'sub': subject, 'exp': expires})}.sig"
+
+
+class ExpiringTokenHandler(BaseHTTPRequestHandler):
+    """Mock DSpace issuing access tokens that can be expired, to test reauthentication."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.login_delay)
+        if not self.server.accept_logins:
+            self.respond(401, {"message": "Authentication failed"})
+            return
+        with self.server.lock:
+            self.server.logins += 1
+            token = make_jwt(self.server.logins, time.time() + self.server.token_lifetime)
+            self.server.valid_tokens.add(token)
+        self.respond(200, {}, Authorization=f"Bearer {token}")
+
+    def do_GET(self):
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        authenticated = token in self.server.valid_tokens
+        if self.path.startswith("/server/api/authn/status"):
+            self.respond(200, {"authenticated": authenticated})
+        elif authenticated:
+            self.respond(200, {"uuid": "item01", "type": "item"})
+        else:
+            with self.server.lock:
+                self.server.rejected += 1
+            self.respond(401, {"message": "Authentication is required"})
+
+    def respond(self, status, body, **headers):
+        response = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def expiring_dspace():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ExpiringTokenHandler)
+    server.lock = threading.Lock()
+    server.logins = server.rejected = 0
+    server.accept_logins = True
+    server.login_delay = 0
+    server.token_lifetime = 3600
+    server.valid_tokens = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def authenticated_client(server):
+    dspace_client = DSpaceClient(
+        api_endpoint=f"http://127.0.0.1:{server.server_port}/server/api",
+        username="test",
+        password="test",  # noqa: S106
+    )
+    assert dspace_client.authenticate()
+    return DestinationClient(dspace_client, "IR-8")
+
+
+def test_destination_client_reauthenticates_when_token_rejected(expiring_dspace):
+    client = authenticated_client(expiring_dspace)
+    expiring_dspace.valid_tokens.clear()
+
+    dso = client.resolve_identifier_to_dso(identifier="0000/item01")
+
+    assert dso.uuid == "item01"
+    assert (expiring_dspace.logins, expiring_dspace.rejected) == (2, 1)
+
+
+def test_destination_client_refreshes_expiring_token(expiring_dspace):
+    expiring_dspace.token_lifetime = 30
+    client = authenticated_client(expiring_dspace)
+    expiring_dspace.token_lifetime = 3600
+
+    client.resolve_identifier_to_dso(identifier="0000/item01")
+    client.resolve_identifier_to_dso(identifier="0000/item01")
+
+    assert (expiring_dspace.logins, expiring_dspace.rejected) == (2, 0)
+
+
+def test_destination_client_reauthentication_is_single_flight(expiring_dspace):
+    clients = [authenticated_client(expiring_dspace) for _ in range(4)]
+    expiring_dspace.valid_tokens.clear()
+    expiring_dspace.login_delay = 0.2
+    barrier = threading.Barrier(len(clients), timeout=5)
+    resolved = []
+
+    def resolve(client):
+        barrier.wait()
+        resolved.append(client.resolve_identifier_to_dso(identifier="0000/item01"))
+
+    threads = [threading.Thread(target=resolve, args=(c,)) for c in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [dso.uuid for dso in resolved] == ["item01"] * 4
+    assert expiring_dspace.logins == len(clients) + 1
+
+
+def test_destination_client_reauthentication_failure_raises(expiring_dspace):
+    client = authenticated_client(expiring_dspace)
+    expiring_dspace.valid_tokens.clear()
+    expiring_dspace.accept_logins = False
+
+    with pytest.raises(errors.DSpaceAuthenticationError):
+        client.resolve_identifier_to_dso(identifier="0000/item01")
+
+
+def test_mount_http_adapter_reads_per_instance_settings(monkeypatch):
+    monkeypatch.setenv("DSPACE_POOL_MAXSIZE", "4")
+    monkeypatch.setenv("DSPACE_CONNECT_RETRIES", "3")
+    monkeypatch.setenv(
+        "DSS_DSPACE_CREDENTIALS",
+        json.dumps(
+            {
+                "ir-8": {"url": "mock://ir", "user": "test", "password": "test"},
+                "ddc-8": {
+                    "url": "mock://ddc",
+                    "user": "test",
+                    "password": "test",
+                    "pool_maxsize": 16,
+                    "connect_retries": 0,
+                    "keepalive_interval": 30,
+                },
+            }
+        ),
+    )
+    Config.reload()
+    ir8 = DSpaceClient(api_endpoint="http://ir.example/server/api").session
+    ddc8 = DSpaceClient(api_endpoint="http://ddc.example/server/api").session
+
+    ir8_adapter = mount_http_adapter(ir8, "IR-8")
+    ddc8_adapter = mount_http_adapter(ddc8, "DDC-8")
+
+    assert ir8.get_adapter("https://ir.example") is ir8_adapter
+    assert (
+        ir8_adapter.poolmanager.connection_pool_kw["maxsize"],
+        ir8_adapter.retry_policy.connect_retries,
+    ) == (4, 3)
+    assert "socket_options" not in ir8_adapter.poolmanager.connection_pool_kw
+    assert (
+        ddc8_adapter.poolmanager.connection_pool_kw["maxsize"],
+        ddc8_adapter.retry_policy.connect_retries,
+    ) == (16, 0)
+    assert (
+        socket.SOL_SOCKET,
+        socket.SO_KEEPALIVE,
+        1,
+    ) in ddc8_adapter.poolmanager.connection_pool_kw["socket_options"]
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *_args):
+        pass
+
+
+class ConnectionCountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def test_mount_http_adapter_reuses_connections_across_threads(monkeypatch):
+    workers = 12
+    monkeypatch.setenv("DSPACE_POOL_MAXSIZE", str(workers))
+    server = ConnectionCountingServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = DSpaceClient().session
+    mount_http_adapter(session, "IR-8")
+    url = f"http://127.0.0.1:{server.server_port}/server/api"
+    barrier = threading.Barrier(workers, timeout=5)
+
+    def send_requests():
+        barrier.wait()
+        for _ in range(10):
+            session.get(url).raise_for_status()
+
+    try:
+        threads = [threading.Thread(target=send_requests) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert server.connections <= workers
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(1)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def slow_server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/server/api"
+    server.shutdown()
+    server.server_close()
+
+
+def test_mount_http_adapter_applies_read_timeout(monkeypatch, slow_server_url):
+    monkeypatch.setenv("DSPACE_TIMEOUT", "0.1")
+    monkeypatch.setenv("DSPACE_MAX_RETRIES", "0")
+    session = DSpaceClient().session
+    mount_http_adapter(session, "IR-8")
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(slow_server_url)
+
+
+def test_mount_http_adapter_caps_timeout_at_deadline(monkeypatch, slow_server_url):
+    monkeypatch.setenv("DSPACE_TIMEOUT", "30")
+    session = DSpaceClient().session
+    adapter = mount_http_adapter(session, "IR-8")
+    adapter.deadline = Deadline.after(0.1)
+
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(slow_server_url)
+    assert time.monotonic() - start < 1
+
+    with pytest.raises(errors.SubmissionDeadlineError):
+        session.get(slow_server_url)
+
+
+def test_upload_timeout_scales_with_size(monkeypatch):
+    monkeypatch.setenv("DSPACE_CONNECT_TIMEOUT", "5")
+    monkeypatch.setenv("DSPACE_TIMEOUT", "60")
+    monkeypatch.setenv("DSPACE_UPLOAD_TIMEOUT_PER_MB", "0.5")
+
+    assert upload_timeout("IR-8", 0) == (5, 60)
+    assert upload_timeout("IR-8", 100 * MIB) == (5, 110)
+
+
+def test_cap_timeout():
+    assert cap_timeout(None, 5) == (5, 5)
+    assert cap_timeout(10, 5) == (5, 5)
+    assert cap_timeout((3, 10), 5) == (3, 5)
+    assert cap_timeout((3, None), 5) == (3, 5)
+
+
+def test_destination_client_deadline_stops_requests(dspace_client):
+    client = DestinationClient(dspace_client, "IR-8")
+    client.deadline = Deadline(seconds=60, expires_at=0)
+
+    with pytest.raises(errors.SubmissionDeadlineError, match="deadline of 60 seconds"):
+        client.resolve_identifier_to_dso(identifier="0000/collection01")
+    with client.deadline_lifted():
+        assert client.resolve_identifier_to_dso(identifier="0000/collection01")
+    assert client.deadline.expires_at == 0
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails requests as listed in the server's `failures`, with a status or "slow"."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append(self.command)
+        failure = self.server.failures.pop(0) if self.server.failures else None
+        if failure == "slow":
+            time.sleep(1)
+        self.send_response(failure if isinstance(failure, int) else 200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def do_DELETE(self):
+        self.do_GET()
+
+    def do_POST(self):
+        self.do_GET()
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    server.daemon_threads = True
+    server.failures = []
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_port}/server/api"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def flaky_session(monkeypatch, sleeps):
+    monkeypatch.setenv("DSPACE_TIMEOUT", "0.1")
+    monkeypatch.setenv("DSPACE_MAX_RETRIES", "2")
+    monkeypatch.setenv("DSPACE_RETRY_JITTER", "0")
+    session = DSpaceClient().session
+    adapter = mount_http_adapter(session, "IR-8")
+    adapter.sleep = sleeps.append
+    return session
+
+
+def test_mount_http_adapter_retries_idempotent_requests(monkeypatch, flaky_server):
+    sleeps = []
+    session = flaky_session(monkeypatch, sleeps)
+    flaky_server.failures = [503, "slow"]
+
+    assert session.get(flaky_server.url).status_code == requests.codes.ok
+    assert flaky_server.requests == ["GET", "GET", "GET"]
+    assert sleeps == [0.5, 1.0]
+
+
+def test_mount_http_adapter_raises_once_retries_are_used_up(monkeypatch, flaky_server):
+    sleeps = []
+    session = flaky_session(monkeypatch, sleeps)
+    flaky_server.failures = ["slow", 504, "slow", 200]
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(flaky_server.url)
+    assert len(sleeps) == len(["first retry", "second retry"])
+
+    flaky_server.failures = [502, 502, 502]
+    assert session.delete(flaky_server.url).status_code == requests.codes.bad_gateway
+
+
+def test_mount_http_adapter_does_not_retry_non_idempotent_requests(
+    monkeypatch, flaky_server
+):
+    sleeps = []
+    session = flaky_session(monkeypatch, sleeps)
+    flaky_server.failures = [503, "slow"]
+
+    assert (
+        session.post(flaky_server.url, data=b"{}").status_code
+        == requests.codes.unavailable
+    )
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.post(flaky_server.url, data=b"{}")
+    assert flaky_server.requests == ["POST", "POST"]
+    assert sleeps == []
+
+
+@pytest.mark.parametrize(("method", "retries"), [("GET", 2), ("POST", 1)])
+def test_mount_http_adapter_retries_connection_failures_once_per_budget(
+    monkeypatch, method, retries
+):
+    monkeypatch.setenv("DSPACE_CONNECT_RETRIES", "1")
+    sleeps = []
+    session = flaky_session(monkeypatch, sleeps)
+    # nothing listens on the port of a closed socket, so connections are refused
+    with socket.socket() as closed:
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.request(method, f"http://127.0.0.1:{port}/server/api")
+
+    # urllib3 does not retry connections as well, which would multiply the attempts
+    assert len(sleeps) == retries
+
+
+def test_mount_http_adapter_does_not_retry_past_deadline(monkeypatch, flaky_server):
+    sleeps = []
+    session = flaky_session(monkeypatch, sleeps)
+    session.get_adapter(flaky_server.url).deadline = Deadline.after(0.3)
+    flaky_server.failures = [503]
+
+    assert session.get(flaky_server.url).status_code == requests.codes.unavailable
+    assert sleeps == []
+
+
+def test_mount_http_adapter_records_outcomes_on_circuit_breaker(
+    monkeypatch, flaky_server
+):
+    monkeypatch.setenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "2")
+    monkeypatch.setenv("DSPACE_MAX_RETRIES", "0")
+    monkeypatch.setenv("DSPACE_TIMEOUT", "0.1")
+    session = DSpaceClient().session
+    adapter = mount_http_adapter(session, "DDC-8")
+    flaky_server.failures = [503, 200, 504, "slow"]
+
+    session.get(flaky_server.url)
+    session.get(flaky_server.url)
+    session.get(flaky_server.url)
+    assert adapter.circuit_breaker.state == "closed"
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(flaky_server.url)
+    assert adapter.circuit_breaker.state == "open"
+
+
+def test_retry_policy_delay(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda _low, high: high)
+    policy = RetryPolicy(max_retries=5, backoff=1, backoff_max=10, jitter=0.5)
+    response = requests.Response()
+
+    assert [policy.delay(retry) for retry in range(1, 6)] == [1.5, 2.5, 4.5, 8.5, 10.5]
+    response.headers["Retry-After"] = "7"
+    assert policy.delay(1, response) == 7.5  # noqa: PLR2004
+    response.headers["Retry-After"] = "120"
+    assert policy.delay(1, response) == 10.5  # noqa: PLR2004
+    response.headers["Retry-After"] = "Wed, 21 Oct 2026 07:28:00 GMT"
+    assert policy.delay(1, response) == 1.5  # noqa: PLR2004
@@ -0,0 +1,119 @@
+import sqlite3
+from unittest.mock import patch
+
+from submitter.idempotency import SQLiteIdempotencyIndex, SubmissionRecord
+
+KEY = ("etdtest01", "etd")
+RESULT = {"ResultType": "success", "ItemHandle": "0000/item01", "Bitstreams": []}
+
+
+def test_claim_returns_record_of_completed_submission():
+    index = SQLiteIdempotencyIndex(":memory:")
+
+    assert index.claim(KEY) is None
+    index.record_item(KEY, "0000/item01")
+    index.complete(KEY, RESULT)
+
+    assert index.claim(KEY) == SubmissionRecord("completed", "0000/item01", RESULT)
+    assert index.claim(("etdtest02", "etd")) is None
+
+
+def test_claim_returns_active_record_of_running_submission():
+    index = SQLiteIdempotencyIndex(":memory:")
+
+    assert index.claim(KEY) is None
+    assert index.claim(KEY) == SubmissionRecord("in-progress", active=True)
+
+
+def test_release_removes_record_unless_item_created():
+    index = SQLiteIdempotencyIndex(":memory:")
+
+    index.claim(KEY)
+    index.release(KEY)
+    assert index.claim(KEY) is None
+
+    index.record_item(KEY, "0000/item01")
+    index.release(KEY)
+    assert index.claim(KEY) == SubmissionRecord("in-progress", "0000/item01")
+
+    index.discard(KEY)
+    assert index.claim(KEY) is None
+
+
+def test_records_persist_in_database_file(tmp_path):
+    path = str(tmp_path / "idempotency.db")
+    index = SQLiteIdempotencyIndex(path)
+    index.claim(KEY)
+    index.record_item(KEY, "0000/item01")
+    index.clear()
+
+    # the submission was interrupted, e.g. by the service stopping
+    assert SQLiteIdempotencyIndex(path).claim(KEY) == SubmissionRecord(
+        "in-progress", "0000/item01"
+    )
+
+
+def test_index_opens_idempotency_db_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("IDEMPOTENCY_DB_PATH", str(tmp_path / "idempotency.db"))
+    index = SQLiteIdempotencyIndex()
+    index.claim(KEY)
+
+    assert (tmp_path / "idempotency.db").exists()
+
+
+def test_index_defaults_to_memory_not_working_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv("IDEMPOTENCY_DB_PATH")
+    monkeypatch.chdir(tmp_path)
+    index = SQLiteIdempotencyIndex()
+    index.claim(KEY)
+    index.clear()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_claim_ignores_expired_record():
+    index = SQLiteIdempotencyIndex(":memory:", ttl=60)
+    with patch("submitter.idempotency.time.time", return_value=1000.0):
+        index.claim(KEY)
+        index.complete(KEY, RESULT)
+
+    with patch("submitter.idempotency.time.time", return_value=1059.0):
+        assert index.claim(KEY) == SubmissionRecord("completed", None, RESULT)
+    with patch("submitter.idempotency.time.time", return_value=1061.0):
+        assert index.claim(KEY) is None
+
+
+def test_claim_prunes_expired_records_at_most_every_prune_interval(tmp_path, caplog):
+    caplog.set_level("INFO")
+    path = str(tmp_path / "idempotency.db")
+    index = SQLiteIdempotencyIndex(path, ttl=60)
+    with patch("submitter.idempotency.time.time", return_value=1000.0):
+        index.complete(KEY, RESULT)
+    with patch("submitter.idempotency.time.time", return_value=1030.0):
+        index.complete(("etdtest02", "etd"), RESULT)
+
+    def count() -> int:
+        with sqlite3.connect(path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    with patch("submitter.idempotency.time.time", return_value=1070.0):
+        index.claim(("etdtest03", "etd"))
+    assert count() == 2  # noqa: PLR2004
+    assert "Pruned 1 expired records from idempotency index" in caplog.text
+
+    # the second record expired too, but is only pruned once PRUNE_INTERVAL passed
+    with patch("submitter.idempotency.time.time", return_value=1100.0):
+        index.claim(("etdtest04", "etd"))
+    assert count() == 3  # noqa: PLR2004
+    index.PRUNE_INTERVAL = 0
+    with patch("submitter.idempotency.time.time", return_value=1100.0):
+        index.claim(("etdtest05", "etd"))
+    assert count() == 3  # noqa: PLR2004
+
+
+def test_index_keeps_records_forever_with_ttl_zero():
+    index = SQLiteIdempotencyIndex(":memory:", ttl=0)
+    with patch("submitter.idempotency.time.time", return_value=0.0):
+        index.complete(KEY, RESULT)
+
+    assert index.claim(KEY) == SubmissionRecord("completed", None, RESULT)
@@ -0,0 +1,76 @@
+from dspace_rest_client.models import Bitstream, Bundle, Item
+
+from submitter.journal import JournalEntry, SubmissionJournal
+
+SUBMISSION = {"attributes": {}, "result_queue": "output", "files": []}
+ITEM = Item(
+    {
+        "uuid": "item01",
+        "handle": "0000/item01",
+        "_links": {"self": {"href": "mock://dspace.edu/server/api/core/items/item01"}},
+    }
+)
+
+
+def test_journal_records_steps_of_entry(journal_path):
+    journal = SubmissionJournal()
+    assert journal.begin("message01", SUBMISSION)
+    journal.record("message01", "item", ITEM)
+    journal.record("message01", "bundle", Bundle({"uuid": "bundle01"}))
+    journal.record("message01", "bitstream", Bitstream({"uuid": "bitstream02"}), 1)
+
+    entry = journal.get("message01")
+    assert entry.submission == SUBMISSION
+    assert Item(entry.item).links["self"]["href"].endswith("/items/item01")
+    assert (entry.item["handle"], entry.bundle["uuid"]) == ("0000/item01", "bundle01")
+    assert {index: b["uuid"] for index, b in entry.bitstreams.items()} == {
+        1: "bitstream02"
+    }
+    assert not entry.bitstream_deleted
+
+
+def test_journal_entries_persist_until_finished(journal_path):
+    journal = SubmissionJournal()
+    journal.begin("message01", SUBMISSION)
+    journal.begin("message02", SUBMISSION)
+    journal.record("message02", "item", ITEM)
+    journal.finish("message01")
+    journal.clear()
+
+    # e.g. the service was killed and restarted
+    entries = SubmissionJournal(journal_path).entries()
+    assert [entry.message_id for entry in entries] == ["message02"]
+    assert entries[0].item["uuid"] == "item01"
+
+
+def test_journal_begin_replaces_previous_entry(journal_path):
+    journal = SubmissionJournal()
+    journal.begin("message01", SUBMISSION)
+    journal.record("message01", "item", ITEM)
+    journal.begin("message01", SUBMISSION)
+
+    assert journal.get("message01") == JournalEntry("message01", SUBMISSION)
+
+
+def test_journal_entry_active_until_finished_or_released(journal_path):
+    journal = SubmissionJournal()
+    journal.begin("message01", SUBMISSION)
+    journal.begin("message02", SUBMISSION)
+    assert journal.active("message01")
+
+    journal.finish("message01")
+    journal.release("message02")
+
+    assert not journal.active("message01")
+    assert not journal.active("message02")
+    assert journal.get("message02") is not None
+
+
+def test_journal_disabled_without_path():
+    journal = SubmissionJournal()
+
+    assert not journal.enabled
+    assert not journal.begin("message01", SUBMISSION)
+    journal.record("message01", "item", ITEM)
+    assert journal.get("message01") is None
+    assert journal.entries() == []
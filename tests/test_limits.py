@@ -0,0 +1,233 @@
+# ruff: noqa: PLR2004
+import json
+import threading
+import time
+
+from submitter.config import Config
+from submitter.limits import (
+    CircuitBreaker,
+    CircuitBreakers,
+    ConcurrencyLimiter,
+    RequestGovernor,
+    RequestGovernors,
+    TokenBucket,
+)
+
+
+def _max_concurrent_holders(limiter, key, limit, threads=6):
+    lock = threading.Lock()
+    holders = 0
+    observed = 0
+
+    def hold_slot():
+        nonlocal holders, observed
+        with limiter.slot(key, limit):
+            with lock:
+                holders += 1
+                observed = max(observed, holders)
+            time.sleep(0.02)
+            with lock:
+                holders -= 1
+
+    workers = [threading.Thread(target=hold_slot) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return observed
+
+
+def test_concurrency_limiter_caps_holders_per_key():
+    assert _max_concurrent_holders(ConcurrencyLimiter(), "ir-8", 2) == 2
+
+
+def test_concurrency_limiter_zero_limit_is_uncapped():
+    assert _max_concurrent_holders(ConcurrencyLimiter(), "ir-8", 0) > 2
+
+
+def test_concurrency_limiter_keys_are_independent():
+    limiter = ConcurrencyLimiter()
+    with limiter.slot("ir-8", 1), limiter.slot("ddc-8", 1):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert clock.slept == []
+
+
+def test_token_bucket_waits_for_tokens_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 0.5
+    assert clock.now == 1.0
+
+
+def test_token_bucket_refills_while_idle():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    clock.now += 5
+    assert bucket.acquire() == 0
+
+
+def test_request_governor_caps_in_flight_requests():
+    governor = RequestGovernor(requests_per_second=0, max_in_flight=1)
+    with governor.request():
+        assert not governor.in_flight.acquire(blocking=False)
+    assert governor.in_flight.acquire(blocking=False)
+
+
+def test_request_governor_nested_request_reuses_in_flight_slot():
+    governor = RequestGovernor(requests_per_second=0, max_in_flight=1)
+    with governor.request(), governor.request():
+        assert not governor.in_flight.acquire(blocking=False)
+    assert governor.in_flight.acquire(blocking=False)
+
+
+def test_request_governor_without_limits():
+    governor = RequestGovernor(requests_per_second=0, max_in_flight=0)
+    assert governor.bucket is None
+    assert governor.in_flight is None
+    with governor.request():
+        pass
+
+
+def test_request_governors_share_governor_for_aliased_destinations():
+    governors = RequestGovernors()
+    assert governors.get("DSpace@MIT") is governors.get("IR-8")
+    assert governors.get("IR-8") is not governors.get("DDC-8")
+
+
+def test_request_governors_read_per_instance_settings(monkeypatch):
+    monkeypatch.setenv("DSPACE_REQUESTS_PER_SECOND", "5")
+    monkeypatch.setenv(
+        "DSS_DSPACE_CREDENTIALS",
+        json.dumps(
+            {
+                "ir-8": {"url": "mock://ir", "user": "test", "password": "test"},
+                "ddc-8": {
+                    "url": "mock://ddc",
+                    "user": "test",
+                    "password": "test",
+                    "requests_per_second": 1,
+                    "max_in_flight": 2,
+                },
+            }
+        ),
+    )
+    Config.reload()
+    governors = RequestGovernors()
+    assert governors.get("IR-8").bucket.rate == 5
+    assert governors.get("IR-8").in_flight is None
+    assert governors.get("DDC-8").bucket.rate == 1
+    assert governors.get("DDC-8").in_flight is not None
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker("ddc-8", threshold=3, reset_timeout=60, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.retry_after() == 40
+
+
+def test_circuit_breaker_half_opens_with_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("ddc-8", threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 60
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.retry_after() == 60
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 120
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    assert breaker.retry_after() == 0
+
+
+def test_circuit_breaker_sends_another_probe_if_first_sends_no_request():
+    clock = FakeClock()
+    breaker = CircuitBreaker("ddc-8", threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 60
+    assert breaker.allow()
+    clock.now = 120
+    assert breaker.allow()
+
+
+def test_circuit_breaker_disabled_by_zero_threshold():
+    breaker = CircuitBreaker("ddc-8", threshold=0, reset_timeout=60)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_circuit_breakers_read_per_instance_settings(monkeypatch):
+    monkeypatch.setenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "5")
+    monkeypatch.setenv(
+        "DSS_DSPACE_CREDENTIALS",
+        json.dumps(
+            {
+                "ir-8": {"url": "mock://ir", "user": "test", "password": "test"},
+                "ddc-8": {
+                    "url": "mock://ddc",
+                    "user": "test",
+                    "password": "test",
+                    "circuit_breaker_threshold": 2,
+                    "circuit_breaker_reset": 30,
+                },
+            }
+        ),
+    )
+    Config.reload()
+    breakers = CircuitBreakers()
+    assert breakers.get("DSpace@MIT") is breakers.get("IR-8")
+    assert (breakers.get("IR-8").threshold, breakers.get("IR-8").reset_timeout) == (
+        5,
+        60,
+    )
+    assert (breakers.get("DDC-8").threshold, breakers.get("DDC-8").reset_timeout) == (
+        2,
+        30,
+    )
@@ -107,3 +107,43 @@ message_json = {
         },
     ],
 }
+
+
+def test_load_jsonschemas_independent_of_working_directory(monkeypatch, tmp_path):
+    schemas = message.load_jsonschemas()
+    message.load_jsonschemas.cache_clear()
+    monkeypatch.chdir(tmp_path)
+
+    try:
+        assert message.load_jsonschemas() == schemas
+    finally:
+        message.load_jsonschemas.cache_clear()
+
+
+def test_load_validators_are_created_once():
+    validators = message.load_validators()
+
+    assert message.load_validators() is validators
+    assert set(validators) == {
+        "submission-message-attributes",
+        "submission-message-body",
+    }
+
+
+def test_load_validators_bake_in_output_queues():
+    validator = message.load_validators()["submission-message-attributes"]
+
+    assert validator.is_valid(
+        {
+            "PackageID": {"DataType": "String", "StringValue": "123"},
+            "SubmissionSource": {"DataType": "String", "StringValue": "ETD"},
+            "OutputQueue": {"DataType": "String", "StringValue": "empty_result_queue"},
+        }
+    )
+    assert not validator.is_valid(
+        {
+            "PackageID": {"DataType": "String", "StringValue": "123"},
+            "SubmissionSource": {"DataType": "String", "StringValue": "ETD"},
+            "OutputQueue": {"DataType": "String", "StringValue": "not_a_result_queue"},
+        }
+    )
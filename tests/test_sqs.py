@@ -1,19 +1,39 @@
 # ruff: noqa: PLR2004
 
+import copy
+import hashlib
 import json
+import signal
+import threading
+import time
+from unittest.mock import patch
 
 import pytest
 from botocore.exceptions import ClientError
+from dspace_rest_client.models import Item
+from requests.exceptions import Timeout as RequestsTimeout
 
+from submitter import errors
+from submitter.idempotency import submission_index
+from submitter.journal import submission_journal
+from submitter.limits import circuit_breakers
 from submitter.sqs import (
+    GracefulShutdown,
+    MessageDeleter,
+    MessagePrefetcher,
+    ResultWriter,
+    VisibilityHeartbeat,
+    _get_sqs_queue,
     create,
     message_loop,
     process,
     retrieve_messages_from_queue,
+    return_messages,
     sqs_client,
     verify_sent_message,
     write_message_to_queue,
 )
+from submitter.submission import Submission
 
 
 def test_sqs_client_returns_sqs_resource():
@@ -82,6 +102,302 @@ def test_process(mocked_sqs, mocked_dspace):
     assert len(output_msgs) > 0
 
 
+def test_process_with_workers(mocked_sqs, mocked_dspace):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    assert len(msgs) == 10
+
+    process(msgs, workers=4)
+
+    output_msgs = []
+    while batch := retrieve_messages_from_queue("empty_result_queue", 0):
+        output_msgs.extend(batch)
+    assert len(output_msgs) == 10
+
+
+def test_process_with_workers_reraises_worker_exception(mocked_sqs, mocked_dspace):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+
+    with (
+        patch(
+            "submitter.submission.Submission.submit",
+            side_effect=errors.DSpaceTimeoutError(
+                "mock://dspace.edu/server/api",
+                {
+                    "PackageID": {"StringValue": "etdtest01"},
+                    "SubmissionSource": {"StringValue": "etd"},
+                },
+            ),
+        ),
+        pytest.raises(errors.DSpaceTimeoutError),
+    ):
+        process(msgs, workers=4)
+
+
+def test_process_with_workers_writes_in_flight_results_before_reraising(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    started = []
+
+    def submit(message):
+        started.append(message)
+        if message is msgs[0]:
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+        time.sleep(0.3)
+
+    with (
+        patch("submitter.sqs.submit_message", side_effect=submit),
+        pytest.raises(RuntimeError),
+    ):
+        process(msgs, workers=4)
+
+    # the messages in flight when the first failed were deleted, and the messages not
+    # started were returned to the queue
+    started_ids = {message.message_id for message in started}
+    assert 4 <= len(started_ids) < 10
+    visible_ids = {
+        message.message_id
+        for message in retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    }
+    assert visible_ids & {message.message_id for message in msgs} == (
+        {message.message_id for message in msgs} - started_ids
+    )
+    # only the failed message is left in flight, to be redelivered later
+    queue = mocked_sqs.get_queue_by_name(QueueName="input_queue_with_messages")
+    assert queue.attributes["ApproximateNumberOfMessagesNotVisible"] == "1"
+
+
+def test_process_with_workers_completes_in_flight_messages_if_writing_fails(
+    mocked_sqs,
+):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    started = []
+
+    def submit(message):
+        started.append(message)
+        time.sleep(0.1)
+        return Submission(message.message_attributes, "empty_result_queue")
+
+    def write(writer, _submission, message):
+        if message is msgs[0]:
+            raise errors.SQSMessageSendError({}, {}, "empty_result_queue", "0")
+        writer.on_written(message)
+
+    with (
+        patch("submitter.sqs.submit_message", side_effect=submit),
+        patch("submitter.sqs.ResultWriter.add", autospec=True, side_effect=write),
+        pytest.raises(errors.SQSMessageSendError),
+    ):
+        process(msgs, workers=2)
+
+    # the messages in flight when writing a result failed were completed and deleted,
+    # and the messages not started were returned to the queue
+    started_ids = {message.message_id for message in started}
+    assert len(started_ids) < 10
+    visible_ids = {
+        message.message_id
+        for message in retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    }
+    assert visible_ids & {message.message_id for message in msgs} == (
+        {message.message_id for message in msgs} - started_ids
+    )
+    # only the message whose result failed to be written is left to be redelivered
+    queue = mocked_sqs.get_queue_by_name(QueueName="input_queue_with_messages")
+    assert queue.attributes["ApproximateNumberOfMessagesNotVisible"] == "1"
+
+
+def test_process_defers_messages_while_circuit_breaker_open(
+    journal_path, mocked_sqs, mocked_dspace, monkeypatch
+):
+    monkeypatch.setenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "1")
+    circuit_breakers.get("IR-8").record_failure()
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+
+    with patch("submitter.submission.Submission.submit") as mocked_submit:
+        process(msgs, workers=4)
+
+    mocked_submit.assert_not_called()
+    assert retrieve_messages_from_queue("empty_result_queue", 0) == []
+    assert submission_journal.entries() == []
+    # the deferred messages are not deleted, but stay invisible until the breaker
+    # half-opens
+    assert retrieve_messages_from_queue("input_queue_with_messages", 0) != []
+    assert retrieve_messages_from_queue("input_queue_with_messages", 0) == []
+
+
+def test_process_defers_messages_that_fail_with_circuit_breaker_enabled(
+    mocked_sqs, mocked_dspace, monkeypatch
+):
+    monkeypatch.setenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "3")
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    timeout_error = errors.DSpaceTimeoutError(
+        "mock://dspace.edu/server/api",
+        {
+            "PackageID": {"StringValue": "etdtest01"},
+            "SubmissionSource": {"StringValue": "etd"},
+        },
+    )
+
+    def fail(*_args):
+        circuit_breakers.get("IR-8").record_failure()
+        raise timeout_error
+
+    with (
+        patch("submitter.submission.Submission.submit", side_effect=fail) as submit,
+        patch("submitter.sqs.defer_message") as defer,
+    ):
+        process(msgs)
+
+    assert submit.call_count == 3
+    assert defer.call_count == 10
+    # messages that failed before the breaker opened are not received again at once
+    assert {round(call.args[1].delay) for call in defer.call_args_list} == {60}
+    assert retrieve_messages_from_queue("empty_result_queue", 0) == []
+
+
+def test_process_defers_message_whose_upload_times_out_with_circuit_breaker_enabled(
+    mocked_sqs, mocked_dspace, monkeypatch, input_message_good_dspace_mit, caplog
+):
+    monkeypatch.setenv("DSPACE_CIRCUIT_BREAKER_THRESHOLD", "3")
+
+    with (
+        patch(
+            "submitter.submission.DestinationClient.create_bitstream",
+            side_effect=RequestsTimeout,
+        ),
+        patch("submitter.sqs.defer_message") as defer,
+    ):
+        process([input_message_good_dspace_mit])
+
+    defer.assert_called_once()
+    assert defer.call_args.args[1].delay == 60
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+    assert retrieve_messages_from_queue("empty_result_queue", 0) == []
+
+
+def test_process_resends_result_of_redelivered_message(
+    mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    queue = mocked_sqs.get_queue_by_name(QueueName="empty_input_queue")
+    attributes = copy.deepcopy(input_message_good_dspace_mit.message_attributes)
+    process([input_message_good_dspace_mit])
+    first_result = retrieve_messages_from_queue("empty_result_queue", 0)[0]
+
+    queue.send_message(
+        MessageAttributes=attributes, MessageBody=input_message_good_dspace_mit.body
+    )
+    with patch("submitter.submission.Submission.submit") as mocked_submit:
+        process(retrieve_messages_from_queue("empty_input_queue", 0))
+
+    mocked_submit.assert_not_called()
+    result = retrieve_messages_from_queue("empty_result_queue", 0)[0]
+    assert json.loads(result.body) == json.loads(first_result.body)
+    assert json.loads(result.body)["ItemHandle"] == "0000/item01"
+
+
+def test_process_does_not_resubmit_partially_submitted_package(
+    mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    submission_index.claim(("etdtest01", "etd"))
+    submission_index.record_item(("etdtest01", "etd"), "0000/item01")
+    submission_index.release(("etdtest01", "etd"))
+
+    with patch("submitter.submission.Submission.submit") as mocked_submit:
+        process([input_message_good_dspace_mit])
+
+    mocked_submit.assert_not_called()
+    result = json.loads(retrieve_messages_from_queue("empty_result_queue", 0)[0].body)
+    assert result["ResultType"] == "error"
+    assert "created item '0000/item01' but did not complete" in result["ErrorInfo"]
+    assert submission_index.claim(("etdtest01", "etd")) is None
+
+
+def test_process_defers_message_whose_package_is_being_submitted(
+    mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    submission_index.claim(("etdtest01", "etd"))
+
+    with (
+        patch("submitter.submission.Submission.submit") as mocked_submit,
+        patch("submitter.sqs.defer_message") as defer,
+    ):
+        process([input_message_good_dspace_mit])
+
+    mocked_submit.assert_not_called()
+    assert defer.call_args.args[1].delay == 30
+
+
+def test_process_releases_package_when_submission_aborts(
+    mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    with (
+        patch("submitter.submission.Submission.submit", side_effect=RuntimeError("boom")),
+        pytest.raises(RuntimeError),
+    ):
+        process([input_message_good_dspace_mit])
+
+    assert submission_index.claim(("etdtest01", "etd")) is None
+
+
+def test_process_resumes_journaled_submission_of_redelivered_message(
+    journal_path, mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    # journal a submission killed after creating its item, as if the service was
+    message = input_message_good_dspace_mit
+    attributes = copy.deepcopy(message.message_attributes)
+    submission = Submission.from_message(message)
+    submission.claim()
+    submission.begin_journal(message.message_id)
+    submission_journal.record(
+        message.message_id,
+        "item",
+        Item(
+            {
+                "uuid": "item01",
+                "handle": "0000/item01",
+                "_links": {
+                    "self": {"href": "mock://dspace.edu/server/api/core/items/item01"}
+                },
+            }
+        ),
+    )
+    submission_index.record_item(("etdtest01", "etd"), "0000/item01")
+    submission.release()
+    message.message_attributes.update(attributes)
+
+    with patch("submitter.submission.Submission.submit") as mocked_submit:
+        process([message])
+
+    mocked_submit.assert_not_called()
+    result = json.loads(retrieve_messages_from_queue("empty_result_queue", 0)[0].body)
+    assert result["ResultType"] == "success"
+    assert result["ItemHandle"] == "0000/item01"
+    assert len(result["Bitstreams"]) == 1
+    assert submission_journal.get(message.message_id) is None
+
+
+def test_process_defers_redelivered_message_still_being_submitted(
+    journal_path, mocked_sqs, mocked_dspace, input_message_good_dspace_mit
+):
+    # the message is received again while its submission is running, e.g. after its
+    # visibility timeout expired
+    message = input_message_good_dspace_mit
+    attributes = copy.deepcopy(message.message_attributes)
+    Submission.from_message(message).begin_journal(message.message_id)
+    message.message_attributes.update(attributes)
+
+    with (
+        patch("submitter.submission.Submission.submit") as mocked_submit,
+        patch("submitter.submission.resume_submission") as mocked_resume,
+        patch("submitter.sqs.defer_message") as defer,
+    ):
+        process([message])
+
+    mocked_submit.assert_not_called()
+    mocked_resume.assert_not_called()
+    defer.assert_called_once()
+    assert submission_journal.get(message.message_id) is not None
+
+
 def test_process_handles_handleable_message_errors(mocked_sqs, mocked_dspace):
     msgs = retrieve_messages_from_queue("bad_input_messages", 0)
     output_msgs = retrieve_messages_from_queue("empty_result_queue", 0)
@@ -114,6 +430,488 @@ def test_message_loop(mocked_sqs, mocked_dspace):
     assert len(output_msgs) == 10
 
 
+def test_message_loop_logs_collection_cache_stats(mocked_sqs, mocked_dspace, caplog):
+    caplog.set_level("INFO")
+
+    message_loop("input_queue_with_messages", 0, 0)
+
+    # all 11 messages are submitted to the same collection
+    assert "Collection cache: 10 hits, 1 misses" in caplog.text
+
+
+def test_message_loop_with_prefetch(mocked_sqs, mocked_dspace):
+    message_loop("input_queue_with_messages", 0, 30, prefetch=1)
+
+    # confirm input queue is empty
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(msgs) == 0
+
+    # confirm all 11 messages were processed
+    output_msgs = []
+    while batch := retrieve_messages_from_queue("empty_result_queue", 0):
+        output_msgs.extend(batch)
+    assert len(output_msgs) == 11
+
+
+def test_message_prefetcher_yields_batches_until_queue_empty(mocked_sqs):
+    with MessagePrefetcher("input_queue_with_messages", 0, 30, 2) as prefetcher:
+        batches = list(prefetcher)
+
+    assert [len(batch) for batch in batches] == [10, 1]
+
+
+def test_message_prefetcher_drops_batches_past_visibility_timeout(mocked_sqs, caplog):
+    def clock():
+        # batches are received at 0 seconds and taken from the buffer at 100 seconds
+        return 0 if threading.current_thread().name == "submitter-prefetch" else 100
+
+    with MessagePrefetcher(
+        "input_queue_with_messages", 0, 30, 2, clock=clock
+    ) as prefetcher:
+        batches = list(prefetcher)
+
+    assert batches == []
+    assert "Dropping 10 prefetched messages" in caplog.text
+
+
+def test_message_prefetcher_reraises_receive_errors(mocked_sqs):
+    with (
+        MessagePrefetcher("not_a_queue", 0, 30, 1) as prefetcher,
+        pytest.raises(ClientError),
+    ):
+        list(prefetcher)
+
+
+def test_message_loop_with_heartbeat(mocked_sqs, mocked_dspace):
+    message_loop("input_queue_with_messages", 0, 30, heartbeat_interval=0.01)
+
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(msgs) == 0
+
+
+def test_graceful_shutdown_requested_on_sigterm():
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    with GracefulShutdown(5, clock=lambda: 100) as shutdown:
+        assert not shutdown.requested
+        signal.raise_signal(signal.SIGTERM)
+        assert shutdown.requested
+        assert shutdown.remaining() == 5
+
+    assert signal.getsignal(signal.SIGTERM) == previous_handler
+
+
+def test_graceful_shutdown_second_signal_handled_as_before():
+    with GracefulShutdown(5) as shutdown:
+        signal.raise_signal(signal.SIGINT)
+        assert shutdown.requested
+        with pytest.raises(KeyboardInterrupt):
+            signal.raise_signal(signal.SIGINT)
+
+
+def test_graceful_shutdown_grace_period_starts_when_requested():
+    now = [100.0]
+    shutdown = GracefulShutdown(5, clock=lambda: now[0])
+    shutdown.request()
+    now[0] += 3
+    shutdown.request()
+    assert shutdown.remaining() == 2
+    now[0] += 3
+    assert shutdown.remaining() == 0
+
+
+def test_process_returns_unstarted_messages_on_shutdown(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    shutdown = GracefulShutdown(5)
+
+    def submit(_message):
+        shutdown.request()
+
+    with patch("submitter.sqs.submit_message", side_effect=submit) as mock_submit:
+        process(msgs, heartbeat=None, shutdown=shutdown)
+
+    assert mock_submit.call_count == 1
+    # the first message was deleted, and the rest are visible again at once
+    returned = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(returned) == 10
+    assert msgs[0].message_id not in {message.message_id for message in returned}
+
+
+def test_process_with_workers_drains_in_flight_messages_on_shutdown(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    shutdown = GracefulShutdown(5)
+    started = []
+
+    def submit(message):
+        started.append(message.message_id)
+        if message is msgs[0]:
+            shutdown.request()
+        time.sleep(0.3)
+
+    with patch("submitter.sqs.submit_message", side_effect=submit):
+        process(msgs, workers=2, shutdown=shutdown)
+
+    # both in-flight messages finished and were deleted, and the rest returned
+    assert len(started) == 2
+    returned = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(returned) == 9
+    assert not set(started) & {message.message_id for message in returned}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_leaves_submissions_past_grace_period(mocked_sqs, workers, caplog):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)[:2]
+    shutdown = GracefulShutdown(0.2)
+    finished = threading.Event()
+    deleted = []
+
+    def submit(message):
+        if message is msgs[0]:
+            shutdown.request()
+            time.sleep(1)
+            finished.set()
+
+    def delete(_self, message):
+        deleted.append(message.message_id)
+
+    with (
+        patch("submitter.sqs.submit_message", side_effect=submit),
+        patch("submitter.sqs.MessageDeleter.add", autospec=True, side_effect=delete),
+    ):
+        process(msgs, workers=workers, shutdown=shutdown)
+        # returned at the end of the grace period, without waiting for the submission
+        assert not finished.is_set()
+        finished.wait()
+
+    assert (
+        f"Message '{msgs[0].message_id}' was still being submitted at the end of the "
+        "shutdown grace period" in caplog.text
+    )
+    # the overrunning message is neither deleted nor returned to the queue, so that it
+    # is received again once its visibility timeout expires
+    assert msgs[0].message_id not in deleted
+    visible_ids = {
+        message.message_id
+        for message in retrieve_messages_from_queue("input_queue_with_messages", 0)
+    }
+    assert msgs[0].message_id not in visible_ids
+    if workers > 1:
+        # the result of the other message was written without waiting for the first
+        assert deleted == [msgs[1].message_id]
+    else:
+        assert msgs[1].message_id in visible_ids
+
+
+@pytest.mark.parametrize("prefetch", [0, 1])
+def test_message_loop_stops_polling_on_sigterm(mocked_sqs, prefetch, caplog):
+    caplog.set_level("INFO")
+
+    def submit(_message):
+        signal.raise_signal(signal.SIGTERM)
+
+    with patch("submitter.sqs.submit_message", side_effect=submit) as mock_submit:
+        message_loop(
+            "input_queue_with_messages",
+            0,
+            30,
+            prefetch=prefetch,
+            shutdown_grace_period=5,
+        )
+
+    assert mock_submit.call_count == 1
+    assert "Message loop stopped by shutdown" in caplog.text
+    # the 9 unstarted messages were returned, along with any prefetched, and the
+    # last message is still in the queue either way
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(msgs) == 10
+
+
+def test_visibility_heartbeat_extends_tracked_messages_in_batches(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    client = msgs[0].meta.client
+    heartbeat = VisibilityHeartbeat(visibility=30, interval=10)
+    heartbeat.track(msgs)
+    heartbeat.release(msgs[0])
+
+    with patch.object(
+        client,
+        "change_message_visibility_batch",
+        wraps=client.change_message_visibility_batch,
+    ) as mock_change_visibility:
+        heartbeat.beat()
+
+    mock_change_visibility.assert_called_once()
+    entries = mock_change_visibility.call_args.kwargs["Entries"]
+    assert len(entries) == 9
+    assert {entry["VisibilityTimeout"] for entry in entries} == {30}
+
+
+def test_visibility_heartbeat_releases_messages_that_fail_to_extend(mocked_sqs, caplog):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    heartbeat = VisibilityHeartbeat(visibility=30, interval=10)
+    heartbeat.track(msgs[:2])
+
+    with patch.object(
+        msgs[0].meta.client,
+        "change_message_visibility_batch",
+        return_value={
+            "Successful": [{"Id": "1"}],
+            "Failed": [
+                {
+                    "Id": "0",
+                    "SenderFault": True,
+                    "Code": "ReceiptHandleIsInvalid",
+                }
+            ],
+        },
+    ):
+        heartbeat.beat()
+
+    assert f"Failed to extend visibility of message '{msgs[0].message_id}'" in (
+        caplog.text
+    )
+    assert list(heartbeat._messages) == [msgs[1].message_id]  # noqa: SLF001
+
+
+def test_visibility_heartbeat_release_waits_for_beat_in_progress(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    client = msgs[0].meta.client
+    heartbeat = VisibilityHeartbeat(visibility=30, interval=10)
+    heartbeat.track(msgs[:1])
+    beating = threading.Event()
+    change_visibility = client.change_message_visibility_batch
+
+    def slow_beat(**kwargs):
+        if threading.current_thread().name == "beat":
+            beating.set()
+            time.sleep(0.3)
+        return change_visibility(**kwargs)
+
+    with patch.object(client, "change_message_visibility_batch", side_effect=slow_beat):
+        beat = threading.Thread(target=heartbeat.beat, name="beat")
+        beat.start()
+        beating.wait(5)
+        # the message is returned while the beat is extending it
+        return_messages(msgs[:1], heartbeat)
+        beat.join()
+
+    # the beat did not extend the message after it was returned
+    returned = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert msgs[0].message_id in {message.message_id for message in returned}
+
+
+def test_visibility_heartbeat_disabled_if_interval_not_less_than_visibility(caplog):
+    heartbeat = VisibilityHeartbeat(visibility=10, interval=10)
+    assert not heartbeat.enabled
+    assert "Visibility heartbeat disabled" in caplog.text
+
+
+def _result_submission(body, result_queue="empty_result_queue"):
+    return Submission(
+        attributes={
+            "PackageID": {"DataType": "String", "StringValue": "etdtest01"},
+            "SubmissionSource": {"DataType": "String", "StringValue": "etd"},
+        },
+        result_queue=result_queue,
+        result_message=body,
+    )
+
+
+def test_result_writer_sends_results_in_batches_of_ten(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    written = []
+    writer = ResultWriter(on_written=written.append)
+    queue = _get_sqs_queue("empty_result_queue")
+
+    with patch.object(queue, "send_messages", wraps=queue.send_messages) as mock_send:
+        for message in msgs[:9]:
+            writer.add(_result_submission({"ResultType": "success"}), message)
+        mock_send.assert_not_called()
+        writer.add(_result_submission({"ResultType": "success"}), msgs[9])
+        writer.flush()
+
+    mock_send.assert_called_once()
+    assert written == msgs
+    output_msgs = []
+    while batch := retrieve_messages_from_queue("empty_result_queue", 0):
+        output_msgs.extend(batch)
+    assert len(output_msgs) == 10
+
+
+def test_result_writer_splits_batches_by_size(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    writer = ResultWriter(on_written=lambda _message: None)
+    queue = _get_sqs_queue("empty_result_queue")
+    large_body = {"ErrorInfo": "x" * 100_000}
+
+    with patch.object(queue, "send_messages", wraps=queue.send_messages) as mock_send:
+        for message in msgs[:3]:
+            writer.add(_result_submission(large_body), message)
+        writer.flush()
+
+    assert [len(call.kwargs["Entries"]) for call in mock_send.call_args_list] == [2, 1]
+
+
+def test_result_writer_retries_only_failed_entries(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    written = []
+    writer = ResultWriter(on_written=written.append, retry_delay=0)
+    queue = _get_sqs_queue("empty_result_queue")
+    wrong_md5 = "0" * 32
+    responses = [
+        {
+            "Successful": [
+                {"Id": "0", "MessageId": "a", "MD5OfMessageBody": ""},
+                {"Id": "1", "MessageId": "b", "MD5OfMessageBody": wrong_md5},
+            ],
+            "Failed": [{"Id": "2", "SenderFault": False, "Code": "InternalError"}],
+        },
+        None,
+    ]
+
+    def send_messages(Entries):  # noqa: N803
+        response = responses.pop(0)
+        if response is None:
+            return queue.meta.client.send_message_batch(
+                QueueUrl=queue.url, Entries=Entries
+            )
+        for result in response["Successful"]:
+            entry = Entries[int(result["Id"])]
+            if result["MD5OfMessageBody"] == "":
+                result["MD5OfMessageBody"] = hashlib.md5(  # noqa: S324
+                    entry["MessageBody"].encode()
+                ).hexdigest()
+        return response
+
+    with patch.object(queue, "send_messages", side_effect=send_messages) as mock_send:
+        for message in msgs[:3]:
+            writer.add(_result_submission({"ResultType": "success"}), message)
+        writer.flush()
+
+    assert mock_send.call_count == 2
+    assert len(mock_send.call_args_list[1].kwargs["Entries"]) == 2
+    assert written == [msgs[0], msgs[1], msgs[2]]
+
+
+def test_result_writer_raises_error_for_unrecoverable_entries(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    written = []
+    writer = ResultWriter(on_written=written.append)
+    queue = _get_sqs_queue("empty_result_queue")
+
+    def send_messages(Entries):  # noqa: N803
+        return {
+            "Successful": [
+                {
+                    "Id": "0",
+                    "MessageId": "a",
+                    "MD5OfMessageBody": hashlib.md5(  # noqa: S324
+                        Entries[0]["MessageBody"].encode()
+                    ).hexdigest(),
+                }
+            ],
+            "Failed": [{"Id": "1", "SenderFault": True, "Code": "InvalidParameterValue"}],
+        }
+
+    writer.add(_result_submission({"ResultType": "success"}), msgs[0])
+    writer.add(_result_submission({"ResultType": "success"}), msgs[1])
+    with (
+        patch.object(queue, "send_messages", side_effect=send_messages),
+        pytest.raises(errors.SQSMessageSendError, match=msgs[1].message_id),
+    ):
+        writer.flush()
+
+    assert written == [msgs[0]]
+
+
+def test_process_writes_results_before_reraising_exception(mocked_sqs, mocked_dspace):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+
+    with (
+        patch(
+            "submitter.submission.Submission.submit",
+            side_effect=[None, None, RuntimeError("unexpected")],
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        process(msgs)
+
+    output_msgs = retrieve_messages_from_queue("empty_result_queue", 0)
+    assert len(output_msgs) == 2
+
+
+def test_message_deleter_deletes_messages_in_batches(mocked_sqs):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    client = msgs[0].meta.client
+    heartbeat = VisibilityHeartbeat(visibility=30, interval=10)
+    heartbeat.track(msgs)
+    deleter = MessageDeleter(heartbeat)
+
+    with patch.object(
+        client, "delete_message_batch", wraps=client.delete_message_batch
+    ) as mock_delete:
+        for message in msgs[:9]:
+            deleter.add(message)
+        mock_delete.assert_not_called()
+        deleter.add(msgs[9])
+        deleter.flush()
+
+    mock_delete.assert_called_once()
+    assert heartbeat._messages == {}  # noqa: SLF001
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0, 0)
+    assert len(msgs) == 1
+
+
+def test_message_deleter_retries_failed_entries(mocked_sqs, caplog):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)
+    deleter = MessageDeleter()
+    responses = [
+        {
+            "Successful": [{"Id": "0"}],
+            "Failed": [
+                {"Id": "1", "SenderFault": False, "Code": "InternalError"},
+                {"Id": "2", "SenderFault": True, "Code": "ReceiptHandleIsInvalid"},
+            ],
+        },
+        {"Successful": [{"Id": "0"}], "Failed": []},
+    ]
+
+    with patch.object(
+        msgs[0].meta.client, "delete_message_batch", side_effect=responses
+    ) as mock_delete:
+        for message in msgs[:3]:
+            deleter.add(message)
+        deleter.flush()
+
+    assert mock_delete.call_count == 2
+    assert mock_delete.call_args.kwargs["Entries"] == [
+        {"Id": "0", "ReceiptHandle": msgs[1].receipt_handle}
+    ]
+    assert f"Failed to delete message '{msgs[2].message_id}'" in caplog.text
+    assert f"Failed to delete message '{msgs[1].message_id}'" not in caplog.text
+
+
+def test_process_delete_failure_does_not_replace_submission_error(mocked_sqs, caplog):
+    msgs = retrieve_messages_from_queue("input_queue_with_messages", 0)[:2]
+
+    def submit(message):
+        if message is msgs[1]:
+            raise RuntimeError("boom")
+
+    with (
+        patch("submitter.sqs.submit_message", side_effect=submit),
+        patch.object(
+            msgs[0].meta.client,
+            "delete_message_batch",
+            side_effect=ConnectionError("SQS unreachable"),
+        ) as mock_delete,
+        pytest.raises(RuntimeError, match="boom"),
+    ):
+        process(msgs)
+
+    assert mock_delete.call_count == 2
+    assert "Failed to delete 1 messages from input queue, they will be" in caplog.text
+
+
 def test_verify_returns_true(mocked_sqs, raw_attributes, raw_body):
     sqs = sqs_client()
     queue = sqs.get_queue_by_name(QueueName="empty_result_queue")
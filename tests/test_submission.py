@@ -1,6 +1,8 @@
 # ruff: noqa: SLF001
 import re
 import sys
+import threading
+import time
 import traceback
 from unittest.mock import MagicMock, patch
 
@@ -8,25 +10,36 @@ import pytest
 from dspace_rest_client.client import DSpaceClient
 from dspace_rest_client.models import Bitstream, Bundle, Item
 from freezegun import freeze_time
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import RequestException
+from requests.exceptions import Timeout as RequestsTimeout
 
 from submitter import errors
-from submitter.submission import Submission, dspace_clients, prettify
-
-
-def test_dspace_client_cache_stores_by_destination(
+from submitter.dspace import Deadline, DestinationClient
+from submitter.idempotency import SubmissionRecord, submission_index
+from submitter.journal import JournalEntry, submission_journal
+from submitter.submission import (
+    Submission,
+    collection_cache,
+    dspace_clients,
+    prettify,
+    reconcile_journal,
+    resume_submission,
+)
+
+
+def test_dspace_client_pool_reuses_clients_by_destination(
     mocked_dspace, input_message_good_ddc8, input_message_good_dspace_mit
 ):
-    assert dspace_clients == {}
+    assert dspace_clients.sizes() == {}
     submission_ddc8 = Submission.from_message(input_message_good_ddc8)
     submission_ddc8.submit()
-    assert dspace_clients == {"DDC-8": submission_ddc8.client}
+    assert dspace_clients.sizes() == {"ddc-8": 1}
     submission_dspace_mit = Submission.from_message(input_message_good_dspace_mit)
     submission_dspace_mit.submit()
-    assert dspace_clients == {
-        "DDC-8": submission_ddc8.client,
-        "DSpace@MIT": submission_dspace_mit.client,
-    }
+    assert dspace_clients.sizes() == {"ddc-8": 1, "ir-8": 1}
+    with dspace_clients.checkout("DDC-8") as client:
+        assert client is submission_ddc8.client
 
 
 def test_submission_get_dspace_client_success(mocked_dspace):
@@ -35,8 +48,9 @@ def test_submission_get_dspace_client_success(mocked_dspace):
         attributes=None,
         result_queue=None,
     )
-    dspace_client = submission.get_dspace_client()
-    assert isinstance(dspace_client, DSpaceClient)
+    with submission.get_dspace_client() as dspace_client:
+        assert isinstance(dspace_client, DestinationClient)
+        assert isinstance(dspace_client.dspace_client, DSpaceClient)
 
 
 def test_submission_get_dspace_client_no_auth_raises_error(
@@ -47,8 +61,9 @@ def test_submission_get_dspace_client_no_auth_raises_error(
         attributes=None,
         result_queue=None,
     )
-    with pytest.raises(errors.DSpaceAuthenticationError):
-        submission.get_dspace_client()
+    with pytest.raises(errors.DSpaceAuthenticationError), submission.get_dspace_client():
+        pass
+    assert dspace_clients.sizes() == {}
 
 
 def test_submission_get_dspace_client_invalid_destination_raises_error():
@@ -57,8 +72,11 @@ def test_submission_get_dspace_client_invalid_destination_raises_error():
         attributes=None,
         result_queue=None,
     )
-    with pytest.raises(errors.InvalidDSpaceDestinationError):
-        submission.get_dspace_client()
+    with (
+        pytest.raises(errors.InvalidDSpaceDestinationError),
+        submission.get_dspace_client(),
+    ):
+        pass
 
 
 def test_submission_get_dspace_client_no_destination_raises_error():
@@ -185,6 +203,33 @@ def test_result_success_message(mock_get_bitstreams, dspace_submission_instance)
     ]
 
 
+@patch("submitter.submission.DSpaceClient.get_bitstreams")
+def test_result_success_message_verify_refetches_bitstreams(
+    mock_get_bitstreams, monkeypatch, dspace_submission_instance, caplog
+):
+    monkeypatch.setenv("VERIFY_RESULT_BITSTREAMS", "true")
+    dspace_submission_instance.bitstreams = [
+        Bitstream({"uuid": "bitstream01", "name": "test-file-01.pdf"})
+    ]
+    mock_get_bitstreams.return_value = [
+        Bitstream({"uuid": "bitstream02", "name": "test-file-01.pdf"})
+    ]
+
+    dspace_submission_instance.result_success_message(
+        Item({"handle": "0000/item01"}), Bundle({"uuid": "bundle01"})
+    )
+
+    mock_get_bitstreams.assert_called_once()
+    result_bitstreams = dspace_submission_instance.result_message["Bitstreams"]
+    assert [bitstream["BitstreamUUID"] for bitstream in result_bitstreams] == [
+        "bitstream02"
+    ]
+    assert (
+        "Bitstreams in bundle bundle01 for item '0000/item01' differ from those uploaded"
+        in caplog.text
+    )
+
+
 @patch("submitter.submission.DSpaceClient.get_bitstreams")
 def test_submit_success(mock_get_bitstreams, dspace_submission_instance):
     mock_get_bitstreams.return_value = [
@@ -194,12 +239,298 @@ def test_submit_success(mock_get_bitstreams, dspace_submission_instance):
     assert dspace_submission_instance.result_message["ResultType"] == "success"
 
 
+@patch("submitter.submission.DSpaceClient.get_bitstreams")
+def test_submit_success_result_bitstreams_from_uploads(
+    mock_get_bitstreams, dspace_submission_instance
+):
+    dspace_submission_instance.submit()
+
+    uploaded_bitstream = {
+        "BitstreamName": "test-file-01.pdf",
+        "BitstreamUUID": "bitstream01",
+        "BitstreamChecksum": {
+            "checkSumAlgorithm": "MD5",
+            "value": "a4e0f4930dfaff904fa3c6c85b0b8ecc",
+        },
+    }
+    mock_get_bitstreams.assert_not_called()
+    assert dspace_submission_instance.result_message["Bitstreams"] == [
+        uploaded_bitstream,
+        uploaded_bitstream,
+    ]
+
+
+def test_submit_bitstream_checksum_mismatch_error(
+    mocked_dspace, dspace_submission_instance, caplog
+):
+    def bitstream_created(request, _context):
+        request.body.read()
+        return {
+            "uuid": "bitstream01",
+            "checkSum": {"checkSumAlgorithm": "MD5", "value": "not-the-checksum"},
+            "_links": {
+                "self": {
+                    "href": "mock://dspace.edu/server/api/core/bitstreams/bitstream01"
+                }
+            },
+        }
+
+    mocked_dspace.post(
+        "mock://dspace.edu/server/api/core/bundles/bundle01/bitstreams",
+        json=bitstream_created,
+    )
+    mocked_dspace.delete(
+        "mock://dspace.edu/server/api/core/bitstreams/bitstream01", status_code=204
+    )
+
+    dspace_submission_instance.submit()
+
+    assert dspace_submission_instance.result_message["ResultType"] == "error"
+    assert "does not match the checksum of the uploaded file" in caplog.text
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+
+
 def test_submit_item_success(dspace_submission_instance):
     item, bundle = dspace_submission_instance._submit_item()
     assert item.uuid == "item01"
     assert bundle.uuid == "bundle01"
 
 
+def test_create_item_caches_collection(mocked_dspace, dspace_submission_instance):
+    dspace_submission_instance._create_item()
+    dspace_submission_instance._create_item()
+
+    pid_lookups = [
+        request for request in mocked_dspace.request_history if "pid/find" in request.url
+    ]
+    assert len(pid_lookups) == 1
+    assert (collection_cache.hits, collection_cache.misses) == (1, 1)
+
+
+def test_create_item_collection_cache_is_per_instance(
+    mocked_dspace, dspace_submission_instance
+):
+    dspace_submission_instance._create_item()
+    dspace_submission_instance.destination = "IR-8"  # same instance as DSpace@MIT
+    dspace_submission_instance._create_item()
+    dspace_submission_instance.destination = "DDC-8"
+    dspace_submission_instance._create_item()
+
+    assert (collection_cache.hits, collection_cache.misses) == (1, 2)
+
+
+@patch("submitter.submission.DSpaceClient.create_item")
+def test_create_item_error_invalidates_cached_collection(
+    mock_create_item, mocked_dspace, dspace_submission_instance
+):
+    mock_create_item.return_value = Item()
+    with pytest.raises(errors.ItemError):
+        dspace_submission_instance._create_item()
+
+    assert collection_cache.get(("ir-8", "0000/collection01")) is None
+
+
+PACKAGE_ATTRIBUTES = {
+    "PackageID": {"DataType": "String", "StringValue": "etdtest01"},
+    "SubmissionSource": {"DataType": "String", "StringValue": "etd"},
+}
+
+
+def test_submit_records_claimed_package_in_idempotency_index(
+    mocked_dspace, dspace_submission_instance
+):
+    dspace_submission_instance.result_attributes = PACKAGE_ATTRIBUTES
+    assert dspace_submission_instance.claim() is None
+    dspace_submission_instance.submit()
+
+    record = submission_index.claim(("etdtest01", "etd"))
+    assert record == SubmissionRecord(
+        "completed", "0000/item01", dspace_submission_instance.result_message
+    )
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_error_removes_claimed_package_from_idempotency_index(
+    mock_create_bitstream, mocked_dspace, dspace_submission_instance
+):
+    mock_create_bitstream.side_effect = RequestException
+    dspace_submission_instance.result_attributes = PACKAGE_ATTRIBUTES
+    dspace_submission_instance.claim()
+    dspace_submission_instance.submit()
+
+    assert dspace_submission_instance.result_message["ResultType"] == "error"
+    assert submission_index.claim(("etdtest01", "etd")) is None
+
+
+def test_claim_skips_update_submissions(dspace_submission_instance):
+    dspace_submission_instance.result_attributes = PACKAGE_ATTRIBUTES
+    dspace_submission_instance.operation = "update"
+    assert dspace_submission_instance.claim() is None
+    assert dspace_submission_instance.package_key is None
+
+
+def interrupt_submission(submission):
+    """Journal a submission that is killed after uploading its first file."""
+    submission.result_attributes = PACKAGE_ATTRIBUTES
+    submission.claim()
+    submission.begin_journal("message01")
+    bitstream = Bitstream(
+        {
+            "uuid": "bitstream01",
+            "name": "test-file-01.pdf",
+            "checkSum": {"checkSumAlgorithm": "MD5", "value": "0123"},
+        }
+    )
+    with (
+        patch(
+            "submitter.submission.DestinationClient.create_bitstream",
+            side_effect=[bitstream, KeyboardInterrupt],
+        ),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        submission.submit()
+    submission.release()
+    return submission_journal.get("message01")
+
+
+def test_submit_journals_steps_until_result(
+    journal_path, mocked_dspace, dspace_submission_instance
+):
+    dspace_submission_instance.begin_journal("message01")
+    with patch.object(submission_journal, "finish") as mock_finish:
+        dspace_submission_instance.submit()
+
+    entry = submission_journal.get("message01")
+    assert entry.submission["collection_handle"] == "0000/collection01"
+    assert (entry.item["handle"], entry.bundle["uuid"]) == ("0000/item01", "bundle01")
+    assert sorted(entry.bitstreams) == [0, 1]
+    mock_finish.assert_called_once_with("message01")
+
+
+def test_submit_without_journal_path_does_not_journal(
+    mocked_dspace, dspace_submission_instance
+):
+    dspace_submission_instance.begin_journal("message01")
+    dspace_submission_instance.submit()
+
+    assert dspace_submission_instance.journal_id is None
+    assert submission_journal.get("message01") is None
+
+
+def test_submit_interrupted_leaves_journal_entry(
+    journal_path, mocked_dspace, dspace_submission_instance
+):
+    entry = interrupt_submission(dspace_submission_instance)
+
+    assert entry.item["uuid"] == "item01"
+    assert {index: b["uuid"] for index, b in entry.bitstreams.items()} == {
+        0: "bitstream01"
+    }
+    # the item was created, so the package is not resubmitted
+    assert submission_index.claim(("etdtest01", "etd")).item_handle == "0000/item01"
+
+
+def test_resume_submission_uploads_remaining_files(
+    journal_path, mocked_dspace, dspace_submission_instance
+):
+    entry = interrupt_submission(dspace_submission_instance)
+    mocked_dspace.reset_mock()
+
+    assert resume_submission(entry)
+
+    uploads = [
+        request
+        for request in mocked_dspace.request_history
+        if request.method == "POST" and request.path.endswith("/bitstreams")
+    ]
+    assert len(uploads) == 1
+    record = submission_index.claim(("etdtest01", "etd"))
+    assert record.status == "completed"
+    assert record.item_handle == "0000/item01"
+    assert [b["BitstreamUUID"] for b in record.result_message["Bitstreams"]] == [
+        "bitstream01",
+        "bitstream01",
+    ]
+    assert submission_journal.get("message01") is None
+
+
+def test_resume_submission_error_cleans_up_item(
+    journal_path, mocked_dspace, dspace_submission_instance, caplog
+):
+    entry = interrupt_submission(dspace_submission_instance)
+
+    with patch(
+        "submitter.submission.DestinationClient.create_bitstream",
+        side_effect=RequestException,
+    ):
+        assert resume_submission(entry)
+
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+    assert submission_index.claim(("etdtest01", "etd")) is None
+    assert submission_journal.get("message01") is None
+
+
+@pytest.mark.parametrize(
+    "delete_response", [{"exc": RequestsConnectionError}, {"status_code": 500}]
+)
+def test_resume_submission_keeps_entry_if_item_not_cleaned_up(
+    journal_path, mocked_dspace, dspace_submission_instance, delete_response
+):
+    entry = interrupt_submission(dspace_submission_instance)
+    # e.g. DSpace became unreachable while the submission was resumed
+    mocked_dspace.delete(
+        "mock://dspace.edu/server/api/core/items/item01", **delete_response
+    )
+
+    with patch(
+        "submitter.submission.DestinationClient.create_bitstream",
+        side_effect=RequestsConnectionError,
+    ):
+        assert not resume_submission(entry)
+
+    assert submission_journal.get("message01").item["uuid"] == "item01"
+    assert submission_index.claim(("etdtest01", "etd")).item_handle == "0000/item01"
+
+
+def test_resume_submission_keeps_entry_if_dspace_unreachable(
+    journal_path, mocked_dspace, dspace_submission_instance
+):
+    interrupt_submission(dspace_submission_instance)
+    mocked_dspace.post(
+        "mock://dspace.edu/server/api/authn/login", exc=RequestsConnectionError
+    )
+    dspace_clients.clear()
+
+    reconcile_journal()
+
+    assert submission_journal.get("message01").item["uuid"] == "item01"
+
+
+def test_resume_submission_undoes_interrupted_update(journal_path, mocked_dspace):
+    bitstream_url = "mock://dspace.edu/server/api/core/bitstreams/bitstream02"
+    mocked_dspace.delete(bitstream_url, status_code=204)
+    submission = Submission(
+        destination="DSpace@MIT",
+        operation="update",
+        item_handle="0000/item01",
+        files=[{"BitstreamName": "test-file-01.pdf"}],
+        result_queue=None,
+        attributes={},
+    )
+    submission.begin_journal("message01")
+    entry = JournalEntry(
+        "message01",
+        submission_journal.get("message01").submission,
+        bitstreams={
+            0: {"uuid": "bitstream02", "_links": {"self": {"href": bitstream_url}}}
+        },
+    )
+
+    assert resume_submission(entry)
+    assert mocked_dspace.request_history[-1].url == bitstream_url
+    assert submission_journal.get("message01") is None
+
+
 @patch("submitter.submission.DSpaceClient.create_item")
 def test_submit_item_error(mock_create_item, dspace_submission_instance):
     mock_create_item.return_value = Item()
@@ -216,7 +547,7 @@ def test_submit_item_bundle_create_error_raises_exception(
         dspace_submission_instance._submit_item()
 
 
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
 def test_submit_item_bitstream_error_raises_exception(
     mock_create_bitstream,
     mocked_dspace,
@@ -229,7 +560,7 @@ def test_submit_item_bitstream_error_raises_exception(
         dspace_submission_instance._submit_item()
 
 
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
 def test_submit_item_bitstream_error_triggers_cleanup(
     mock_create_bitstream, mocked_dspace, dspace_submission_instance, caplog
 ):
@@ -244,7 +575,7 @@ def test_submit_item_bitstream_error_triggers_cleanup(
 
 
 @patch("submitter.submission.DSpaceClient.delete_dso")
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
 def test_submit_item_bitstream_error_cleanup_failure_logs_exception(
     mock_create_bitstream, mock_delete_dso, dspace_submission_instance, caplog
 ):
@@ -259,6 +590,171 @@ def test_submit_item_bitstream_error_cleanup_failure_logs_exception(
     assert "Failed to delete DSpace item '0000/item01'" in caplog.text
 
 
+@patch("submitter.submission.DSpaceClient.create_bundle")
+def test_submit_item_bundle_timeout_cleans_up_and_raises_timeout(
+    mock_create_bundle, mocked_dspace, dspace_submission_instance, caplog
+):
+    mock_create_bundle.side_effect = RequestsTimeout
+
+    with pytest.raises(RequestsTimeout):
+        dspace_submission_instance._submit_item()
+
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_item_bitstream_connection_error_cleans_up_and_raises_it(
+    mock_create_bitstream, mocked_dspace, dspace_submission_instance, caplog
+):
+    bitstream = Bitstream({"uuid": "bitstream01", "bundleName": "bundle01"})
+    mock_create_bitstream.side_effect = [bitstream, RequestsConnectionError]
+
+    with pytest.raises(RequestsConnectionError):
+        dspace_submission_instance._submit_item()
+
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_bitstream_timeout_raises_dspace_timeout_error(
+    mock_create_bitstream, mocked_dspace, input_message_good_dspace_mit
+):
+    mock_create_bitstream.side_effect = RequestsTimeout
+    submission = Submission.from_message(input_message_good_dspace_mit)
+
+    with pytest.raises(errors.DSpaceTimeoutError):
+        submission.submit()
+
+    assert submission.result_message is None
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_item_past_deadline_still_cleans_up(
+    mock_create_bitstream, mocked_dspace, dspace_submission_instance, caplog
+):
+    mock_create_bitstream.side_effect = errors.SubmissionDeadlineError(60)
+    dspace_submission_instance.client.deadline = Deadline(seconds=60, expires_at=0)
+
+    with pytest.raises(errors.SubmissionDeadlineError):
+        dspace_submission_instance._create_bitstreams(
+            Item(
+                {
+                    "uuid": "item01",
+                    "handle": "0000/item01",
+                    "_links": {
+                        "self": {"href": "mock://dspace.edu/server/api/core/items/item01"}
+                    },
+                }
+            ),
+            Bundle(),
+        )
+
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+    assert dspace_submission_instance.client.deadline.expires_at == 0
+
+
+def test_submit_item_concurrent_bitstream_uploads_success(
+    monkeypatch, dspace_submission_instance
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+    item, bundle = dspace_submission_instance._submit_item()
+    assert item.uuid == "item01"
+    assert bundle.uuid == "bundle01"
+
+
+def test_submit_item_concurrent_bitstream_uploads_use_a_client_each(
+    monkeypatch, mocked_dspace, dspace_submission_instance
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+    barrier = threading.Barrier(2, timeout=5)
+    clients = []
+
+    def create_bitstream(client, **_kwargs):
+        clients.append(client)
+        barrier.wait()
+        return Bitstream({"uuid": "bitstream01"})
+
+    with patch(
+        "submitter.submission.DestinationClient.create_bitstream",
+        autospec=True,
+        side_effect=create_bitstream,
+    ):
+        dspace_submission_instance._submit_item()
+
+    assert len(set(clients)) == 2  # noqa: PLR2004
+    assert dspace_submission_instance.client in clients
+    # the client checked out for the uploads was checked back in to the pool
+    assert dspace_clients.sizes() == {"ir-8": 1}
+
+
+def test_submit_item_concurrent_bitstream_uploads_without_spare_client(
+    monkeypatch, mocked_dspace, dspace_submission_instance
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+    monkeypatch.setenv("DSPACE_CLIENT_POOL_SIZE", "1")
+    clients = []
+
+    def create_bitstream(client, **_kwargs):
+        clients.append(client)
+        return Bitstream({"uuid": "bitstream01"})
+
+    with (
+        dspace_clients.checkout("DSpace@MIT"),
+        patch(
+            "submitter.submission.DestinationClient.create_bitstream",
+            autospec=True,
+            side_effect=create_bitstream,
+        ),
+    ):
+        dspace_submission_instance._submit_item()
+
+    # the pool was full, so the files were uploaded with the submission's client
+    assert clients == [dspace_submission_instance.client] * 2
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_item_concurrent_bitstream_error_triggers_cleanup_once(
+    mock_create_bitstream, monkeypatch, mocked_dspace, dspace_submission_instance, caplog
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+
+    def create_bitstream(bundle, name, path):
+        if name == "test-file-01.pdf":
+            return Bitstream({"uuid": "bitstream01", "name": name})
+        raise RequestException
+
+    mock_create_bitstream.side_effect = create_bitstream
+
+    with pytest.raises(errors.BitstreamError, match=re.escape("test-file-02.pdf")):
+        dspace_submission_instance._submit_item()
+
+    assert mock_create_bitstream.call_count == 2  # noqa: PLR2004
+    assert caplog.text.count("was partially posted to DSpace, cleaning up") == 1
+    assert "Item '0000/item01' deleted from DSpace" in caplog.text
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+def test_submit_item_concurrent_bitstream_uploads_respect_instance_cap(
+    mock_create_bitstream, monkeypatch, mocked_dspace, dspace_submission_instance
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+    monkeypatch.setenv("DSPACE_MAX_CONCURRENT_UPLOADS", "1")
+    active = []
+    overlapping = []
+
+    def create_bitstream(bundle, name, path):
+        active.append(name)
+        overlapping.append(len(active))
+        time.sleep(0.05)
+        active.remove(name)
+        return Bitstream({"uuid": name, "name": name})
+
+    mock_create_bitstream.side_effect = create_bitstream
+    dspace_submission_instance._submit_item()
+
+    assert overlapping == [1, 1]
+
+
 @patch("submitter.submission.Submission._delete_old_item_bitstream")
 @patch("submitter.submission.Submission._upload_new_item_bitstreams")
 @patch("submitter.submission.Submission._get_item_bitstream_bundle")
@@ -303,7 +799,7 @@ def test_update_item_bitstream_without_old_bitstream_success(
     mock_delete_old_item_bitstream.assert_not_called()
 
 
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
 @patch("submitter.submission.Submission._delete_old_item_bitstream")
 @patch("submitter.submission.Submission._undo_bitstream_updates")
 @patch("submitter.submission.Submission._get_item_bitstream_bundle")
@@ -334,7 +830,7 @@ def test_update_item_bitstream_undo_not_required_raise_error(
     assert "restored item to original state" not in str(exception)
 
 
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
 @patch("submitter.submission.Submission._delete_old_item_bitstream")
 @patch("submitter.submission.Submission._undo_bitstream_updates")
 @patch("submitter.submission.Submission._get_item_bitstream_bundle")
@@ -366,7 +862,36 @@ def test_update_item_bitstream_undo_restores_item_state_raise_error(
     mock_delete_old_item_bitstream.assert_not_called()
 
 
-@patch("submitter.submission.DSpaceClient.create_bitstream")
+@patch("submitter.submission.DestinationClient.create_bitstream")
+@patch("submitter.submission.Submission._delete_old_item_bitstream")
+@patch("submitter.submission.Submission._undo_bitstream_updates")
+@patch("submitter.submission.Submission._get_item_bitstream_bundle")
+def test_update_item_bitstream_timeout_undoes_uploads_and_raises_timeout(
+    mock_get_item_bitstream_bundle,
+    mock_undo_bitstream_updates,
+    mock_delete_old_item_bitstream,
+    mock_dspace_client_create_bitstream,
+    dspace_submission_instance,
+):
+    item = MagicMock()
+    mock_get_item_bitstream_bundle.return_value = (
+        MagicMock(name="old-test-file-01.pdf"),  # the old bitstream
+        MagicMock(),  # the bundle
+    )
+    uploaded_bitstream = MagicMock(name="test-file-01.pdf")
+    mock_dspace_client_create_bitstream.side_effect = [
+        uploaded_bitstream,  # first bitstream was successful
+        RequestsTimeout,  # second bitstream timed out
+    ]
+
+    with pytest.raises(RequestsTimeout):
+        dspace_submission_instance._update_item_bitstream(item)
+
+    mock_undo_bitstream_updates.assert_called_once_with([uploaded_bitstream])
+    mock_delete_old_item_bitstream.assert_not_called()
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
 @patch("submitter.submission.Submission._delete_old_item_bitstream")
 @patch("submitter.submission.Submission._undo_bitstream_updates")
 @patch("submitter.submission.Submission._get_item_bitstream_bundle")
@@ -398,3 +923,144 @@ def test_update_item_bitstream_undo_fails_to_restore_item_state_raise_error(
 
     mock_undo_bitstream_updates.assert_called_once()
     mock_delete_old_item_bitstream.assert_not_called()
+
+
+@patch("submitter.submission.DestinationClient.create_bitstream")
+@patch("submitter.submission.Submission._delete_old_item_bitstream")
+@patch("submitter.submission.Submission._undo_bitstream_updates")
+@patch("submitter.submission.Submission._get_item_bitstream_bundle")
+def test_update_item_concurrent_bitstream_error_undoes_successful_uploads(  # noqa: PLR0917
+    mock_get_item_bitstream_bundle,
+    mock_undo_bitstream_updates,
+    mock_delete_old_item_bitstream,
+    mock_dspace_client_create_bitstream,
+    monkeypatch,
+    dspace_submission_instance,
+):
+    monkeypatch.setenv("BITSTREAM_UPLOAD_CONCURRENCY", "2")
+    item = MagicMock()
+    mock_get_item_bitstream_bundle.return_value = (
+        MagicMock(name="old-test-file-01.pdf"),  # the old bitstream
+        MagicMock(),  # the bundle
+    )
+    new_bitstream = Bitstream({"uuid": "bitstream01", "name": "test-file-01.pdf"})
+
+    def create_bitstream(bundle, name, path):
+        if name == "test-file-01.pdf":
+            return new_bitstream
+        raise Exception("Failed to create bitstream")  # noqa: TRY002
+
+    mock_dspace_client_create_bitstream.side_effect = create_bitstream
+    mock_undo_bitstream_updates.return_value = []
+
+    with pytest.raises(
+        errors.BitstreamError,
+        match=re.escape("with the following files: ['test-file-02.pdf']"),
+    ):
+        dspace_submission_instance._update_item_bitstream(item)
+
+    mock_undo_bitstream_updates.assert_called_once_with([new_bitstream])
+    mock_delete_old_item_bitstream.assert_not_called()
+
+
+@patch("submitter.submission.DSpaceClient.get_bitstreams")
+@patch("submitter.submission.DSpaceClient.add_metadata")
+@patch("submitter.submission.DestinationClient.create_bitstream")
+@patch("submitter.submission.Submission._get_item_bitstream_bundle")
+def test_update_item_result_bitstreams_from_uploads(
+    mock_get_item_bitstream_bundle,
+    mock_create_bitstream,
+    mock_add_metadata,
+    mock_get_bitstreams,
+    dspace_submission_instance,
+):
+    item = Item({"handle": "0000/item01"})
+    bundle = Bundle({"uuid": "bundle01"})
+    mock_get_item_bitstream_bundle.return_value = (None, bundle)
+    mock_create_bitstream.side_effect = [
+        Bitstream({"uuid": "bitstream01", "name": "test-file-01.pdf"}),
+        Bitstream({"uuid": "bitstream02", "name": "test-file-02.pdf"}),
+    ]
+
+    dspace_submission_instance._update_item_bitstream(item)
+    dspace_submission_instance.result_success_message(item, bundle)
+
+    mock_get_bitstreams.assert_not_called()
+    assert [
+        bitstream["BitstreamUUID"]
+        for bitstream in dspace_submission_instance.result_message["Bitstreams"]
+    ] == ["bitstream01", "bitstream02"]
+
+
+@patch("submitter.submission.Submission._submit_item")
+def test_submit_timeout_raises_dspace_timeout_error(
+    mock_submit_item, mocked_dspace, input_message_good_dspace_mit
+):
+    mock_submit_item.side_effect = RequestsTimeout
+    submission = Submission.from_message(input_message_good_dspace_mit)
+
+    with pytest.raises(
+        errors.DSpaceTimeoutError,
+        match=r"DSpace server at 'mock://dspace.edu/server/api' took more than 3\.0 ",
+    ):
+        submission.submit()
+
+
+@patch("submitter.submission.Submission._submit_item")
+def test_submit_sets_deadline_while_client_is_checked_out(
+    mock_submit_item, mocked_dspace, input_message_good_dspace_mit, monkeypatch
+):
+    monkeypatch.setenv("DSPACE_SUBMISSION_DEADLINE", "600")
+    deadlines = []
+
+    def submit_item():
+        deadlines.append(submission.client.deadline)
+        raise errors.SubmissionDeadlineError(600)
+
+    mock_submit_item.side_effect = submit_item
+    submission = Submission.from_message(input_message_good_dspace_mit)
+
+    submission.submit()
+
+    assert deadlines[0].seconds == 600  # noqa: PLR2004
+    assert submission.client.deadline is None
+    assert submission.result_message["ResultType"] == "error"
+    assert (
+        "did not complete within its deadline of 600 seconds"
+        in (submission.result_message["ErrorInfo"])
+    )
+
+
+@patch("submitter.submission.DSpaceClient.resolve_identifier_to_dso")
+def test_submit_past_deadline_resolving_collection_sets_error_result(
+    mock_resolve_identifier_to_dso, mocked_dspace, dspace_submission_instance
+):
+    mock_resolve_identifier_to_dso.side_effect = errors.SubmissionDeadlineError(600)
+
+    dspace_submission_instance.submit()
+
+    assert dspace_submission_instance.result_message["ResultType"] == "error"
+    assert (
+        "within its deadline of 600 seconds"
+        in (dspace_submission_instance.result_message["ErrorInfo"])
+    )
+
+
+@patch("submitter.submission.DSpaceClient.get_bitstreams")
+def test_submit_result_bitstreams_fetched_without_deadline(
+    mock_get_bitstreams, mocked_dspace, dspace_submission_instance, monkeypatch
+):
+    monkeypatch.setenv("DSPACE_SUBMISSION_DEADLINE", "600")
+    monkeypatch.setenv("VERIFY_RESULT_BITSTREAMS", "true")
+    deadlines = []
+
+    def get_bitstreams(**_kwargs):
+        deadlines.append(dspace_submission_instance.client.deadline)
+        return []
+
+    mock_get_bitstreams.side_effect = get_bitstreams
+
+    dspace_submission_instance.submit()
+
+    assert deadlines == [None]
+    assert dspace_submission_instance.result_message["ResultType"] == "success"